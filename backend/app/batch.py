@@ -0,0 +1,374 @@
+"""Provider batch APIs for non-interactive evaluation games.
+
+With ``BATCH_API=1``, provider calls of games created with the ``batch``
+priority go through a ``BatchCollector`` instead of being sent one by one.
+The collector gathers requests from every game for a short window, grouped
+by provider and phase. It submits each group as one batch and polls the
+batch until it ends. Then it hands each waiting game its result, and the
+game's phase carries on as if the call had been made directly. Waiting
+games hold only a future, not an open HTTP request, so one process can
+drive thousands of games at once.
+
+Each request records the id of the batch it went into. A game checkpointed
+while waiting keeps those ids, and the process that restores it resumes
+polling the same batch with ``BatchCollector.resume`` rather than paying
+for the calls again.
+
+Anthropic uses Message Batches and OpenAI the Batch API. Other providers
+have no batch interface here and are called directly. ``LocalBatchBackend``
+is an in-process stand-in with the same submit/poll/results lifecycle. It
+serves mock models, or every provider with ``BATCH_BACKEND=local``, so the
+batch path can be run without provider accounts.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from .budget import budget_policy
+from .providers import provider_registry
+from .structured import OutputSchema, response_format
+
+logger = logging.getLogger(__name__)
+
+BATCH_API = os.environ.get("BATCH_API", "0") == "1"
+# "local" runs every batch through the in-process stand-in
+BATCH_BACKEND = os.environ.get("BATCH_BACKEND", "")
+# Seconds requests are collected before a batch is submitted
+BATCH_WINDOW = float(os.environ.get("BATCH_WINDOW", "2"))
+# A batch is submitted early once it holds this many requests
+BATCH_MAX_REQUESTS = int(os.environ.get("BATCH_MAX_REQUESTS", "10000"))
+# Seconds between status checks of a submitted batch
+BATCH_POLL_INTERVAL = float(os.environ.get("BATCH_POLL_INTERVAL", "30"))
+BATCH_PROVIDERS = ("anthropic", "openai", "mock")
+
+
+class BatchRequestError(Exception):
+    """Raised to a waiting game when its request in a batch failed."""
+
+
+@dataclass(slots=True)
+class BatchRequest:
+    """One provider call waiting to go into a batch."""
+
+    custom_id: str
+    provider: str
+    model: str
+    system_prompt: str
+    messages: list[dict]
+    max_tokens: int
+    phase: str
+    output: OutputSchema | None = None
+    batch_id: str | None = None  # Set once the request has been submitted
+
+
+class LocalBatchBackend:
+    """In-process stand-in for a provider batch API."""
+
+    def __init__(self, complete: Callable[[BatchRequest], Awaitable[str]]):
+        self._complete = complete
+        self._jobs: dict[str, tuple[list[BatchRequest], asyncio.Future]] = {}
+        self._ids = itertools.count(1)
+
+    async def submit(self, requests: list[BatchRequest]) -> str:
+        batch_id = f"local-{next(self._ids)}"
+        job = asyncio.ensure_future(
+            asyncio.gather(*(self._complete(r) for r in requests), return_exceptions=True)
+        )
+        self._jobs[batch_id] = (requests, job)
+        return batch_id
+
+    async def poll(self, batch_id: str) -> bool:
+        job = self._jobs.get(batch_id)
+        if job is None:
+            # Local batches live in this process only; one from a restart is gone
+            raise BatchRequestError(f"Unknown local batch {batch_id}")
+        return job[1].done()
+
+    async def results(self, batch_id: str) -> dict[str, str | Exception]:
+        requests, job = self._jobs.pop(batch_id)
+        return {request.custom_id: result for request, result in zip(requests, job.result())}
+
+
+class AnthropicBatchBackend:
+    """Anthropic Message Batches."""
+
+    def __init__(self, client: Any):
+        self.client = client
+
+    async def submit(self, requests: list[BatchRequest]) -> str:
+        batch = await self.client.messages.batches.create(
+            requests=[{"custom_id": r.custom_id, "params": self._params(r)} for r in requests]
+        )
+        return batch.id
+
+    @staticmethod
+    def _params(r: BatchRequest) -> dict:
+        params = {
+            "model": r.model,
+            "max_tokens": r.max_tokens,
+            "system": r.system_prompt,
+            "messages": r.messages,
+        }
+        if r.output is not None:
+            params["tools"] = [
+                {"name": r.output.name, "description": r.output.description, "input_schema": r.output.schema}
+            ]
+            params["tool_choice"] = {"type": "tool", "name": r.output.name}
+        return params
+
+    async def poll(self, batch_id: str) -> bool:
+        batch = await self.client.messages.batches.retrieve(batch_id)
+        return batch.processing_status == "ended"
+
+    async def results(self, batch_id: str) -> dict[str, str | Exception]:
+        results: dict[str, str | Exception] = {}
+        async for entry in await self.client.messages.batches.results(batch_id):
+            result = entry.result
+            if result.type == "succeeded":
+                # Empty content is returned as is, for the caller's empty-response retry
+                results[entry.custom_id] = self._content(result.message.content)
+            else:
+                error = getattr(result, "error", None)
+                results[entry.custom_id] = BatchRequestError(f"Batch request {result.type}: {error}")
+        return results
+
+    @staticmethod
+    def _content(blocks: list) -> str:
+        """A message's text, or the input of its tool call as JSON."""
+        for block in blocks:
+            if block.type == "tool_use":
+                return json.dumps(block.input)
+        return blocks[0].text if blocks else ""
+
+
+class OpenAIBatchBackend:
+    """OpenAI Batch API over chat completions."""
+
+    ENDPOINT = "/v1/chat/completions"
+
+    def __init__(self, client: Any, provider: str = "openai"):
+        self.client = client
+        self.provider = provider
+        self._requests: dict[str, list[BatchRequest]] = {}
+
+    async def submit(self, requests: list[BatchRequest]) -> str:
+        lines = []
+        for r in requests:
+            budget = budget_policy.budget(self.provider, r.model, r.phase, r.max_tokens)
+            body = {
+                "model": r.model,
+                "messages": [{"role": "system", "content": r.system_prompt}, *r.messages],
+                "max_completion_tokens": budget.max_tokens,
+            }
+            if budget.effort:
+                body["reasoning_effort"] = budget.effort
+            if r.output is not None:
+                body["response_format"] = response_format(self.provider, r.output)
+            lines.append(
+                json.dumps({"custom_id": r.custom_id, "method": "POST", "url": self.ENDPOINT, "body": body})
+            )
+        input_file = await self.client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode()), purpose="batch"
+        )
+        batch = await self.client.batches.create(
+            input_file_id=input_file.id, endpoint=self.ENDPOINT, completion_window="24h"
+        )
+        self._requests[batch.id] = requests
+        return batch.id
+
+    async def poll(self, batch_id: str) -> bool:
+        batch = await self.client.batches.retrieve(batch_id)
+        return batch.status in ("completed", "failed", "expired", "cancelled")
+
+    async def results(self, batch_id: str) -> dict[str, str | Exception]:
+        batch = await self.client.batches.retrieve(batch_id)
+        requests = {r.custom_id: r for r in self._requests.pop(batch_id, [])}
+        results: dict[str, str | Exception] = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = await self.client.files.content(file_id)
+            for line in content.text.splitlines():
+                if line.strip():
+                    entry = json.loads(line)
+                    results[entry["custom_id"]] = self._parse(entry, requests.get(entry["custom_id"]))
+        return results
+
+    def _parse(self, entry: dict, request: BatchRequest | None) -> str | Exception:
+        response = entry.get("response") or {}
+        if entry.get("error") or response.get("status_code") != 200:
+            return BatchRequestError(f"Batch request failed: {entry.get('error') or response.get('body')}")
+        body = response["body"]
+        content = body["choices"][0]["message"].get("content")
+        if request is not None:
+            details = (body.get("usage") or {}).get("completion_tokens_details") or {}
+            budget_policy.observe(
+                self.provider, request.model, request.phase, details.get("reasoning_tokens"), empty=not content
+            )
+        return content or ""
+
+
+class BatchCollector:
+    """Collects provider calls across games into batches and hands back their results."""
+
+    def __init__(self, local_complete: Callable[[BatchRequest], Awaitable[str]]):
+        self._local = LocalBatchBackend(local_complete)
+        self._backends: dict[str, Any] = {}
+        # Requests waiting for their batch to be submitted, per (provider, phase)
+        self._open: dict[tuple[str, str], list[tuple[BatchRequest, asyncio.Future]]] = {}
+        self._flushes: dict[tuple[str, str], asyncio.TimerHandle] = {}
+        self._in_flight: dict[str, int] = {}  # Batch id -> request count
+        # Batches from an earlier process being polled again, with their waiters by custom id
+        self._resumed: dict[str, dict[str, list[asyncio.Future]]] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._ids = itertools.count(1)
+        self.counts: Counter = Counter()
+
+    @staticmethod
+    def supports(provider: str) -> bool:
+        return BATCH_BACKEND == "local" or provider in BATCH_PROVIDERS
+
+    def _backend(self, provider: str) -> Any:
+        if BATCH_BACKEND == "local" or provider == "mock":
+            return self._local
+        backend = self._backends.get(provider)
+        if backend is None:
+            client = provider_registry.client(provider)
+            if provider == "anthropic":
+                backend = AnthropicBatchBackend(client)
+            else:
+                backend = OpenAIBatchBackend(client, provider)
+            self._backends[provider] = backend
+        return backend
+
+    def request(
+        self,
+        provider: str,
+        model: str,
+        system_prompt: str,
+        messages: list[dict],
+        max_tokens: int,
+        phase: str,
+        output: OutputSchema | None = None,
+    ) -> BatchRequest:
+        """A new request with an id unique to this collector."""
+        return BatchRequest(
+            custom_id=f"req-{next(self._ids)}",
+            provider=provider,
+            model=model,
+            system_prompt=system_prompt,
+            messages=messages,
+            max_tokens=max_tokens,
+            phase=phase,
+            output=output,
+        )
+
+    async def complete(self, request: BatchRequest) -> str:
+        """Queue a request for the next batch of its provider and phase, and wait for its result.
+
+        ``request.batch_id`` is set once the batch is submitted. A result for
+        a call with ``output`` is JSON, but is not yet checked against the
+        schema, and may be empty.
+        """
+        future = asyncio.get_running_loop().create_future()
+        key = (request.provider, request.phase)
+        bucket = self._open.setdefault(key, [])
+        bucket.append((request, future))
+        self.counts["requests"] += 1
+        if len(bucket) >= BATCH_MAX_REQUESTS:
+            self._flush(key)
+        elif key not in self._flushes:
+            self._flushes[key] = asyncio.get_running_loop().call_later(BATCH_WINDOW, self._flush, key)
+        return await future
+
+    def _flush(self, key: tuple[str, str]):
+        timer = self._flushes.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        items = [(r, f) for r, f in self._open.pop(key, []) if not f.done()]
+        if items:
+            task = asyncio.create_task(self._run_batch(key[0], items))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def resume(self, provider: str, batch_id: str, custom_id: str) -> str:
+        """Wait for the result of a request submitted before a restart."""
+        future = asyncio.get_running_loop().create_future()
+        waiters = self._resumed.get(batch_id)
+        if waiters is None:
+            waiters = self._resumed[batch_id] = {}
+            task = asyncio.create_task(self._resume_batch(provider, batch_id, waiters))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        waiters.setdefault(custom_id, []).append(future)
+        self.counts["resumed"] += 1
+        return await future
+
+    async def _run_batch(self, provider: str, items: list[tuple[BatchRequest, asyncio.Future]]):
+        """Submit one batch, poll it until it ends and resolve its requests."""
+        try:
+            backend = self._backend(provider)
+            batch_id = await backend.submit([request for request, _ in items])
+            for request, _ in items:
+                request.batch_id = batch_id
+            self.counts["batches"] += 1
+            logger.info("Submitted %s batch %s with %d requests", provider, batch_id, len(items))
+            results = await self._wait_for_batch(backend, batch_id, len(items))
+        except Exception as e:
+            logger.exception("%s batch failed", provider)
+            results = {request.custom_id: BatchRequestError(f"Batch failed: {e}") for request, _ in items}
+
+        for request, future in items:
+            self._resolve(future, results.get(request.custom_id))
+
+    async def _resume_batch(self, provider: str, batch_id: str, waiters: dict[str, list[asyncio.Future]]):
+        """Poll a batch submitted by an earlier process and resolve the requests waiting on it."""
+        try:
+            results = await self._wait_for_batch(self._backend(provider), batch_id, len(waiters))
+        except Exception as e:
+            logger.warning("Could not resume %s batch %s: %s", provider, batch_id, e)
+            results = {}
+        finally:
+            # Later resumes of this batch poll it afresh
+            del self._resumed[batch_id]
+        for custom_id, futures in waiters.items():
+            for future in futures:
+                self._resolve(future, results.get(custom_id))
+
+    async def _wait_for_batch(self, backend: Any, batch_id: str, size: int) -> dict[str, str | Exception]:
+        self._in_flight[batch_id] = size
+        try:
+            interval = 0.05 if backend is self._local else BATCH_POLL_INTERVAL
+            while not await backend.poll(batch_id):
+                await asyncio.sleep(interval)
+            return await backend.results(batch_id)
+        finally:
+            del self._in_flight[batch_id]
+
+    def _resolve(self, future: asyncio.Future, result: str | Exception | None):
+        if future.done():
+            return  # The waiting game was deleted or its phase cancelled
+        if result is None:
+            result = BatchRequestError("Missing from batch results")
+        if isinstance(result, BaseException):
+            self.counts["failed"] += 1
+            future.set_exception(result)
+        else:
+            self.counts["completed"] += 1
+            future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": BATCH_API,
+            "backend": BATCH_BACKEND or "provider",
+            "collecting": {f"{p}:{phase}": len(items) for (p, phase), items in self._open.items()},
+            "batchesInFlight": len(self._in_flight),
+            "requestsInFlight": sum(self._in_flight.values()),
+            **self.counts,
+        }
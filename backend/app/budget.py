@@ -0,0 +1,137 @@
+"""Reasoning budgets for provider calls, per provider, model and game phase.
+
+Reasoning models spend part of their completion budget thinking before
+they answer. ``BudgetPolicy`` sets that spend explicitly for each
+(provider, model, phase): the reasoning effort for OpenAI models, the
+thinking budget for Gemini, and the token cap for every call. Voting and
+discussion get a small budget and coding a larger one.
+
+Each budget then adapts to what the model actually uses. Once enough
+calls are seen, the reasoning allowance tracks the 95th percentile of
+observed reasoning tokens plus headroom. A call that comes back empty
+because reasoning used up the cap doubles the allowance at once.
+"""
+
+import os
+import re
+from collections import deque
+from dataclasses import dataclass, field
+
+# Set to "0" to keep the starting allowances instead of adapting them
+REASONING_ADAPT = os.environ.get("REASONING_ADAPT", "1") == "1"
+# Allowance kept above the observed 95th percentile of reasoning tokens
+REASONING_HEADROOM = float(os.environ.get("REASONING_HEADROOM", "1.5"))
+# Calls observed before the allowance follows usage
+MIN_SAMPLES = 8
+SAMPLES_KEPT = 100
+# Smallest allowance; Gemini Pro models reject thinking budgets below 128
+MIN_REASONING_TOKENS = 128
+# Allowances never grow past this multiple of their starting value
+MAX_GROWTH = 4
+
+# Starting reasoning effort and reasoning-token allowance per phase
+PHASE_REASONING = {
+    "coding": ("medium", 3072),
+    "discussion": ("low", 512),
+    "voting": ("low", 384),
+}
+
+
+def reasoning_style(provider: str, model: str) -> str | None:
+    """How a model's reasoning is controlled: 'effort', 'thinking', 'tokens' or None."""
+    model = model.lower()
+    if provider == "openai" and re.match(r"(gpt-5|o\d)", model):
+        return "effort"  # reasoning_effort, reasoning tokens count toward the cap
+    if provider == "google" and re.search(r"gemini-(2\.5|[3-9])", model):
+        return "thinking"  # thinking_budget
+    if provider == "deepseek" and "reasoner" in model:
+        return "tokens"  # No reasoning control; only the cap
+    return None
+
+
+@dataclass(slots=True)
+class ReasoningBudget:
+    """Settings for one call."""
+
+    max_tokens: int  # Completion cap, reasoning included
+    effort: str | None = None  # OpenAI reasoning_effort
+    thinking_tokens: int | None = None  # Gemini thinking_budget
+
+
+@dataclass(slots=True)
+class _BudgetState:
+    initial: int
+    allowance: int
+    samples: deque = field(default_factory=lambda: deque(maxlen=SAMPLES_KEPT))
+    calls: int = 0
+    empty_responses: int = 0
+
+
+class BudgetPolicy:
+    """Reasoning budgets per (provider, model, phase), adapted from observed usage."""
+
+    def __init__(self):
+        self._states: dict[tuple[str, str, str], _BudgetState] = {}
+
+    def _state(self, provider: str, model: str, phase: str) -> _BudgetState:
+        key = (provider, model, phase)
+        state = self._states.get(key)
+        if state is None:
+            _, allowance = PHASE_REASONING.get(phase, PHASE_REASONING["coding"])
+            state = self._states[key] = _BudgetState(initial=allowance, allowance=allowance)
+        return state
+
+    def budget(self, provider: str, model: str, phase: str, output_tokens: int) -> ReasoningBudget:
+        """Budget for a call that should answer in about ``output_tokens``."""
+        style = reasoning_style(provider, model)
+        if style is None:
+            return ReasoningBudget(max_tokens=output_tokens)
+        allowance = self._state(provider, model, phase).allowance
+        budget = ReasoningBudget(max_tokens=output_tokens + allowance)
+        if style == "effort":
+            budget.effort, _ = PHASE_REASONING.get(phase, PHASE_REASONING["coding"])
+        elif style == "thinking":
+            budget.thinking_tokens = allowance
+        return budget
+
+    def observe(self, provider: str, model: str, phase: str, reasoning_tokens: int | None, empty: bool = False):
+        """Record a call's reasoning-token usage, and whether it came back empty."""
+        if reasoning_style(provider, model) is None:
+            return
+        state = self._state(provider, model, phase)
+        state.calls += 1
+        if reasoning_tokens is not None:
+            state.samples.append(reasoning_tokens)
+        if empty:
+            state.empty_responses += 1
+        if not REASONING_ADAPT:
+            return
+        ceiling = state.initial * MAX_GROWTH
+        if empty:
+            # Reasoning ate the whole cap before any answer was written
+            state.allowance = min(ceiling, state.allowance * 2)
+        elif len(state.samples) >= MIN_SAMPLES:
+            ordered = sorted(state.samples)
+            p95 = ordered[int(len(ordered) * 0.95)]
+            state.allowance = max(MIN_REASONING_TOKENS, min(ceiling, int(p95 * REASONING_HEADROOM)))
+
+    def stats(self) -> list[dict]:
+        return [
+            {
+                "provider": provider,
+                "model": model,
+                "phase": phase,
+                "allowance": state.allowance,
+                "initialAllowance": state.initial,
+                "calls": state.calls,
+                "emptyResponses": state.empty_responses,
+                "meanReasoningTokens": round(sum(state.samples) / len(state.samples))
+                if state.samples
+                else None,
+            }
+            for (provider, model, phase), state in self._states.items()
+        ]
+
+
+# Global reasoning budget policy, shared by every game
+budget_policy = BudgetPolicy()
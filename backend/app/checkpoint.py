@@ -0,0 +1,146 @@
+"""Game checkpoints, so another process can pick games up after a restart.
+
+Each game is saved to its own JSON file in ``CHECKPOINT_DIR``. A file holds
+the game state, the players' conversation history and any turns already
+completed in an unfinished phase. The directory may be shared between the
+old and new process of a rolling deploy. A process claims a checkpoint by
+renaming its file, so exactly one process restores each game, whether at
+startup or when the game's id is first requested.
+"""
+
+import json
+import logging
+import os
+from dataclasses import asdict
+from typing import Any
+
+from .models import FuzzResult, Task, TestResult
+from .state import GameState, Message, Player, Round, Submission, Vote
+
+# Directory checkpoints are written to and restored from; empty disables them
+CHECKPOINT_DIR = os.environ.get("CHECKPOINT_DIR", "checkpoints")
+
+logger = logging.getLogger(__name__)
+CHECKPOINT_VERSION = 1
+
+
+def _dump_model(model: Any) -> dict | None:
+    return model.model_dump(mode="json") if model is not None else None
+
+
+def game_to_dict(game: GameState) -> dict:
+    """JSON-serializable copy of a game's state."""
+    data = {
+        name: getattr(game, name)
+        for name in GameState.__dataclass_fields__
+        if name not in ("players", "rounds")
+    }
+    data["players"] = [asdict(player) for player in game.players]
+    data["rounds"] = [
+        {
+            "roundNumber": rnd.roundNumber,
+            "task": _dump_model(rnd.task),
+            "submissions": [asdict(s) for s in rnd.submissions],
+            "discussion": [asdict(m) for m in rnd.discussion],
+            "votes": [asdict(v) for v in rnd.votes],
+            "chosenSubmission": rnd.chosenSubmission,
+            "testResults": _dump_model(rnd.testResults),
+            "fuzzResults": _dump_model(rnd.fuzzResults),
+            # JSON object keys are strings
+            "suspectVotes": {str(player): count for player, count in rnd.suspectVotes.items()},
+            "eliminatedPlayer": rnd.eliminatedPlayer,
+        }
+        for rnd in game.rounds
+    ]
+    return data
+
+
+def game_from_dict(data: dict) -> GameState:
+    """Rebuild a game from ``game_to_dict`` output."""
+    rounds = [
+        Round(
+            roundNumber=rnd["roundNumber"],
+            task=Task.model_validate(rnd["task"]),
+            submissions=[Submission(**s) for s in rnd["submissions"]],
+            discussion=[Message(**m) for m in rnd["discussion"]],
+            votes=[Vote(**v) for v in rnd["votes"]],
+            chosenSubmission=rnd["chosenSubmission"],
+            testResults=TestResult.model_validate(rnd["testResults"]) if rnd["testResults"] else None,
+            fuzzResults=FuzzResult.model_validate(rnd["fuzzResults"]) if rnd["fuzzResults"] else None,
+            suspectVotes={int(player): count for player, count in rnd["suspectVotes"].items()},
+            eliminatedPlayer=rnd["eliminatedPlayer"],
+        )
+        for rnd in data["rounds"]
+    ]
+    fields = {key: value for key, value in data.items() if key not in ("players", "rounds")}
+    return GameState(
+        **fields,
+        players=[Player(**p) for p in data["players"]],
+        rounds=rounds,
+    )
+
+
+class CheckpointStore:
+    """One checkpoint file per game, claimed by the first process to restore it."""
+
+    def __init__(self, directory: str = CHECKPOINT_DIR):
+        self.directory = directory
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def _path(self, game_id: str) -> str:
+        return os.path.join(self.directory, f"{game_id}.json")
+
+    def save(self, game_id: str, checkpoint: dict):
+        """Write a game's checkpoint atomically, replacing any older one."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(game_id)
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, "w") as f:
+            json.dump({"version": CHECKPOINT_VERSION, **checkpoint}, f)
+        os.replace(temp, path)
+
+    def claim(self, game_id: str) -> dict | None:
+        """Take a game's checkpoint, if there is one no other process has taken."""
+        if not self.enabled or not game_id.isalnum():
+            return None
+        path = self._path(game_id)
+        claimed = f"{path}.claimed-{os.getpid()}"
+        try:
+            os.rename(path, claimed)
+        except OSError:
+            return None  # No checkpoint, or another process got it first
+        try:
+            with open(claimed) as f:
+                checkpoint = json.load(f)
+            if not isinstance(checkpoint, dict):
+                raise ValueError("not a JSON object")
+        except (ValueError, OSError) as e:
+            logger.error("Unreadable checkpoint for game %s: %s", game_id, e)
+            os.replace(claimed, f"{path}.bad")
+            return None
+        os.remove(claimed)
+        if checkpoint.get("version") != CHECKPOINT_VERSION:
+            return None
+        return checkpoint
+
+    def quarantine(self, game_id: str, checkpoint: dict):
+        """Keep a claimed checkpoint that could not be restored, for inspection."""
+        with open(f"{self._path(game_id)}.bad", "w") as f:
+            json.dump(checkpoint, f)
+
+    def pending(self) -> list[str]:
+        """Ids of games with an unclaimed checkpoint."""
+        if not self.enabled or not os.path.isdir(self.directory):
+            return []
+        return [
+            name.removesuffix(".json")
+            for name in os.listdir(self.directory)
+            if name.endswith(".json")
+        ]
+
+
+# Global checkpoint store
+checkpoint_store = CheckpointStore()
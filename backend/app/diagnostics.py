@@ -0,0 +1,178 @@
+"""Runtime diagnostics: event-loop lag, blocking-call stacks and sampling profiles.
+
+``LoopMonitor`` runs a heartbeat task on the event loop that measures how
+late each wake-up is and keeps a lag histogram. A watchdog thread checks
+the heartbeat too. When the loop has not woken up for
+``SLOW_CALLBACK_THRESHOLD`` seconds, the watchdog captures the loop
+thread's stack, so each stall is attributed to the code that was blocking.
+
+``sample_profile`` samples thread stacks for a fixed time and returns them
+in collapsed-stack format, ready for flamegraph.pl or speedscope.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from types import FrameType
+
+logger = logging.getLogger(__name__)
+
+LOOP_MONITOR = os.environ.get("LOOP_MONITOR", "1") == "1"
+# Seconds between heartbeats
+LOOP_LAG_INTERVAL = float(os.environ.get("LOOP_LAG_INTERVAL", "0.25"))
+# Seconds the loop may be blocked before its stack is captured
+SLOW_CALLBACK_THRESHOLD = float(os.environ.get("SLOW_CALLBACK_THRESHOLD", "0.1"))
+# Upper bounds of the lag histogram buckets, in milliseconds
+LAG_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+SLOW_CALLBACKS_KEPT = 50
+MAX_STACK_DEPTH = 64
+MAX_PROFILE_SECONDS = 60.0
+
+
+class ProfilerBusyError(Exception):
+    """Raised when a profile is requested while another is running."""
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def collapse_stack(frame: FrameType | None) -> str:
+    """A frame's stack as ``outer;...;inner`` in collapsed-stack format."""
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class LoopMonitor:
+    """Measures event-loop lag and captures the stack of anything blocking it."""
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL, threshold: float = SLOW_CALLBACK_THRESHOLD):
+        self.interval = interval
+        self.threshold = threshold
+        self.buckets = [0] * (len(LAG_BUCKETS_MS) + 1)  # Last bucket is overflow
+        self.samples = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.slow_callbacks: deque[dict] = deque(maxlen=SLOW_CALLBACKS_KEPT)
+        self._heartbeat = time.monotonic()
+        self._stall: dict | None = None  # Report of the stall in progress, if any
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    def _record_lag(self, lag: float):
+        lag_ms = lag * 1000
+        for i, bound in enumerate(LAG_BUCKETS_MS):
+            if lag_ms <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+        self.samples += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+
+    async def _run(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            lag = max(0.0, now - expected)
+            self._record_lag(lag)
+            stall = self._stall
+            if stall is not None:
+                # The watchdog reported this stall while it was still going
+                stall["blockedFor"] = round(lag, 3)
+                self._stall = None
+
+    def _watch(self):
+        """Watchdog thread: capture the loop thread's stack while it is blocked."""
+        reported_heartbeat = None
+        while not self._stopped.wait(self.threshold / 2):
+            heartbeat = self._heartbeat
+            blocked_for = time.monotonic() - heartbeat - self.interval
+            if blocked_for < self.threshold or heartbeat == reported_heartbeat:
+                continue
+            # One report per stall, taken while the loop is still stuck in it
+            reported_heartbeat = heartbeat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = collapse_stack(frame)
+            self._stall = {"at": time.time(), "blockedFor": round(blocked_for, 3), "stack": stack}
+            self.slow_callbacks.append(self._stall)
+            logger.warning(
+                "Event loop blocked for %.3fs in %s", blocked_for, ";".join(stack.split(";")[-3:])
+            )
+
+    def start(self):
+        """Start the heartbeat on the running loop and the watchdog thread."""
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._run())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict:
+        labels = [f"<={bound}ms" for bound in LAG_BUCKETS_MS] + [f">{LAG_BUCKETS_MS[-1]}ms"]
+        return {
+            "running": self._task is not None,
+            "intervalSeconds": self.interval,
+            "samples": self.samples,
+            "meanLagMs": round(self.total_lag / self.samples * 1000, 3) if self.samples else None,
+            "maxLagMs": round(self.max_lag * 1000, 3),
+            "histogram": dict(zip(labels, self.buckets)),
+            "slowCallbacks": list(self.slow_callbacks),
+        }
+
+
+_profile_lock = threading.Lock()
+
+
+def sample_profile(seconds: float, interval: float = 0.005, thread_id: int | None = None) -> Counter:
+    """Sample thread stacks for ``seconds``; returns collapsed stack -> sample count.
+
+    Samples every thread except the sampler itself, or only ``thread_id``.
+    Meant to run in a worker thread so the event loop can be sampled.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusyError("A profile is already running")
+    try:
+        own_id = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        stacks: Counter = Counter()
+        deadline = time.monotonic() + min(seconds, MAX_PROFILE_SECONDS)
+        while time.monotonic() < deadline:
+            for ident, frame in sys._current_frames().items():
+                if ident == own_id or (thread_id is not None and ident != thread_id):
+                    continue
+                stack = collapse_stack(frame)
+                stacks[f"{names.get(ident, ident)};{stack}"] += 1
+            time.sleep(interval)
+        return stacks
+    finally:
+        _profile_lock.release()
+
+
+def format_collapsed(stacks: Counter) -> str:
+    """Collapsed-stack text: one ``stack count`` line per distinct stack."""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+# Global loop monitor instance
+loop_monitor = LoopMonitor()
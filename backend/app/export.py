@@ -0,0 +1,386 @@
+"""Columnar export of finished games for offline analysis.
+
+``export_games`` flattens games into flat tables: games, rounds,
+submissions, messages, votes and test_results. Each table is written in
+chunks of ``EXPORT_CHUNK_ROWS`` rows, as gzipped CSV or NumPy ``.npz``
+files, so memory use stays flat however many games are exported. A
+``manifest.json`` lists every table's columns and chunk files.
+
+Rows are denormalized for analysis. Votes carry the model and role of the
+voter and of both players voted for, so most questions need no joins.
+Missing integers are written as -1 and missing floats as NaN.
+
+``read_table``, ``vote_agreement`` and ``suspicion_matrix`` load an export
+back and compute cross-game matrices with vectorized NumPy operations.
+NumPy is optional: CSV export works without it.
+"""
+
+import csv
+import gzip
+import json
+import os
+from collections.abc import Iterable
+from typing import Any
+
+try:
+    import numpy as np
+except ImportError:  # Optional; needed for NPZ chunks and the analysis helpers
+    np = None
+
+from .state import GameState
+
+# Rows per chunk file
+EXPORT_CHUNK_ROWS = int(os.environ.get("EXPORT_CHUNK_ROWS", "50000"))
+# Directory exports are written under, one subdirectory per export
+EXPORT_DIR = os.environ.get("EXPORT_DIR", "exports")
+FORMATS = ("csv", "npz")
+
+# Columns of every table, with their kind: "str", "int" or "float"
+TABLES: dict[str, tuple[tuple[str, str], ...]] = {
+    "games": (
+        ("gameId", "str"),
+        ("status", "str"),
+        ("winner", "str"),
+        ("players", "int"),
+        ("imposters", "int"),
+        ("rounds", "int"),
+        ("failedTaskCount", "int"),
+        ("priority", "str"),
+    ),
+    "rounds": (
+        ("gameId", "str"),
+        ("roundNumber", "int"),
+        ("taskId", "str"),
+        ("chosenSubmission", "int"),
+        ("chosenRole", "str"),
+        ("eliminatedPlayer", "int"),
+        ("eliminatedRole", "str"),
+        ("passed", "int"),  # 1, 0, or -1 when no solution was tested
+        ("messages", "int"),
+    ),
+    "submissions": (
+        ("gameId", "str"),
+        ("roundNumber", "int"),
+        ("playerIndex", "int"),
+        ("model", "str"),
+        ("role", "str"),
+        ("chosen", "int"),
+        ("codeChars", "int"),
+        ("code", "str"),
+    ),
+    "messages": (
+        ("gameId", "str"),
+        ("roundNumber", "int"),
+        ("discussionRound", "int"),
+        ("playerIndex", "int"),
+        ("model", "str"),
+        ("role", "str"),
+        ("content", "str"),
+    ),
+    "votes": (
+        ("gameId", "str"),
+        ("roundNumber", "int"),
+        ("voterIndex", "int"),
+        ("voterModel", "str"),
+        ("voterRole", "str"),
+        ("solutionVote", "int"),
+        ("solutionModel", "str"),
+        ("solutionRole", "str"),
+        ("suspectVote", "int"),
+        ("suspectModel", "str"),
+        ("suspectRole", "str"),
+    ),
+    "test_results": (
+        ("gameId", "str"),
+        ("roundNumber", "int"),
+        ("playerIndex", "int"),
+        ("model", "str"),
+        ("role", "str"),
+        ("passed", "int"),
+        ("totalTests", "int"),
+        ("passedTests", "int"),
+        ("failedTests", "int"),
+        ("wallTime", "float"),  # Largest measured efficiency sample, NaN if not measured
+        ("complexity", "str"),
+        ("error", "str"),
+    ),
+}
+
+# Label columns of the votes table for each way of grouping players
+VOTE_LABELS = {
+    "seat": ("voterIndex", "solutionVote", "suspectVote"),
+    "model": ("voterModel", "solutionModel", "suspectModel"),
+    "role": ("voterRole", "solutionRole", "suspectRole"),
+}
+
+
+def _require_numpy():
+    if np is None:
+        raise ValueError("NumPy is required for NPZ export and analysis; install the export extra")
+
+
+def _role(game: GameState, player_index: int | None) -> str:
+    if player_index is None:
+        return ""
+    return "imposter" if player_index in game.imposterIndices else "crewmate"
+
+
+def _model(game: GameState, player_index: int | None) -> str:
+    if player_index is None or not 0 <= player_index < len(game.players):
+        return ""
+    return game.players[player_index].model
+
+
+def flatten_game(game: GameState) -> Iterable[tuple[str, tuple]]:
+    """Yield ``(table, row)`` pairs for one game, rows in ``TABLES`` column order."""
+    yield "games", (
+        game.gameId,
+        game.status,
+        game.winner or "",
+        len(game.players),
+        len(game.imposterIndices),
+        len(game.rounds),
+        game.failedTaskCount,
+        game.priority,
+    )
+    for rnd in game.rounds:
+        key = (game.gameId, rnd.roundNumber)
+        result = rnd.testResults
+        yield "rounds", (
+            *key,
+            rnd.task.id,
+            -1 if rnd.chosenSubmission is None else rnd.chosenSubmission,
+            _role(game, rnd.chosenSubmission),
+            -1 if rnd.eliminatedPlayer is None else rnd.eliminatedPlayer,
+            _role(game, rnd.eliminatedPlayer),
+            -1 if result is None else int(result.passed),
+            len(rnd.discussion),
+        )
+        for submission in rnd.submissions:
+            player = submission.playerIndex
+            yield "submissions", (
+                *key,
+                player,
+                _model(game, player),
+                _role(game, player),
+                int(player == rnd.chosenSubmission),
+                len(submission.code),
+                submission.code,
+            )
+        for message in rnd.discussion:
+            player = message.playerIndex
+            yield "messages", (
+                *key,
+                message.discussionRound,
+                player,
+                _model(game, player),
+                _role(game, player),
+                message.content,
+            )
+        for vote in rnd.votes:
+            yield "votes", (
+                *key,
+                vote.voterIndex,
+                _model(game, vote.voterIndex),
+                _role(game, vote.voterIndex),
+                vote.solutionVote,
+                _model(game, vote.solutionVote),
+                _role(game, vote.solutionVote),
+                vote.suspectVote,
+                _model(game, vote.suspectVote),
+                _role(game, vote.suspectVote),
+            )
+        if result is not None:
+            player = rnd.chosenSubmission
+            efficiency = result.efficiency
+            timed = [s.wallTime for s in efficiency.samples if s.wallTime] if efficiency else []
+            yield "test_results", (
+                *key,
+                -1 if player is None else player,
+                _model(game, player),
+                _role(game, player),
+                int(result.passed),
+                result.totalTests,
+                result.passedTests,
+                len(result.failedTests),
+                timed[-1] if timed else float("nan"),
+                (efficiency.complexity or "") if efficiency else "",
+                result.error or "",
+            )
+
+
+class ChunkWriter:
+    """Buffers one table's rows column-wise and writes them out in chunk files."""
+
+    def __init__(self, out_dir: str, table: str, fmt: str, chunk_rows: int = EXPORT_CHUNK_ROWS):
+        self.out_dir = out_dir
+        self.table = table
+        self.fmt = fmt
+        self.chunk_rows = chunk_rows
+        self.columns = TABLES[table]
+        self.files: list[str] = []
+        self.rows = 0
+        self._buffer: list[list[Any]] = [[] for _ in self.columns]
+
+    def add(self, row: tuple):
+        for column, value in zip(self._buffer, row):
+            column.append(value)
+        if len(self._buffer[0]) >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        count = len(self._buffer[0])
+        if not count:
+            return
+        name = f"{self.table}-{len(self.files):05d}.{'csv.gz' if self.fmt == 'csv' else 'npz'}"
+        path = os.path.join(self.out_dir, name)
+        if self.fmt == "csv":
+            with gzip.open(path, "wt", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(name for name, _ in self.columns)
+                writer.writerows(zip(*self._buffer))
+        else:
+            np.savez_compressed(
+                path,
+                **{
+                    name: _column_array(values, kind)
+                    for (name, kind), values in zip(self.columns, self._buffer)
+                },
+            )
+        self.files.append(name)
+        self.rows += count
+        self._buffer = [[] for _ in self.columns]
+
+
+def _column_array(values: list, kind: str):
+    if kind == "int":
+        return np.asarray(values, dtype=np.int64)
+    if kind == "float":
+        return np.asarray(values, dtype=np.float64)
+    return np.asarray(values, dtype=np.str_)
+
+
+def export_games(
+    games: Iterable[GameState], out_dir: str, fmt: str = "csv", chunk_rows: int = EXPORT_CHUNK_ROWS
+) -> dict:
+    """Write games as chunked columnar tables under ``out_dir``; returns the manifest."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; use one of {', '.join(FORMATS)}")
+    if fmt == "npz":
+        _require_numpy()
+    os.makedirs(out_dir, exist_ok=True)
+
+    writers = {table: ChunkWriter(out_dir, table, fmt, chunk_rows) for table in TABLES}
+    game_count = 0
+    for game in games:
+        for table, row in flatten_game(game):
+            writers[table].add(row)
+        game_count += 1
+    for writer in writers.values():
+        writer.flush()
+
+    manifest = {
+        "format": fmt,
+        "games": game_count,
+        "tables": {
+            table: {
+                "columns": dict(writer.columns),
+                "rows": writer.rows,
+                "files": writer.files,
+            }
+            for table, writer in writers.items()
+        },
+    }
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def read_table(out_dir: str, table: str) -> dict[str, "np.ndarray"]:
+    """Load one exported table as a column name -> array mapping."""
+    _require_numpy()
+    with open(os.path.join(out_dir, "manifest.json")) as f:
+        manifest = json.load(f)
+    spec = manifest["tables"][table]
+    chunks: dict[str, list] = {name: [] for name in spec["columns"]}
+    for name in spec["files"]:
+        path = os.path.join(out_dir, name)
+        if manifest["format"] == "npz":
+            with np.load(path) as data:
+                for column in chunks:
+                    chunks[column].append(data[column])
+            continue
+        with gzip.open(path, "rt", newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            columns = list(zip(*reader)) or [()] * len(header)
+        for column, values in zip(header, columns):
+            chunks[column].append(_column_array(list(values), spec["columns"][column]))
+    return {
+        column: np.concatenate(parts)
+        if parts
+        else _column_array([], spec["columns"][column])
+        for column, parts in chunks.items()
+    }
+
+
+def _encode_labels(*columns) -> tuple[list, list]:
+    """Shared label list and integer codes for each column."""
+    labels, codes = np.unique(np.concatenate(columns), return_inverse=True)
+    splits = np.cumsum([len(column) for column in columns])[:-1]
+    return labels.tolist(), np.split(codes, splits)
+
+
+def suspicion_matrix(votes: dict, by: str = "model", normalize: bool = True) -> tuple[list, "np.ndarray"]:
+    """How often voters of each label name each label as the suspect.
+
+    ``by`` groups players by "seat", "model" or "role". Returns the labels
+    and a matrix with one row per voter label; with ``normalize`` each row
+    is the share of that label's suspect votes.
+    """
+    _require_numpy()
+    voter_column, _, suspect_column = VOTE_LABELS[by]
+    labels, (voters, suspects) = _encode_labels(votes[voter_column], votes[suspect_column])
+    size = len(labels)
+    counts = np.bincount(voters * size + suspects, minlength=size * size).reshape(size, size)
+    if not normalize:
+        return labels, counts
+    totals = counts.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return labels, np.where(totals > 0, counts / totals, np.nan)
+
+
+def vote_agreement(votes: dict, by: str = "model") -> tuple[list, "np.ndarray"]:
+    """How often two voters in the same round chose the same solution.
+
+    Every pair of voters in a round counts once per ordering. Returns the
+    labels and a symmetric matrix of agreement rates; cells for label pairs
+    that never voted in the same round are NaN.
+    """
+    _require_numpy()
+    voter_column, _, _ = VOTE_LABELS[by]
+    labels, (codes,) = _encode_labels(votes[voter_column])
+    size = len(labels)
+
+    # One row per (game, round), one column per seat
+    _, game_codes = np.unique(votes["gameId"], return_inverse=True)
+    _, group = np.unique(
+        np.column_stack([game_codes, votes["roundNumber"]]), axis=0, return_inverse=True
+    )
+    group = group.ravel()
+    seats = votes["voterIndex"]
+    shape = (group.max() + 1 if len(group) else 0, seats.max() + 1 if len(seats) else 0)
+    solution = np.full(shape, -1, dtype=np.int64)
+    label = np.full(shape, -1, dtype=np.int64)
+    solution[group, seats] = votes["solutionVote"]
+    label[group, seats] = codes
+
+    voted = solution >= 0
+    pairs = voted[:, :, None] & voted[:, None, :] & ~np.eye(shape[1], dtype=bool)
+    same = (solution[:, :, None] == solution[:, None, :])[pairs]
+    pair_index = (label[:, :, None] * size + label[:, None, :])[pairs]
+    totals = np.bincount(pair_index, minlength=size * size)
+    agreed = np.bincount(pair_index, weights=same, minlength=size * size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rates = np.where(totals > 0, agreed / totals, np.nan)
+    return labels, rates.reshape(size, size)
@@ -0,0 +1,228 @@
+"""Differential fuzz testing of submissions against a task's reference.
+
+Generated inputs are run through every submission in batched sandbox chunks
+and compared with the reference implementation and with each other. The
+first mismatch per submission is shrunk to a minimal counterexample.
+"""
+
+import copy
+import json
+import os
+import random
+import time
+from itertools import combinations
+from typing import Any
+
+from .generators import build_generator, load_reference, shrink_candidates
+from .models import Counterexample, Divergence, FuzzReport, FuzzResult
+from .prescreen import prescreen
+from .sandbox import execute_cases
+
+# Generated inputs per round; 0 disables fuzzing
+FUZZ_CASES = int(os.environ.get("FUZZ_CASES", "2000"))
+# Wall-clock budget for fuzzing one round, in seconds
+FUZZ_TIME_BUDGET = float(os.environ.get("FUZZ_TIME_BUDGET", "20"))
+# Inputs sent to the sandbox per batch
+FUZZ_CHUNK_SIZE = 500
+# Per-input timeout; generated inputs are small, so anything slower is suspect
+FUZZ_CASE_TIMEOUT = 1.0
+# Largest size passed to input generators
+FUZZ_MAX_SIZE = 40
+MAX_SHRINK_STEPS = 50
+
+
+def _normalize(value: Any) -> Any:
+    """Round-trip a value through JSON, as sandbox results are."""
+    return json.loads(json.dumps(value))
+
+
+def can_fuzz(task: dict) -> bool:
+    """Whether a task carries both a reference and an input generator."""
+    return FUZZ_CASES > 0 and "reference" in task and ("inputs" in task or "generator" in task)
+
+
+def generate_cases(task: dict, seed: str, count: int) -> tuple[list[list[Any]], list[Any]]:
+    """Generate distinct inputs and their reference outputs.
+
+    Inputs the reference rejects by raising are treated as outside the
+    task's domain and skipped.
+    """
+    rng = random.Random(seed)
+    generate = build_generator(task)
+    reference = load_reference(task)
+
+    seen = set()
+    inputs, expected = [], []
+    for _ in range(count * 3):
+        if len(inputs) >= count:
+            break
+        args = generate(rng, rng.randint(0, FUZZ_MAX_SIZE))
+        key = json.dumps(args)
+        if key in seen:
+            continue
+        seen.add(key)
+        try:
+            output = _normalize(reference(*copy.deepcopy(args)))
+        except Exception:
+            continue
+        inputs.append(args)
+        expected.append(output)
+    return inputs, expected
+
+
+def _is_mismatch(outcome: dict, expected: Any) -> bool:
+    return "error" in outcome or outcome["result"] != expected
+
+
+def _signature(outcome: dict) -> str:
+    """Comparable form of an outcome; all errors compare equal."""
+    if "error" in outcome:
+        return "error"
+    return json.dumps(outcome["result"], sort_keys=True)
+
+
+def shrink(
+    task: dict, code: str, args: list[Any], outcome: dict, deadline: float
+) -> Counterexample:
+    """Shrink a failing input to a smaller one that still fails."""
+    reference = load_reference(task)
+    current, current_outcome = args, outcome
+
+    for _ in range(MAX_SHRINK_STEPS):
+        if time.monotonic() >= deadline:
+            break
+        candidates, expected = [], []
+        for candidate in shrink_candidates(current):
+            try:
+                expected.append(_normalize(reference(*copy.deepcopy(candidate))))
+            except Exception:
+                continue
+            candidates.append(candidate)
+        if not candidates:
+            break
+
+        # One worker, stopping at the first failure, tries candidates in order
+        outcomes, _ = execute_cases(
+            code,
+            task["functionName"],
+            candidates,
+            expected=expected,
+            parallelism=1,
+            fail_fast=True,
+            timeout=FUZZ_CASE_TIMEOUT,
+            deadline=deadline,
+        )
+        failing = [
+            i for i in sorted(outcomes) if _is_mismatch(outcomes[i], expected[i])
+        ]
+        if not failing:
+            break
+        current, current_outcome = candidates[failing[0]], outcomes[failing[0]]
+
+    return Counterexample(
+        input=current,
+        expected=_normalize(reference(*copy.deepcopy(current))),
+        actual=current_outcome.get("result"),
+        error=current_outcome.get("error"),
+    )
+
+
+def fuzz_submissions(
+    task: dict,
+    submissions: list[tuple[int, str]],
+    seed: str,
+    budget: float | None = None,
+) -> FuzzResult:
+    """Fuzz (player index, code) submissions against the task's reference.
+
+    Submissions rejected by the static pre-screen are not run; their report
+    has the 'rejected' status and the reason.
+    """
+    deadline = time.monotonic() + (FUZZ_TIME_BUDGET if budget is None else budget)
+    inputs, expected = generate_cases(task, seed, FUZZ_CASES)
+    outputs: dict[int, dict[int, dict]] = {player: {} for player, _ in submissions}
+    budget_exhausted = False
+
+    arity = len(inputs[0]) if inputs else None
+    rejections = {
+        player: rejection
+        for player, code in submissions
+        if (rejection := prescreen(code, task["functionName"], arity))
+    }
+    runnable = [(player, code) for player, code in submissions if player not in rejections]
+
+    for start in range(0, len(inputs), FUZZ_CHUNK_SIZE):
+        chunk = inputs[start : start + FUZZ_CHUNK_SIZE]
+        for player, code in runnable:
+            if time.monotonic() >= deadline:
+                budget_exhausted = True
+                break
+            outcomes, _ = execute_cases(
+                code,
+                task["functionName"],
+                chunk,
+                timeout=FUZZ_CASE_TIMEOUT,
+                deadline=deadline,
+            )
+            for i, outcome in outcomes.items():
+                outputs[player][start + i] = outcome
+        if budget_exhausted:
+            break
+
+    # Shrinking gets whatever budget the batches left
+    reports = []
+    for player, code in submissions:
+        if player in rejections:
+            reports.append(
+                FuzzReport(
+                    playerIndex=player,
+                    status="rejected",
+                    casesRun=0,
+                    mismatches=0,
+                    rejection=rejections[player],
+                )
+            )
+            continue
+        mismatched = sorted(
+            i for i, outcome in outputs[player].items() if _is_mismatch(outcome, expected[i])
+        )
+        counterexample = None
+        if mismatched:
+            first = mismatched[0]
+            outcome = outputs[player][first]
+            if task.get("shrink", True):
+                counterexample = shrink(task, code, inputs[first], outcome, deadline)
+            else:
+                counterexample = Counterexample(
+                    input=inputs[first],
+                    expected=expected[first],
+                    actual=outcome.get("result"),
+                    error=outcome.get("error"),
+                )
+        reports.append(
+            FuzzReport(
+                playerIndex=player,
+                casesRun=len(outputs[player]),
+                mismatches=len(mismatched),
+                counterexample=counterexample,
+            )
+        )
+
+    divergences = []
+    for (a, _), (b, _) in combinations(runnable, 2):
+        shared = sorted(outputs[a].keys() & outputs[b].keys())
+        differing = [
+            i for i in shared if _signature(outputs[a][i]) != _signature(outputs[b][i])
+        ]
+        if differing:
+            smallest = min(differing, key=lambda i: len(json.dumps(inputs[i])))
+            divergences.append(
+                Divergence(players=[a, b], cases=len(differing), example=inputs[smallest])
+            )
+
+    return FuzzResult(
+        casesRun=max((len(o) for o in outputs.values()), default=0),
+        budgetExhausted=budget_exhausted or time.monotonic() >= deadline,
+        reports=reports,
+        divergences=divergences,
+    )
@@ -1,23 +1,29 @@
 """Game state management and logic."""
 
+import asyncio
+import hashlib
+import logging
+import os
 import random
+import time
 import uuid
 from collections import Counter
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
 
-from .models import (
-    GameState,
-    GameStateResponse,
-    Player,
-    Round,
-    Task,
-    Submission,
-    Message,
-    Vote,
-    TestResult,
-)
-from .tasks import TASKS
+from .compression import COMPRESS_MIN_BYTES, compress
+from .models import GameStateResponse, TestResult
+from .state import GameState, Player, Round, Vote
+from .task_registry import task_registry
 from .sandbox import run_tests
-from .llm import LLMOrchestrator
+from .fuzz import FUZZ_TIME_BUDGET, can_fuzz, fuzz_submissions
+from .generators import scaled_inputs
+from .llm import LLMOrchestrator, PlayerTurn
+from .logs import log_context
+from .scheduler import PRIORITY_WEIGHTS, scheduler
+from .checkpoint import checkpoint_store, game_from_dict, game_to_dict
+
+logger = logging.getLogger(__name__)
 
 DEFAULT_MODELS = [
     "claude-sonnet-4-5-20250929",
@@ -26,28 +32,206 @@ DEFAULT_MODELS = [
     "claude-sonnet-4-5-20250929",
 ]
 
+# Lifecycle limits (seconds / counts), overridable via environment
+MAX_LIVE_GAMES = int(os.environ.get("MAX_LIVE_GAMES", "500"))
+FINISHED_GAME_TTL = float(os.environ.get("FINISHED_GAME_TTL", "1800"))
+LOBBY_GAME_TTL = float(os.environ.get("LOBBY_GAME_TTL", "900"))
+IDLE_GAME_TTL = float(os.environ.get("IDLE_GAME_TTL", "7200"))
+GAME_SWEEP_INTERVAL = float(os.environ.get("GAME_SWEEP_INTERVAL", "60"))
+
+ROUNDS_PER_GAME = 5
+MIN_PLAYERS = 4
+MAX_PLAYERS = 16
+
+# Measure the shipped solution on scaled inputs in the results phase
+EFFICIENCY_MODE = os.environ.get("EFFICIENCY_MODE", "0") == "1"
+
+# Start the next phase's LLM calls as soon as a phase completes. Costs the
+# calls of games that are abandoned or deleted mid-phase.
+SPECULATIVE_PREFETCH = os.environ.get("SPECULATIVE_PREFETCH", "0") == "1"
+
+# Seconds a drain waits for in-flight phases before checkpointing anyway
+DRAIN_TIMEOUT = float(os.environ.get("DRAIN_TIMEOUT", "30"))
+
+
+def resume_token(game_id: str, version: int) -> str:
+    """Token a client reconnects with after a restart: the game and the version it last saw."""
+    return f"{game_id}:{version}"
+
+
+def tally_votes(votes: list[Vote], player_count: int) -> tuple[list[int], list[int]]:
+    """Solution and suspect vote counts, indexed by player."""
+    solution_counts = [0] * player_count
+    suspect_counts = [0] * player_count
+    for vote in votes:
+        solution_counts[vote.solutionVote] += 1
+        suspect_counts[vote.suspectVote] += 1
+    return solution_counts, suspect_counts
+
+
+class GameCapacityError(Exception):
+    """Raised when the live-game cap is reached and nothing can be evicted."""
+
+
+class PhaseCancelledError(Exception):
+    """Raised by advance_phase when a drain cancelled the phase before it finished."""
+
+
+@dataclass(slots=True)
+class GameView:
+    """A game's API view, encoded once per state version."""
+
+    version: int
+    etag: str
+    response: GameStateResponse
+    body: bytes  # JSON-encoded response
+    update_message: str  # WebSocket "game_state_update" frame carrying body
+    compressed: dict[str, bytes] = field(default_factory=dict)  # Body per content encoding
+
+    def encoded_body(self, encoding: str | None) -> tuple[bytes, str | None]:
+        """The body and its content encoding, compressing at most once per version.
+
+        Small bodies are always returned uncompressed.
+        """
+        if encoding is None or len(self.body) < COMPRESS_MIN_BYTES:
+            return self.body, None
+        body = self.compressed.get(encoding)
+        if body is None:
+            body = self.compressed[encoding] = compress(self.body, encoding)
+        return body, encoding
+
 
 class GameManager:
     """Manages game state and orchestrates game flow."""
 
     def __init__(self):
         self.games: dict[str, GameState] = {}
+        self.last_activity: dict[str, float] = {}
+        self._views: dict[str, GameView] = {}
+        self._fuzz_jobs: dict[str, asyncio.Task] = {}
+        # Speculative next-phase turns per game, keyed by the version they were started at
+        self._prefetches: dict[str, tuple[int, asyncio.Task]] = {}
+        self.prefetch_stats: Counter = Counter()
         self.llm = LLMOrchestrator()
-
-    def create_game(self, models: list[str] | None = None) -> GameState:
-        """Create a new game with the specified models."""
+        # Set by drain(); the API then turns away game requests
+        self.draining = False
+        self._phases: dict[asyncio.Task, str] = {}  # Phases in flight -> game id
+        # Each in-flight phase's game and history as they were when it started,
+        # checkpointed instead of the live game if a drain cancels the phase
+        self._phase_start: dict[str, dict] = {}
+        # Called with each evicted game's id, e.g. to close its connections
+        self._evict_listeners: list[Callable[[str], None]] = []
+        # Background tasks playing batch games, which no client waits on
+        self._drivers: dict[str, asyncio.Task] = {}
+        # Awaited with a game's id after each phase a driver runs, e.g. to broadcast it
+        self._update_listeners: list[Callable[[str], Awaitable[None]]] = []
+
+    def on_evict(self, listener: Callable[[str], None]):
+        """Register a callback for games evicted by a sweep."""
+        self._evict_listeners.append(listener)
+
+    def on_update(self, listener: Callable[[str], Awaitable[None]]):
+        """Register a coroutine function for phases run in the background."""
+        self._update_listeners.append(listener)
+
+    def _touch(self, game_id: str):
+        """Record activity on a game so it is not swept as idle."""
+        self.last_activity[game_id] = time.monotonic()
+
+    def _ttl_for(self, game: GameState) -> float:
+        """Get the idle TTL that applies to a game in its current status."""
+        if game.status == "finished":
+            return FINISHED_GAME_TTL
+        if game.status == "lobby":
+            return LOBBY_GAME_TTL
+        return IDLE_GAME_TTL
+
+    def sweep_expired(self, now: float | None = None) -> list[str]:
+        """Evict finished, abandoned and idle games whose TTL has passed.
+
+        Games with a phase in flight or a background driver are never evicted. Eviction listeners
+        are told about every evicted game.
+        """
+        if now is None:
+            now = time.monotonic()
+
+        busy = set(self._phases.values()) | set(self._drivers)
+        expired = [
+            game_id
+            for game_id, game in self.games.items()
+            if game_id not in busy
+            and now - self.last_activity.get(game_id, now) >= self._ttl_for(game)
+        ]
+        for game_id in expired:
+            self.delete_game(game_id)
+            for listener in self._evict_listeners:
+                listener(game_id)
+        return expired
+
+    def stats(self) -> dict:
+        """Get live game counts for monitoring."""
+        by_status = Counter(g.status for g in self.games.values())
+        return {
+            "liveGames": len(self.games),
+            "maxLiveGames": MAX_LIVE_GAMES,
+            "byStatus": dict(by_status),
+            "conversationHistories": len(self.llm.histories),
+            "historySize": self.llm.histories.size(),
+            "pendingTurns": self.llm.pending_turn_count(),
+            "providers": self.llm.providers.loaded(),
+            "prefetching": len(self._prefetches),
+            "prefetches": dict(self.prefetch_stats),
+            "draining": self.draining,
+            "phasesInFlight": len(self._phases),
+            "backgroundGames": len(self._drivers),
+        }
+
+    def create_game(
+        self,
+        models: list[str] | None = None,
+        seed: int | None = None,
+        difficulty: str | None = None,
+        tags: list[str] | None = None,
+        imposters: int | None = None,
+        priority: str = "interactive",
+    ) -> GameState:
+        """Create a new game with one player per model.
+
+        The game's tasks are drawn from the task registry with a seeded RNG,
+        optionally restricted to a difficulty and a set of tags. Imposters
+        default to one per five players and must stay a minority. The
+        priority class ('interactive' or 'batch') sets the game's share of
+        provider and sandbox capacity.
+        """
         if models is None:
             models = DEFAULT_MODELS
 
-        if len(models) != 4:
-            raise ValueError("Exactly 4 models are required")
+        if not MIN_PLAYERS <= len(models) <= MAX_PLAYERS:
+            raise ValueError(f"Between {MIN_PLAYERS} and {MAX_PLAYERS} models are required")
+        if imposters is None:
+            imposters = max(1, len(models) // 5)
+        if not 1 <= imposters < (len(models) + 1) // 2:
+            raise ValueError(f"{imposters} imposters is not a minority of {len(models)} players")
+        if priority not in PRIORITY_WEIGHTS:
+            raise ValueError(f"Unknown priority {priority!r}; use one of {', '.join(PRIORITY_WEIGHTS)}")
+
+        if len(self.games) >= MAX_LIVE_GAMES:
+            self.sweep_expired()
+            if len(self.games) >= MAX_LIVE_GAMES:
+                raise GameCapacityError(
+                    f"Server is at capacity ({MAX_LIVE_GAMES} live games)"
+                )
+
+        if seed is None:
+            seed = random.getrandbits(32)
+        task_ids = task_registry.select(ROUNDS_PER_GAME, seed, difficulty, tags)
 
         game_id = str(uuid.uuid4())[:8]
-        imposter_index = random.randint(0, 3)
+        imposter_indices = sorted(random.sample(range(len(models)), imposters))
 
         players = [
-            Player(index=i, name=f"Player {i + 1}", model=models[i])
-            for i in range(4)
+            Player(index=i, name=f"Player {i + 1}", model=model)
+            for i, model in enumerate(models)
         ]
 
         game_state = GameState(
@@ -56,66 +240,101 @@ class GameManager:
             currentRound=0,
             currentPhase="lobby",
             players=players,
-            imposterIndex=imposter_index,
+            imposterIndices=imposter_indices,
             rounds=[],
             winner=None,
             eliminatedPlayer=None,
             failedTaskCount=0,
             discussionRoundNumber=1,
+            taskIds=task_ids,
+            priority=priority,
         )
 
         self.games[game_id] = game_state
+        self._touch(game_id)
         return game_state
 
     def get_game(self, game_id: str) -> GameState | None:
         """Get game state by ID."""
-        return self.games.get(game_id)
+        return self._lookup(game_id)
 
-    def get_game_response(self, game_id: str) -> GameStateResponse | None:
-        """Get game state response, hiding imposter if game not finished."""
+    def _lookup(self, game_id: str) -> GameState | None:
+        """Get a live game, restoring it from a checkpoint left by another process."""
         game = self.games.get(game_id)
+        if game is None and not self.draining:
+            checkpoint = checkpoint_store.claim(game_id)
+            if checkpoint is not None:
+                try:
+                    game = self._restore(checkpoint)
+                except (KeyError, TypeError, ValueError):
+                    logger.exception("Could not restore game %s", game_id)
+                    self.delete_game(game_id)
+                    checkpoint_store.quarantine(game_id, checkpoint)
+        return game
+
+    def get_game_view(self, game_id: str) -> GameView | None:
+        """Get the cached API view of a game, rebuilding it if the game changed."""
+        game = self._lookup(game_id)
         if not game:
             return None
 
-        return GameStateResponse(
-            gameId=game.gameId,
-            status=game.status,
-            currentRound=game.currentRound,
-            currentPhase=game.currentPhase,
-            players=game.players,
-            imposterIndex=game.imposterIndex if game.status == "finished" else None,
-            rounds=game.rounds,
-            winner=game.winner,
-            eliminatedPlayer=game.eliminatedPlayer,
-            failedTaskCount=game.failedTaskCount,
-            discussionRoundNumber=game.discussionRoundNumber,
+        view = self._views.get(game_id)
+        if view is not None and view.version == game.version:
+            return view
+
+        response = GameStateResponse.model_validate(
+            {
+                "gameId": game.gameId,
+                "status": game.status,
+                "currentRound": game.currentRound,
+                "totalRounds": len(game.taskIds),
+                "currentPhase": game.currentPhase,
+                "players": game.players,
+                "imposterIndex": game.imposterIndices[0] if game.status == "finished" else None,
+                "imposterIndices": game.imposterIndices if game.status == "finished" else None,
+                "rounds": game.rounds,
+                "winner": game.winner,
+                "eliminatedPlayer": game.eliminatedPlayer,
+                "failedTaskCount": game.failedTaskCount,
+                "discussionRoundNumber": game.discussionRoundNumber,
+            },
+            from_attributes=True,
         )
+        body = response.model_dump_json().encode()
+        view = GameView(
+            version=game.version,
+            # From the body, not the version: a restored or rolled-back game can
+            # reach the same version again with different state
+            etag=f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"',
+            response=response,
+            body=body,
+            update_message=f'{{"type":"game_state_update","data":{body.decode()}}}',
+        )
+        self._views[game_id] = view
+        return view
+
+    def get_game_response(self, game_id: str) -> GameStateResponse | None:
+        """Get game state response, hiding imposter if game not finished."""
+        view = self.get_game_view(game_id)
+        return view.response if view else None
 
     def start_game(self, game_id: str) -> GameState | None:
         """Start the game and begin round 1."""
-        game = self.games.get(game_id)
+        game = self._lookup(game_id)
         if not game or game.status != "lobby":
             return None
 
+        self._touch(game_id)
         game.status = "in_progress"
         game.currentRound = 1
         game.currentPhase = "coding"
 
         # Create first round
-        task_dict = TASKS[0]
-        task = Task(
-            id=task_dict["id"],
-            title=task_dict["title"],
-            functionName=task_dict["functionName"],
-            description=task_dict["description"],
-            examples=[{"input": e["input"], "output": e["output"]} for e in task_dict["examples"]],
-            test_cases=[{"input": t["input"], "expected": t["expected"]} for t in task_dict["test_cases"]],
-        )
-
         game.rounds.append(
-            Round(roundNumber=1, task=task)
+            Round(roundNumber=1, task=task_registry.get_model(game.taskIds[0]))
         )
 
+        game.version += 1
         return game
 
     def _get_current_round(self, game: GameState) -> Round | None:
@@ -126,44 +345,175 @@ class GameManager:
 
     def _get_current_task_dict(self, game: GameState) -> dict | None:
         """Get the current task dictionary."""
-        if game.currentRound < 1 or game.currentRound > len(TASKS):
+        if game.currentRound < 1 or game.currentRound > len(game.taskIds):
             return None
-        return TASKS[game.currentRound - 1]
+        return task_registry.get(game.taskIds[game.currentRound - 1])
 
     async def advance_phase(self, game_id: str) -> GameState | None:
         """Advance to the next phase of the game."""
-        game = self.games.get(game_id)
+        game = self._lookup(game_id)
         if not game or game.status != "in_progress":
             return None
 
+        self._touch(game_id)
         current_round = self._get_current_round(game)
         task_dict = self._get_current_task_dict(game)
 
         if not current_round or not task_dict:
             return None
 
+        if checkpoint_store.enabled:
+            self._phase_start[game_id] = {
+                "game": game_to_dict(game),
+                "history": self.llm.histories.snapshot(game_id),
+            }
+        with log_context(gameId=game_id, round=game.currentRound, phase=game.currentPhase):
+            # Its own task, so a drain can cancel the phase without cancelling the caller
+            phase = asyncio.create_task(self._run_phase(game, current_round, task_dict))
+        self._phases[phase] = game_id
+        try:
+            await phase
+        except asyncio.CancelledError:
+            if phase.cancelled() and not asyncio.current_task().cancelling():
+                raise PhaseCancelledError(f"Phase of game {game_id} was cancelled by a drain") from None
+            raise
+        finally:
+            # Phases can mutate the game before failing part-way, so always
+            # invalidate cached views.
+            game.version += 1
+            self._touch(game_id)
+            self._phases.pop(phase, None)
+            if game_id not in self._phases.values():
+                self._phase_start.pop(game_id, None)
+        self._start_prefetch(game)
+        return game
+
+    def runs_in_background(self, game: GameState) -> bool:
+        """Whether a game's phases are driven in the background rather than by its client.
+
+        Games whose calls go through provider batch APIs may wait hours for
+        a phase, longer than any client should hold a request open.
+        """
+        return self.llm.uses_batches(game)
+
+    def advance_in_background(self, game_id: str) -> GameState | None:
+        """Start playing a game through to the end in the background, if not already."""
+        game = self._lookup(game_id)
+        if not game or game.status != "in_progress":
+            return None
+        if game_id not in self._drivers:
+            self._touch(game_id)
+            self._drivers[game_id] = asyncio.create_task(self._drive(game_id))
+        return game
+
+    async def _drive(self, game_id: str):
+        """Advance a game phase by phase until it ends, fails or the server drains."""
+        try:
+            while not self.draining:
+                game = self.games.get(game_id)
+                if game is None or game.status != "in_progress":
+                    break
+                try:
+                    await self.advance_phase(game_id)
+                except PhaseCancelledError:
+                    break  # Checkpointed by the drain, driven on by the next process
+                except Exception:
+                    # The next advance request starts a new driver, reusing completed turns
+                    logger.exception("Background phase of game %s failed", game_id)
+                    break
+                for listener in self._update_listeners:
+                    await listener(game_id)
+        finally:
+            self._drivers.pop(game_id, None)
+
+    def _last_round_outcome(self, game: GameState) -> tuple[int | None, bool | None, bool]:
+        """Who was eliminated in the previous round, whether its solution passed
+        and whether the eliminated player was an imposter."""
+        if game.currentRound <= 1:
+            return None, None, False
+        prev_round = game.rounds[game.currentRound - 2]
+        last_task_passed = prev_round.testResults.passed if prev_round.testResults else None
+        eliminated_player = prev_round.eliminatedPlayer
+        return eliminated_player, last_task_passed, eliminated_player in game.imposterIndices
+
+    def _phase_turns(self, game: GameState):
+        """Coroutine computing the current phase's player turns, or None if it makes no LLM calls."""
+        current_round = self._get_current_round(game)
+        task_dict = self._get_current_task_dict(game)
+        if not current_round or not task_dict:
+            return None
+        if game.currentPhase == "coding":
+            return self.llm.coding_turns(game, task_dict, *self._last_round_outcome(game))
+        if game.currentPhase == "discussion":
+            return self.llm.discussion_turns(
+                game, task_dict, game.discussionRoundNumber, current_round.discussion
+            )
+        if game.currentPhase == "voting":
+            return self.llm.vote_turns(game, task_dict, current_round.discussion)
+        return None
+
+    def _start_prefetch(self, game: GameState):
+        """Speculatively start the next phase's LLM calls in the background."""
+        if not SPECULATIVE_PREFETCH or game.status != "in_progress":
+            return
+        self._discard_prefetch(game.gameId)
+        turns = self._phase_turns(game)
+        if turns is not None:
+            with log_context(gameId=game.gameId, round=game.currentRound, phase=game.currentPhase, prefetch=True):
+                # The task copies the current context, fields included
+                self._prefetches[game.gameId] = (game.version, asyncio.create_task(turns))
+
+    def _discard_prefetch(self, game_id: str):
+        prefetch = self._prefetches.pop(game_id, None)
+        if prefetch is None:
+            return
+        task = prefetch[1]
+        if not task.done():
+            task.cancel()
+        elif not task.cancelled():
+            task.exception()  # Retrieve it so a failed prefetch is not reported as unhandled
+        self.prefetch_stats["discarded"] += 1
+
+    async def _take_prefetch(self, game: GameState) -> list[PlayerTurn] | None:
+        """Get the prefetched turns for the current phase, if still valid."""
+        prefetch = self._prefetches.get(game.gameId)
+        if prefetch is None:
+            return None
+        if prefetch[0] != game.version:
+            # The game changed after the calls were started
+            self._discard_prefetch(game.gameId)
+            return None
+        del self._prefetches[game.gameId]
+        try:
+            turns = await prefetch[1]
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.warning("Prefetched turns for game %s failed; retrying", game.gameId, exc_info=True)
+            self.prefetch_stats["failed"] += 1
+            return None
+        self.prefetch_stats["used"] += 1
+        return turns
+
+    async def _run_phase(self, game: GameState, current_round: Round, task_dict: dict):
+        """Run the current phase and move the game to the next one."""
+        turns = await self._take_prefetch(game)
+
         if game.currentPhase == "coding":
             # Get context from previous round if applicable
-            eliminated_player = None
-            last_task_passed = None
-            if game.currentRound > 1:
-                prev_round = game.rounds[game.currentRound - 2]
-                if prev_round.testResults:
-                    last_task_passed = prev_round.testResults.passed
-                # Check if someone was eliminated in the previous round
-                # (eliminatedPlayer is set when elimination happens)
-                for player_idx, vote_count in prev_round.suspectVotes.items():
-                    active_count = sum(1 for p in game.players if not p.isEliminated or p.index == player_idx)
-                    if vote_count >= active_count // 2 + 1:
-                        eliminated_player = player_idx
-                        break
-            
+            eliminated_player, last_task_passed, eliminated_imposter = self._last_round_outcome(game)
+
             # Get code submissions from all players
-            submissions = await self.llm.get_code_submissions(game, task_dict, eliminated_player, last_task_passed)
+            submissions = await self.llm.get_code_submissions(
+                game, task_dict, eliminated_player, last_task_passed, eliminated_imposter, turns=turns
+            )
             current_round.submissions = submissions
             game.currentPhase = "reveal"
 
         elif game.currentPhase == "reveal":
+            # Fuzz the submissions in the background while the players talk
+            self._start_fuzz(game, current_round, task_dict)
+
             # Show code to all players
             await self.llm.show_code_reveal(
                 game, task_dict, current_round.submissions
@@ -178,6 +528,7 @@ class GameManager:
                 task_dict,
                 game.discussionRoundNumber,
                 current_round.discussion,
+                turns=turns,
             )
             current_round.discussion.extend(messages)
 
@@ -189,22 +540,37 @@ class GameManager:
         elif game.currentPhase == "voting":
             # Get votes from all players
             votes = await self.llm.get_votes(
-                game, task_dict, current_round.discussion
+                game, task_dict, current_round.discussion, turns=turns
             )
             current_round.votes = votes
 
-            # Tally solution votes
-            solution_votes = Counter(v.solutionVote for v in votes)
-            chosen_solution = solution_votes.most_common(1)[0][0]
-            current_round.chosenSubmission = chosen_solution
-
-            # Tally suspect votes
-            suspect_votes = Counter(v.suspectVote for v in votes)
-            current_round.suspectVotes = dict(suspect_votes)
+            solution_counts, suspect_counts = tally_votes(votes, len(game.players))
+            # Most votes wins; ties go to the lower player index
+            current_round.chosenSubmission = max(
+                range(len(solution_counts)), key=solution_counts.__getitem__
+            ) if votes else None
+            current_round.suspectVotes = {
+                player: count for player, count in enumerate(suspect_counts) if count
+            }
 
             game.currentPhase = "results"
 
         elif game.currentPhase == "results":
+            if game.gameId not in self._fuzz_jobs and current_round.fuzzResults is None:
+                # Fuzzing started in the reveal phase did not survive a restart
+                self._start_fuzz(game, current_round, task_dict)
+            fuzz_job = self._fuzz_jobs.get(game.gameId)
+            if fuzz_job is not None:
+                try:
+                    # Shielded, so a cancelled phase leaves the job for the next attempt
+                    current_round.fuzzResults = await asyncio.shield(fuzz_job)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    self._fuzz_jobs.pop(game.gameId, None)
+                    raise
+                self._fuzz_jobs.pop(game.gameId, None)
+
             # Run tests on chosen solution
             chosen_idx = current_round.chosenSubmission
             if chosen_idx is not None:
@@ -213,37 +579,43 @@ class GameManager:
                     None,
                 )
                 if chosen_submission:
-                    test_result = run_tests(
-                        chosen_submission.code,
-                        task_dict["functionName"],
-                        task_dict["test_cases"],
-                    )
+                    # Workers run in parallel; keep the event loop free meanwhile
+                    async with scheduler.slot("sandbox", game.gameId, game.priority):
+                        test_result = await asyncio.to_thread(
+                            self._test_submission,
+                            chosen_submission.code,
+                            task_dict,
+                            f"{game.gameId}:{current_round.roundNumber}",
+                        )
                     current_round.testResults = test_result
 
                     if not test_result.passed:
                         game.failedTaskCount += 1
 
-            # Check for elimination (majority suspect vote)
-            suspect_votes = current_round.suspectVotes
+            # Check for elimination (majority suspect vote); at most one player can have it
             active_players = sum(1 for p in game.players if not p.isEliminated)
             majority = active_players // 2 + 1
-
-            for player_idx, vote_count in suspect_votes.items():
+            for player_idx, vote_count in current_round.suspectVotes.items():
                 if vote_count >= majority:
                     game.players[player_idx].isEliminated = True
                     game.eliminatedPlayer = player_idx
+                    current_round.eliminatedPlayer = player_idx
+                    active_players -= 1
                     break
 
             # Check win conditions
-            if game.eliminatedPlayer == game.imposterIndex:
+            imposters_left = sum(
+                1 for i in game.imposterIndices if not game.players[i].isEliminated
+            )
+            if imposters_left == 0:
                 game.winner = "crewmates"
                 game.status = "finished"
                 game.currentPhase = "finished"
-            elif game.failedTaskCount >= 3:
-                game.winner = "imposter"
-                game.status = "finished"
-                game.currentPhase = "finished"
-            elif game.currentRound >= 5:
+            elif (
+                game.failedTaskCount >= 3
+                or imposters_left >= active_players - imposters_left
+                or game.currentRound >= len(game.taskIds)
+            ):
                 game.winner = "imposter"
                 game.status = "finished"
                 game.currentPhase = "finished"
@@ -254,24 +626,147 @@ class GameManager:
                 game.discussionRoundNumber = 1
 
                 # Create next round
-                next_task_dict = TASKS[game.currentRound - 1]
-                next_task = Task(
-                    id=next_task_dict["id"],
-                    title=next_task_dict["title"],
-                    functionName=next_task_dict["functionName"],
-                    description=next_task_dict["description"],
-                    examples=[{"input": e["input"], "output": e["output"]} for e in next_task_dict["examples"]],
-                    test_cases=[{"input": t["input"], "expected": t["expected"]} for t in next_task_dict["test_cases"]],
-                )
+                next_task = task_registry.get_model(game.taskIds[game.currentRound - 1])
                 game.rounds.append(Round(roundNumber=game.currentRound, task=next_task))
 
+    @staticmethod
+    def _test_submission(code: str, task_dict: dict, seed: str) -> TestResult:
+        """Run a task's tests on code, measuring its efficiency in efficiency mode."""
+        efficiency_inputs = scaled_inputs(task_dict, seed) if EFFICIENCY_MODE else None
+        return run_tests(
+            code,
+            task_dict["functionName"],
+            task_dict["test_cases"],
+            efficiency_inputs=efficiency_inputs,
+        )
+
+    def _start_fuzz(self, game: GameState, current_round: Round, task_dict: dict):
+        """Start differential fuzzing of the round's submissions, if the task supports it."""
+        if not can_fuzz(task_dict) or not current_round.submissions:
+            return
+        previous = self._fuzz_jobs.pop(game.gameId, None)
+        if previous is not None:
+            previous.cancel()
+        self._fuzz_jobs[game.gameId] = asyncio.create_task(
+            self._fuzz(
+                game,
+                task_dict,
+                [(s.playerIndex, s.code) for s in current_round.submissions],
+                f"{game.gameId}:{current_round.roundNumber}",
+            )
+        )
+
+    @staticmethod
+    async def _fuzz(game: GameState, task_dict: dict, submissions: list[tuple[int, str]], seed: str):
+        # Time spent waiting for a fuzzing slot counts against the round's budget
+        deadline = time.monotonic() + FUZZ_TIME_BUDGET
+        async with scheduler.slot("fuzz", game.gameId, game.priority):
+            budget = max(0.0, deadline - time.monotonic())
+            return await asyncio.to_thread(fuzz_submissions, task_dict, submissions, seed, budget)
+
+    def checkpoint(self, game_id: str, background: bool = False, phase_start: dict | None = None) -> int:
+        """Save a game, its histories and any completed turns of its current phase.
+
+        ``phase_start`` is the game and history captured when a cancelled
+        phase started; they are saved in place of the live game, which the
+        phase may have changed part-way. ``background`` records that the game
+        was being played in the background, so the restoring process carries
+        on playing it. Returns the saved game's version.
+        """
+        if phase_start is None:
+            phase_start = {
+                "game": game_to_dict(self.games[game_id]),
+                "history": self.llm.histories.snapshot(game_id),
+            }
+        checkpoint_store.save(
+            game_id,
+            {
+                **phase_start,
+                "pendingTurns": self.llm.pending_snapshot(game_id),
+                "background": background,
+            },
+        )
+        return phase_start["game"]["version"]
+
+    def _restore(self, checkpoint: dict) -> GameState:
+        game = game_from_dict(checkpoint["game"])
+        game_id = game.gameId
+        self.games[game_id] = game
+        if checkpoint.get("history") is not None:
+            self.llm.histories.restore(game_id, checkpoint["history"])
+        if checkpoint.get("pendingTurns") is not None:
+            self.llm.restore_pending(game_id, checkpoint["pendingTurns"])
+        self._touch(game_id)
+        logger.info("Restored game %s at version %d", game_id, game.version)
+        if checkpoint.get("background"):
+            self.advance_in_background(game_id)
         return game
 
+    def restore_checkpoints(self) -> int:
+        """Restore every game checkpointed by a previous process; returns how many."""
+        restored = 0
+        for game_id in checkpoint_store.pending():
+            if game_id not in self.games and self._lookup(game_id) is not None:
+                restored += 1
+        return restored
+
+    async def drain(self, timeout: float = DRAIN_TIMEOUT) -> dict[str, str]:
+        """Stop taking game requests, let in-flight phases finish, then checkpoint.
+
+        Phases still running after ``timeout`` seconds are cancelled, and
+        their games are checkpointed as they were when the phase started,
+        with the turns completed so far. Every game is then saved and dropped
+        from memory, for another process to pick up. Returns a resume token
+        per game.
+        """
+        self.draining = True
+        background = set(self._drivers)
+        rolled_back: dict[str, dict] = {}
+        if self._phases:
+            _, still_running = await asyncio.wait(set(self._phases), timeout=timeout)
+            if still_running:
+                logger.warning("Cancelling %d phases still in flight", len(still_running))
+                for phase in still_running:
+                    game_id = self._phases[phase]
+                    if game_id in self._phase_start:
+                        rolled_back[game_id] = self._phase_start[game_id]
+                    phase.cancel()
+                await asyncio.wait(still_running)
+
+        tokens = {}
+        for game_id in list(self.games):
+            version = self.games[game_id].version
+            if checkpoint_store.enabled:
+                version = self.checkpoint(game_id, game_id in background, rolled_back.get(game_id))
+            tokens[game_id] = resume_token(game_id, version)
+            self.delete_game(game_id)
+        logger.info("Drained %d games", len(tokens))
+        return tokens
+
+    def check_resume_token(self, game: GameState, token: str) -> bool:
+        """Whether a client's resume token is for this game at a version it has reached.
+
+        A game restored behind the version a client already saw has lost
+        progress, so that client's token does not match.
+        """
+        game_id, _, version = token.rpartition(":")
+        return game_id == game.gameId and version.isdigit() and int(version) <= game.version
+
     def delete_game(self, game_id: str):
         """Delete a game and clean up resources."""
         if game_id in self.games:
             self.llm.cleanup_game(game_id)
             del self.games[game_id]
+        self.last_activity.pop(game_id, None)
+        self._views.pop(game_id, None)
+        fuzz_job = self._fuzz_jobs.pop(game_id, None)
+        if fuzz_job is not None:
+            fuzz_job.cancel()
+        driver = self._drivers.pop(game_id, None)
+        if driver is not None and driver is not asyncio.current_task():
+            driver.cancel()
+        self._discard_prefetch(game_id)
+        scheduler.forget(game_id)
 
 
 # Global game manager instance
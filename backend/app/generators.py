@@ -0,0 +1,126 @@
+"""Random input generation and shrinking for task functions.
+
+A task describes its inputs either declaratively, as a list of argument
+specs under ``"inputs"``::
+
+    {"type": "int", "min": 0, "max": 100}
+    {"type": "str", "alphabet": "ab ", "max_len": 30}
+    {"type": "list", "items": {"type": "int", "min": -5, "max": 5}, "max_len": 30}
+
+or with Python source under ``"generator"`` defining
+``generate(rng, size, exact=False) -> list`` for inputs that need structure
+(valid Roman numerals, nested brackets). Task definitions are trusted, so
+generator source runs in-process.
+"""
+
+import random
+from typing import Any, Callable
+
+Generator = Callable[..., list[Any]]
+
+# Upper bound on candidates tried per shrinking step
+MAX_SHRINK_CANDIDATES = 64
+
+# Compiled generators and references, per task id
+_generators: dict[str, Generator | None] = {}
+_references: dict[str, Callable[..., Any] | None] = {}
+
+
+def _generate_value(spec: dict, rng: random.Random, size: int, exact: bool) -> Any:
+    kind = spec["type"]
+    if kind == "int":
+        low = spec.get("min", 0)
+        if exact:
+            return low + size
+        high = min(spec.get("max", low + size), low + size)
+        return rng.randint(low, max(low, high))
+    if kind == "str":
+        alphabet = spec.get("alphabet", "abcdefghijklmnopqrstuvwxyz")
+        length = size if exact else rng.randint(0, min(size, spec.get("max_len", size)))
+        return "".join(rng.choice(alphabet) for _ in range(length))
+    if kind == "list":
+        length = size if exact else rng.randint(0, min(size, spec.get("max_len", size)))
+        return [_generate_value(spec["items"], rng, size, False) for _ in range(length)]
+    raise ValueError(f"Unknown input type: {kind}")
+
+
+def build_generator(task: dict) -> Generator | None:
+    """Build the input generator for a task, or None if it does not define one.
+
+    ``size`` bounds string/list lengths and integer magnitude; with
+    ``exact=True`` the generator produces inputs of exactly that size.
+    Generators are built once per task id.
+    """
+    if task["id"] not in _generators:
+        _generators[task["id"]] = _build_generator(task)
+    return _generators[task["id"]]
+
+
+def _build_generator(task: dict) -> Generator | None:
+    if "generator" in task:
+        namespace: dict[str, Any] = {}
+        exec(compile(task["generator"], f"<generator:{task['id']}>", "exec"), namespace)
+        return namespace["generate"]
+
+    specs = task.get("inputs")
+    if not specs:
+        return None
+
+    def generate(rng: random.Random, size: int, exact: bool = False) -> list[Any]:
+        return [_generate_value(spec, rng, size, exact) for spec in specs]
+
+    return generate
+
+
+def scaled_inputs(task: dict, seed: str) -> list[tuple[int, list[Any]]] | None:
+    """Inputs of exactly each of the task's ``scaling`` sizes, or None if it has none."""
+    sizes = task.get("scaling")
+    generate = build_generator(task)
+    if not sizes or generate is None:
+        return None
+    rng = random.Random(seed)
+    return [(size, generate(rng, size, exact=True)) for size in sizes]
+
+
+def load_reference(task: dict) -> Callable[..., Any] | None:
+    """Load a task's reference implementation once per task id, or None if it has none."""
+    if task["id"] in _references:
+        return _references[task["id"]]
+    reference = None
+    if task.get("reference"):
+        namespace: dict[str, Any] = {}
+        exec(compile(task["reference"], f"<reference:{task['id']}>", "exec"), namespace)
+        reference = namespace[task["functionName"]]
+    _references[task["id"]] = reference
+    return reference
+
+
+def _shrink_value(value: Any) -> list[Any]:
+    """Smaller variants of a single value, most aggressive first."""
+    if isinstance(value, bool):
+        return [False] if value else []
+    if isinstance(value, int):
+        candidates = [0, value // 2, value - 1 if value > 0 else value + 1]
+        return [c for c in dict.fromkeys(candidates) if abs(c) < abs(value)]
+    if isinstance(value, (str, list)):
+        n = len(value)
+        if n == 0:
+            return []
+        candidates = [value[: n // 2], value[n // 2 :]]
+        candidates += [value[:i] + value[i + 1 :] for i in range(n)]
+        if isinstance(value, list):
+            for i, item in enumerate(value):
+                candidates += [value[:i] + [smaller] + value[i + 1 :] for smaller in _shrink_value(item)]
+        return candidates
+    return []
+
+
+def shrink_candidates(args: list[Any]) -> list[list[Any]]:
+    """Candidate argument lists that are one step smaller than ``args``."""
+    candidates = []
+    for position, value in enumerate(args):
+        for smaller in _shrink_value(value):
+            candidates.append(args[:position] + [smaller] + args[position + 1 :])
+            if len(candidates) >= MAX_SHRINK_CANDIDATES:
+                return candidates
+    return candidates
@@ -0,0 +1,110 @@
+"""Per-player conversation histories built from shared segments.
+
+Most of a game's prompt text is identical for every player: the coding
+prompt, the reveal of all submissions and each discussion prompt. A game's
+history therefore keeps one interned, immutable ``Segment`` per distinct
+(role, text) pair. Each player holds only a list of references into that
+pool. Provider message lists are materialized from the references at call
+time, so shared text is stored once per game rather than once per player.
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class Segment:
+    role: str  # 'user' | 'assistant'
+    content: str
+
+
+class GameHistory:
+    """Interned segments for one game plus each player's reference list."""
+
+    __slots__ = ("segments", "players")
+
+    def __init__(self, player_count: int):
+        self.segments: dict[tuple[str, str], Segment] = {}
+        self.players: list[list[Segment]] = [[] for _ in range(player_count)]
+
+    def intern(self, role: str, content: str) -> Segment:
+        """Get the shared segment for a (role, content) pair."""
+        key = (role, content)
+        segment = self.segments.get(key)
+        if segment is None:
+            segment = self.segments[key] = Segment(role, content)
+        return segment
+
+    def append(self, player_index: int, role: str, content: str):
+        self.players[player_index].append(self.intern(role, content))
+
+    def messages(self, player_index: int) -> list[dict]:
+        """Materialize a player's history as provider messages."""
+        return [
+            {"role": segment.role, "content": segment.content}
+            for segment in self.players[player_index]
+        ]
+
+    def snapshot(self) -> dict:
+        """Compact, JSON-serializable copy: each segment once, players as indices."""
+        positions = {segment: i for i, segment in enumerate(self.segments.values())}
+        return {
+            "segments": [[s.role, s.content] for s in self.segments.values()],
+            "players": [[positions[s] for s in refs] for refs in self.players],
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict) -> "GameHistory":
+        history = cls(len(snapshot["players"]))
+        segments = [history.intern(role, content) for role, content in snapshot["segments"]]
+        history.players = [[segments[i] for i in refs] for refs in snapshot["players"]]
+        return history
+
+    def size(self) -> dict:
+        """Segment counts and stored text size, for monitoring."""
+        return {
+            "segments": len(self.segments),
+            "references": sum(len(refs) for refs in self.players),
+            "chars": sum(len(s.content) for s in self.segments.values()),
+        }
+
+
+class HistoryStore:
+    """Conversation histories for every live game."""
+
+    def __init__(self):
+        self.games: dict[str, GameHistory] = {}
+
+    def __len__(self) -> int:
+        return len(self.games)
+
+    def __contains__(self, game_id: str) -> bool:
+        return game_id in self.games
+
+    def init_game(self, game_id: str, player_count: int) -> GameHistory:
+        history = self.games[game_id] = GameHistory(player_count)
+        return history
+
+    def get(self, game_id: str, player_count: int) -> GameHistory:
+        """Get a game's history, creating it on first use."""
+        history = self.games.get(game_id)
+        if history is None:
+            history = self.init_game(game_id, player_count)
+        return history
+
+    def snapshot(self, game_id: str) -> dict | None:
+        history = self.games.get(game_id)
+        return history.snapshot() if history is not None else None
+
+    def restore(self, game_id: str, snapshot: dict):
+        self.games[game_id] = GameHistory.from_snapshot(snapshot)
+
+    def remove(self, game_id: str):
+        self.games.pop(game_id, None)
+
+    def size(self) -> dict:
+        """Segment counts and stored text size summed over every game, for monitoring."""
+        total = {"segments": 0, "references": 0, "chars": 0}
+        for history in self.games.values():
+            for key, value in history.size().items():
+                total[key] += value
+        return total
@@ -0,0 +1,158 @@
+"""Shared, tuned HTTP connection pools for the provider SDK clients.
+
+Every provider client is built on an HTTP client from this module rather
+than the SDK's default. There is one pool per provider, shared by every
+game, with explicit connection limits and keepalive expiry. HTTP/2 is used
+when the ``h2`` package is installed. Bursts of concurrent player calls
+then reuse warm connections, so TLS handshakes stay off the critical path.
+
+Some SDKs ship their own fork of ``httpx`` (``httpx2``) and reject clients
+from the other package, so pools are built from the client class the SDK
+expects.
+"""
+
+import functools
+import importlib
+import importlib.util
+import os
+import weakref
+from types import ModuleType
+from typing import Any
+
+import httpx
+
+# Connections per provider pool, and how many of them may idle between calls
+HTTP_MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.environ.get("HTTP_MAX_KEEPALIVE", "50"))
+# Seconds an idle connection is kept open; games idle between phases, so keep this generous
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("HTTP_KEEPALIVE_EXPIRY", "120"))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "10"))
+# "auto" enables HTTP/2 when h2 is installed; "1" requires it, "0" disables it
+HTTP_HTTP2 = os.environ.get("HTTP_HTTP2", "auto")
+# LLM calls are long; the SDKs pass their own per-request timeouts
+HTTP_READ_TIMEOUT = 600.0
+
+
+def http2_enabled() -> bool:
+    if HTTP_HTTP2 == "auto":
+        return importlib.util.find_spec("h2") is not None
+    return HTTP_HTTP2 == "1"
+
+
+def _http_module(client_class: type) -> ModuleType:
+    """The httpx-compatible package a client class is built on."""
+    base = next(c for c in client_class.__mro__ if c.__name__ == "AsyncClient")
+    return importlib.import_module(base.__module__.split(".")[0])
+
+
+class CountingTransport:
+    """Mixin for an HTTP transport that counts requests and the connections they use.
+
+    Counting relies only on the documented ``network_stream`` and
+    ``http_version`` response extensions. A response on a network stream
+    not seen before means a new connection was opened.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.requests = 0
+        self.in_flight = 0  # Requests still waiting for response headers
+        self.peak_in_flight = 0
+        self.connections_opened = 0
+        self.http2_requests = 0
+        self._streams: weakref.WeakSet = weakref.WeakSet()
+
+    async def handle_async_request(self, request):
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            response = await super().handle_async_request(request)
+        finally:
+            self.in_flight -= 1
+        self._count_connection(response.extensions)
+        return response
+
+    def _count_connection(self, extensions: dict):
+        if extensions.get("http_version") == b"HTTP/2":
+            self.http2_requests += 1
+        stream = extensions.get("network_stream")
+        if stream is not None and stream not in self._streams:
+            self._streams.add(stream)
+            self.connections_opened += 1
+
+    def metrics(self) -> dict:
+        return {
+            "requests": self.requests,
+            "inFlight": self.in_flight,
+            "peakInFlight": self.peak_in_flight,
+            "connectionsOpened": self.connections_opened,
+            # Streams of connections still open; closed ones are garbage collected
+            "openConnections": len(self._streams),
+            "http2Requests": self.http2_requests,
+            # Requests seen per connection opened; higher means more reuse
+            "reuseRatio": round(self.requests / self.connections_opened, 2)
+            if self.connections_opened
+            else None,
+        }
+
+
+@functools.cache
+def _transport_class(http: ModuleType) -> type:
+    return type("CountingTransport", (CountingTransport, http.AsyncHTTPTransport), {})
+
+
+class HttpPools:
+    """One pooled async HTTP client per provider, created on first use."""
+
+    def __init__(self):
+        self._clients: dict[str, Any] = {}
+        self._transports: dict[str, CountingTransport] = {}
+
+    def client(self, provider: str, client_class: type = httpx.AsyncClient) -> Any:
+        """Get a provider's pooled client, built as ``client_class`` on first use."""
+        client = self._clients.get(provider)
+        if client is None:
+            http = _http_module(client_class)
+            http2 = http2_enabled()
+            limits = http.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            )
+            transport = _transport_class(http)(limits=limits, http2=http2)
+            client = client_class(
+                transport=transport,
+                http2=http2,
+                limits=limits,
+                timeout=http.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+                follow_redirects=True,
+            )
+            self._clients[provider] = client
+            self._transports[provider] = transport
+        return client
+
+    def metrics(self) -> dict:
+        """Utilization of every pool created so far."""
+        return {
+            "settings": {
+                "maxConnections": HTTP_MAX_CONNECTIONS,
+                "maxKeepalive": HTTP_MAX_KEEPALIVE,
+                "keepaliveExpiry": HTTP_KEEPALIVE_EXPIRY,
+                "http2": http2_enabled(),
+            },
+            "pools": {
+                provider: transport.metrics()
+                for provider, transport in self._transports.items()
+            },
+        }
+
+    async def aclose(self):
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+        self._transports.clear()
+
+
+# Global connection pools, shared by every provider client
+http_pools = HttpPools()
@@ -1,25 +1,35 @@
 """LLM orchestration for the game."""
 
 import asyncio
-import re
-import os
+from dataclasses import asdict, dataclass
 import logging
-from anthropic import AsyncAnthropic
-from openai import AsyncOpenAI
-from google import genai
+import os
 
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.DEBUG)
 
 from .prompts import (
-    CREWMATE_SYSTEM_PROMPT,
-    IMPOSTER_SYSTEM_PROMPT,
+    get_system_prompt,
     get_coding_prompt,
     get_reveal_prompt,
     get_discussion_prompt,
     get_voting_prompt,
 )
-from .models import GameState, Submission, Message, Vote
+from .batch import BATCH_API, BatchCollector, BatchRequest, BatchRequestError
+from .budget import budget_policy
+from .history import GameHistory, HistoryStore
+from .logs import log_context, payload, sample_payload
+from .providers import provider_registry
+from .scheduler import scheduler
+from .state import GameState, Submission, Message, Vote
+from .structured import (
+    CODE_MAX_TOKENS,
+    CODE_OUTPUT,
+    VOTE_MAX_TOKENS,
+    OutputSchema,
+    StructuredOutputError,
+    response_format,
+    vote_output,
+)
 
 
 # Provider detection based on model name
@@ -34,57 +44,91 @@ def get_provider(model: str) -> str:
         return "google"
     elif "deepseek" in model_lower:
         return "deepseek"
+    elif model_lower.startswith("mock"):
+        return "mock"
     else:
         return "anthropic"  # Default fallback
 
 
+# Concurrent provider calls per game phase; large lobbies fan out in waves
+LLM_FANOUT_LIMIT = int(os.environ.get("LLM_FANOUT_LIMIT", "8"))
+
+
+class EmptyResponseError(ValueError):
+    """Raised when a provider returns no answer text, e.g. after spending the cap on reasoning."""
+
+
+@dataclass(slots=True)
+class PlayerTurn:
+    """A player's prompt and response, not yet added to their history."""
+
+    playerIndex: int
+    prompt: str
+    response: str
+
+
 class LLMOrchestrator:
     """Orchestrates LLM calls for all players."""
 
     def __init__(self):
-        self.anthropic_client = AsyncAnthropic()
-        self.openai_client = AsyncOpenAI()
-        self.deepseek_client = AsyncOpenAI(
-            api_key=os.environ.get("DEEPSEEK_API_KEY", ""),
-            base_url="https://api.deepseek.com"
-        )
-        self.google_client = genai.Client()
-        self.conversation_histories: dict[str, list[list[dict]]] = {}
-
-    def _get_system_prompt(self, player_index: int, is_imposter: bool) -> str:
+        # Provider clients are built on first use
+        self.providers = provider_registry
+        self.histories = HistoryStore()
+        # Turns completed so far in each game's current phase, kept until the
+        # phase is committed so a failed phase can be retried without them
+        self._pending: dict[str, tuple[tuple, dict[int, PlayerTurn]]] = {}
+        # Batch requests each game's current phase is waiting on, by player,
+        # with their prompts; checkpointed so a restart can resume them
+        self._batched: dict[str, tuple[tuple, dict[int, tuple[str, BatchRequest]]]] = {}
+        # Batch requests restored from a checkpoint, not yet waited on again
+        self._resumable: dict[str, tuple[tuple, dict[int, dict]]] = {}
+        self.batches = BatchCollector(self._complete_request)
+
+    def _get_system_prompt(self, game_state: GameState, player_index: int) -> str:
         """Get the appropriate system prompt for a player."""
-        if is_imposter:
-            return IMPOSTER_SYSTEM_PROMPT.format(player_index=player_index + 1)
-        return CREWMATE_SYSTEM_PROMPT.format(player_index=player_index + 1)
-
-    def _init_game_histories(self, game_id: str):
-        """Initialize conversation histories for a new game."""
-        self.conversation_histories[game_id] = [[] for _ in range(4)]
-
-    def _add_to_history(
-        self, game_id: str, player_index: int, role: str, content: str
-    ):
-        """Add a message to a player's conversation history."""
-        if game_id not in self.conversation_histories:
-            self._init_game_histories(game_id)
-        self.conversation_histories[game_id][player_index].append(
-            {"role": role, "content": content}
+        return get_system_prompt(
+            player_index,
+            game_state.imposterIndices,
+            [get_provider(p.model) for p in game_state.players],
+            len(game_state.taskIds),
         )
 
+    def _history(self, game_state: GameState) -> GameHistory:
+        """Get a game's conversation histories, creating them on first use."""
+        return self.histories.get(game_state.gameId, len(game_state.players))
+
     async def _call_anthropic(
         self,
         model: str,
         system_prompt: str,
         messages: list[dict],
         max_tokens: int = 1024,
-    ) -> str:
-        """Make an Anthropic API call."""
-        response = await self.anthropic_client.messages.create(
+        output: OutputSchema | None = None,
+    ) -> str | dict:
+        """Make an Anthropic API call.
+
+        With ``output``, the model is made to call a tool taking the schema
+        as input, and the tool input is returned.
+        """
+        client = self.providers.client("anthropic")
+        options = {}
+        if output is not None:
+            options["tools"] = [
+                {"name": output.name, "description": output.description, "input_schema": output.schema}
+            ]
+            options["tool_choice"] = {"type": "tool", "name": output.name}
+        response = await client.messages.create(
             model=model,
             max_tokens=max_tokens,
             system=system_prompt,
             messages=messages,
+            **options,
         )
+        if output is not None:
+            for block in response.content:
+                if block.type == "tool_use":
+                    return block.input
+            raise StructuredOutputError(f"Anthropic returned no {output.name} call for model {model}")
         return response.content[0].text
 
     async def _call_openai(
@@ -93,28 +137,45 @@ class LLMOrchestrator:
         system_prompt: str,
         messages: list[dict],
         max_tokens: int = 1024,
-        client: AsyncOpenAI | None = None,
+        provider: str = "openai",
+        phase: str = "coding",
+        output: OutputSchema | None = None,
     ) -> str:
-        """Make an OpenAI-compatible API call (works for OpenAI and DeepSeek)."""
-        if client is None:
-            client = self.openai_client
-        
+        """Make an OpenAI-compatible API call (works for OpenAI and DeepSeek).
+
+        With ``output``, OpenAI decodes against the schema in strict mode.
+        DeepSeek only has JSON mode, so the prompt describes the object and
+        the response is checked against the schema afterwards.
+        """
+        client = self.providers.client(provider)
+
         formatted_messages = [{"role": "system", "content": system_prompt}]
         formatted_messages.extend(messages)
-        
-        # GPT-5 is a reasoning model, needs more tokens for reasoning + output
-        actual_max_tokens = max_tokens * 4 if "gpt-5" in model.lower() else max_tokens
-        
+
+        # Reasoning models spend part of the cap thinking; budget it per phase
+        budget = budget_policy.budget(provider, model, phase, max_tokens)
+        options = {"reasoning_effort": budget.effort} if budget.effort else {}
+        if output is not None:
+            options["response_format"] = response_format(provider, output)
+
         response = await client.chat.completions.create(
             model=model,
-            max_completion_tokens=actual_max_tokens,
+            max_completion_tokens=budget.max_tokens,
             messages=formatted_messages,
+            **options,
         )
-        logger.debug(f"OpenAI response for {model}: {response}")
-        content = response.choices[0].message.content
+        if sample_payload(logger):
+            logger.debug("OpenAI response for %s", model, extra=payload(response))
+        details = response.usage and response.usage.completion_tokens_details
+        reasoning_tokens = details.reasoning_tokens if details else None
+        message = response.choices[0].message
+        content = message.content
+        budget_policy.observe(provider, model, phase, reasoning_tokens, empty=not content)
+        if getattr(message, "refusal", None):
+            raise StructuredOutputError(f"{model} refused: {message.refusal}")
         if not content:
-            logger.error(f"OpenAI returned empty content. Full response: {response}")
-            raise ValueError(f"OpenAI API returned empty content for model {model}")
+            logger.error("OpenAI returned empty content for %s", model, extra=payload(response))
+            raise EmptyResponseError(f"OpenAI API returned empty content for model {model}")
         return content
 
     async def _call_google(
@@ -123,45 +184,59 @@ class LLMOrchestrator:
         system_prompt: str,
         messages: list[dict],
         max_tokens: int = 1024,
+        phase: str = "coding",
+        output: OutputSchema | None = None,
     ) -> str:
-        """Make a Google Gemini API call."""
+        """Make a Google Gemini API call, decoding against ``output``'s schema if given."""
+        client = self.providers.client("google")
+        from google.genai import types
+
         # Build contents from messages
         contents = []
         for msg in messages:
             role = "user" if msg["role"] == "user" else "model"
-            contents.append(genai.types.Content(
+            contents.append(types.Content(
                 role=role,
-                parts=[genai.types.Part(text=msg["content"])]
+                parts=[types.Part(text=msg["content"])]
             ))
         
-        # Run sync client in thread pool
-        def sync_call():
-            # Gemini 2.5 is a reasoning model, needs more tokens for thinking + output
-            actual_max_tokens = max_tokens * 8 if "2.5" in model or "3" in model else max_tokens
-            
-            response = self.google_client.models.generate_content(
-                model=model,
-                contents=contents,
-                config=genai.types.GenerateContentConfig(
-                    system_instruction=system_prompt,
-                    max_output_tokens=actual_max_tokens,
-                ),
-            )
-            logger.debug(f"Google raw response for {model}: candidates={response.candidates}, text={getattr(response, 'text', None)}")
-            
-            # Check for blocked content or other issues
-            if response.candidates:
-                candidate = response.candidates[0]
-                logger.debug(f"Google candidate: finish_reason={candidate.finish_reason}, content={candidate.content}")
-                if candidate.content and candidate.content.parts:
-                    text = candidate.content.parts[0].text
-                    if text:
-                        return text
-            
-            logger.error(f"Google returned no usable content. Full response: {response}")
-            raise ValueError(f"Google API returned empty content for model {model}. Response: {response}")
-        
-        return await asyncio.to_thread(sync_call)
+        # Thinking tokens count toward the output cap; budget them per phase
+        budget = budget_policy.budget("google", model, phase, max_tokens)
+        thinking_config = None
+        if budget.thinking_tokens is not None:
+            thinking_config = types.ThinkingConfig(thinking_budget=budget.thinking_tokens)
+        schema_config = {}
+        if output is not None:
+            schema_config = {"response_mime_type": "application/json", "response_json_schema": output.schema}
+
+        # The async API shares the pooled HTTP client instead of a thread per call
+        response = await client.aio.models.generate_content(
+            model=model,
+            contents=contents,
+            config=types.GenerateContentConfig(
+                system_instruction=system_prompt,
+                max_output_tokens=budget.max_tokens,
+                thinking_config=thinking_config,
+                **schema_config,
+            ),
+        )
+        if sample_payload(logger):
+            logger.debug("Google response for %s", model, extra=payload(response))
+        usage = response.usage_metadata
+        reasoning_tokens = usage.thoughts_token_count if usage else None
+
+        # Check for blocked content or other issues
+        if response.candidates:
+            candidate = response.candidates[0]
+            if candidate.content and candidate.content.parts:
+                text = candidate.content.parts[0].text
+                if text:
+                    budget_policy.observe("google", model, phase, reasoning_tokens)
+                    return text
+
+        budget_policy.observe("google", model, phase, reasoning_tokens, empty=True)
+        logger.error("Google returned no usable content for %s", model, extra=payload(response))
+        raise EmptyResponseError(f"Google API returned empty content for model {model}")
 
     async def _call_llm(
         self,
@@ -169,108 +244,362 @@ class LLMOrchestrator:
         system_prompt: str,
         messages: list[dict],
         max_tokens: int = 1024,
+        phase: str = "coding",
+        output: OutputSchema | None = None,
+    ) -> str:
+        """Make an LLM API call to the appropriate provider.
+
+        ``phase`` selects the reasoning budget. With ``output``, the response
+        is constrained to its schema and returned as compact JSON. A response
+        left empty because reasoning used up the cap, or one that does not
+        match the schema, is retried once.
+        """
+        try:
+            return await self._call_provider(model, system_prompt, messages, max_tokens, phase, output)
+        except (EmptyResponseError, StructuredOutputError) as e:
+            logger.warning("Retrying %s after an unusable response: %s", model, e)
+            return await self._call_provider(model, system_prompt, messages, max_tokens, phase, output)
+
+    async def _call_provider(
+        self,
+        model: str,
+        system_prompt: str,
+        messages: list[dict],
+        max_tokens: int,
+        phase: str,
+        output: OutputSchema | None = None,
     ) -> str:
-        """Make an LLM API call to the appropriate provider."""
         provider = get_provider(model)
-        
+
         if provider == "anthropic":
-            return await self._call_anthropic(model, system_prompt, messages, max_tokens)
+            response = await self._call_anthropic(model, system_prompt, messages, max_tokens, output)
         elif provider == "openai":
-            return await self._call_openai(model, system_prompt, messages, max_tokens)
+            response = await self._call_openai(
+                model, system_prompt, messages, max_tokens, phase=phase, output=output
+            )
         elif provider == "deepseek":
-            return await self._call_openai(model, system_prompt, messages, max_tokens, self.deepseek_client)
+            response = await self._call_openai(
+                model, system_prompt, messages, max_tokens, "deepseek", phase, output
+            )
         elif provider == "google":
-            return await self._call_google(model, system_prompt, messages, max_tokens)
+            response = await self._call_google(model, system_prompt, messages, max_tokens, phase, output)
+        elif provider == "mock":
+            response = await self.providers.client("mock").complete(
+                system_prompt, messages, max_tokens, output
+            )
         else:
             # Fallback to Anthropic
-            return await self._call_anthropic(model, system_prompt, messages, max_tokens)
-
-    def _extract_code(self, response: str) -> str:
-        """Extract code from LLM response, handling markdown formatting."""
-        # Try to extract from markdown code blocks
-        code_block_match = re.search(r"```(?:python)?\s*\n?(.*?)```", response, re.DOTALL)
-        if code_block_match:
-            return code_block_match.group(1).strip()
-        # Otherwise return the whole response stripped
-        return response.strip()
-
-    def _parse_vote(self, response: str, self_index: int, active_players: list[int]) -> tuple[int, int]:
-        """Parse voting response to extract solution and suspect votes."""
-        solution_match = re.search(r"SOLUTION:\s*(\d)", response)
-        suspect_match = re.search(r"SUSPECT:\s*(\d)", response)
-
-        solution_vote = int(solution_match.group(1)) - 1 if solution_match else active_players[0]
-        suspect_vote = int(suspect_match.group(1)) - 1 if suspect_match else active_players[0]
-
-        # Clamp values to valid range and ensure they're active players
-        if solution_vote not in active_players:
-            solution_vote = active_players[0]
-        if suspect_vote not in active_players:
-            suspect_vote = active_players[0]
-
-        # Prevent voting for self as suspect
-        if suspect_vote == self_index:
-            other_players = [p for p in active_players if p != self_index]
-            suspect_vote = other_players[0] if other_players else active_players[0]
-
-        return solution_vote, suspect_vote
+            response = await self._call_anthropic(model, system_prompt, messages, max_tokens, output)
+        return output.dumps(response) if output is not None else response
 
-    async def get_code_submissions(
-        self, game_state: GameState, task: dict, eliminated_player: int | None = None, last_task_passed: bool | None = None
-    ) -> list[Submission]:
-        """Get code submissions from all active players in parallel."""
-        from datetime import datetime
+    async def _take_turns(
+        self,
+        game_state: GameState,
+        prompts: dict[int, str],
+        max_tokens: int,
+        phase: str,
+        outputs: dict[int, OutputSchema] | None = None,
+    ) -> list[PlayerTurn]:
+        """Send each player their prompt in parallel without touching their histories.
+
+        ``outputs`` gives the schema each player's response must follow;
+        without it, responses are free text.
+
+        At most ``LLM_FANOUT_LIMIT`` calls of the phase are in flight at once,
+        and each waits for a slot on its provider in the cross-game scheduler.
+        Each turn is kept as soon as it completes. If any call fails, the
+        others still run to completion before the first error is raised,
+        and a retry of the phase only calls the players still missing.
+        """
+        history = self._history(game_state)
+        limit = asyncio.Semaphore(LLM_FANOUT_LIMIT)
+        pending = self._pending_turns(game_state)
+        missing = {
+            i: prompt
+            for i, prompt in prompts.items()
+            if i not in pending or pending[i].prompt != prompt
+        }
+        if len(missing) < len(prompts):
+            logger.info("Reusing %d completed turns", len(prompts) - len(missing))
+
+        async def take_turn(player_index: int, prompt: str) -> PlayerTurn:
+            player = game_state.players[player_index]
+            output = outputs.get(player_index) if outputs else None
+            system_prompt = self._get_system_prompt(game_state, player_index)
+            provider = get_provider(player.model)
+            messages = history.messages(player_index) + [{"role": "user", "content": prompt}]
+
+            if self.uses_batches(game_state) and self.batches.supports(provider):
+                # Waits on a future for the batch's results, holding no connection or slot
+                with log_context(player=player_index, model=player.model, batch=True):
+                    request = self.batches.request(
+                        provider, player.model, system_prompt, messages, max_tokens, phase, output
+                    )
+                    response = await self._call_batch(game_state, player_index, prompt, request)
+            else:
+                async with limit, scheduler.slot(
+                    f"llm:{provider}", game_state.gameId, game_state.priority
+                ):
+                    with log_context(player=player_index, model=player.model):
+                        response = await self._call_llm(
+                            model=player.model,
+                            system_prompt=system_prompt,
+                            messages=messages,
+                            max_tokens=max_tokens,
+                            phase=phase,
+                            output=output,
+                        )
+            turn = PlayerTurn(playerIndex=player_index, prompt=prompt, response=response)
+            pending[player_index] = turn
+            return turn
+
+        results = await asyncio.gather(
+            *(take_turn(i, prompt) for i, prompt in missing.items()), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return [pending[i] for i in prompts]
+
+    @staticmethod
+    def uses_batches(game_state: GameState) -> bool:
+        """Whether a game's provider calls go through provider batch APIs."""
+        return BATCH_API and game_state.priority == "batch"
+
+    async def _call_batch(
+        self, game_state: GameState, player_index: int, prompt: str, request: BatchRequest
+    ) -> str:
+        """Make a call through a provider batch, checked and retried once like ``_call_llm``.
+
+        A request restored from a checkpoint for the same prompt is waited on
+        first, and resubmitted only if its result is lost or unusable. The
+        request stays recorded for ``pending_snapshot`` while it waits,
+        including when the phase is cancelled.
+        """
+        key = self._phase_key(game_state)
+        entry = self._batched.get(game_state.gameId)
+        if entry is None or entry[0] != key:
+            entry = self._batched[game_state.gameId] = (key, {})
+        waiting = entry[1]
+
+        resumable = self._take_resumable(game_state, player_index, prompt)
+        if resumable is not None:
+            request.custom_id, request.batch_id = resumable["customId"], resumable["batchId"]
+            waiting[player_index] = (prompt, request)
+            try:
+                response = await self.batches.resume(request.provider, request.batch_id, request.custom_id)
+                waiting.pop(player_index, None)
+                return self._checked_batch_response(request, response)
+            except (BatchRequestError, EmptyResponseError, StructuredOutputError) as e:
+                logger.warning("Resubmitting %s after resuming batch %s failed: %s", request.model, request.batch_id, e)
+                request.batch_id = None
+
+        attempts = 2
+        while True:
+            waiting[player_index] = (prompt, request)
+            try:
+                response = self._checked_batch_response(request, await self.batches.complete(request))
+            except asyncio.CancelledError:
+                raise
+            except (EmptyResponseError, StructuredOutputError) as e:
+                attempts -= 1
+                if not attempts:
+                    waiting.pop(player_index, None)
+                    raise
+                logger.warning("Retrying %s after an unusable batch response: %s", request.model, e)
+                request = self.batches.request(
+                    request.provider,
+                    request.model,
+                    request.system_prompt,
+                    request.messages,
+                    request.max_tokens,
+                    request.phase,
+                    request.output,
+                )
+                continue
+            except Exception:
+                waiting.pop(player_index, None)
+                raise
+            waiting.pop(player_index, None)
+            return response
+
+    @staticmethod
+    def _checked_batch_response(request: BatchRequest, response: str) -> str:
+        if not response or not response.strip():
+            raise EmptyResponseError(f"Batch returned empty content for model {request.model}")
+        return request.output.dumps(response) if request.output is not None else response
+
+    def _take_resumable(self, game_state: GameState, player_index: int, prompt: str) -> dict | None:
+        entry = self._resumable.get(game_state.gameId)
+        if entry is None or entry[0] != self._phase_key(game_state):
+            return None
+        resumable = entry[1].pop(player_index, None)
+        return resumable if resumable is not None and resumable["prompt"] == prompt else None
+
+    async def _complete_request(self, request: BatchRequest) -> str:
+        """Make a batched request as a direct call, for the local batch stand-in."""
+        return await self._call_llm(
+            model=request.model,
+            system_prompt=request.system_prompt,
+            messages=request.messages,
+            max_tokens=request.max_tokens,
+            phase=request.phase,
+            output=request.output,
+        )
 
-        game_id = game_state.gameId
-        if game_id not in self.conversation_histories:
-            self._init_game_histories(game_id)
+    @staticmethod
+    def _phase_key(game_state: GameState) -> tuple:
+        return (game_state.currentRound, game_state.currentPhase, game_state.discussionRoundNumber)
+
+    def _pending_turns(self, game_state: GameState) -> dict[int, PlayerTurn]:
+        """Completed, uncommitted turns of the game's current phase."""
+        key = self._phase_key(game_state)
+        entry = self._pending.get(game_state.gameId)
+        if entry is None or entry[0] != key:
+            # Turns left from another phase can never be used
+            entry = self._pending[game_state.gameId] = (key, {})
+        return entry[1]
+
+    def commit_turns(self, game_state: GameState, turns: list[PlayerTurn]):
+        """Add completed turns to the players' histories, all at once."""
+        history = self._history(game_state)
+        for turn in turns:
+            history.append(turn.playerIndex, "user", turn.prompt)
+            history.append(turn.playerIndex, "assistant", turn.response)
+        self._pending.pop(game_state.gameId, None)
+        self._batched.pop(game_state.gameId, None)
+        self._resumable.pop(game_state.gameId, None)
+
+    def pending_snapshot(self, game_id: str) -> dict | None:
+        """JSON-serializable copy of a game's uncommitted turns, for checkpoints.
+
+        Also lists the submitted batch requests the phase is waiting on.
+        """
+        key, turns = self._pending.get(game_id) or (None, {})
+        batched = []
+        entry = self._batched.get(game_id)
+        if entry is not None and (key is None or entry[0] == key):
+            key = entry[0]
+            batched = [
+                {
+                    "playerIndex": player_index,
+                    "prompt": prompt,
+                    "provider": request.provider,
+                    "batchId": request.batch_id,
+                    "customId": request.custom_id,
+                }
+                for player_index, (prompt, request) in entry[1].items()
+                if request.batch_id is not None
+            ]
+        if not turns and not batched:
+            return None
+        return {
+            "phase": list(key),
+            "turns": [asdict(turn) for turn in turns.values()],
+            "batched": batched,
+        }
+
+    def restore_pending(self, game_id: str, snapshot: dict):
+        key = tuple(snapshot["phase"])
+        if snapshot["turns"]:
+            self._pending[game_id] = (
+                key,
+                {turn["playerIndex"]: PlayerTurn(**turn) for turn in snapshot["turns"]},
+            )
+        if snapshot.get("batched"):
+            self._resumable[game_id] = (
+                key,
+                {request["playerIndex"]: request for request in snapshot["batched"]},
+            )
 
-        coding_prompt = get_coding_prompt(game_state.currentRound, task, eliminated_player, last_task_passed)
+    def pending_turn_count(self) -> int:
+        return sum(len(turns) for _, turns in self._pending.values())
 
-        async def get_submission(player_index: int) -> Submission | None:
-            player = game_state.players[player_index]
-            if player.isEliminated:
-                return None
+    @staticmethod
+    def _active_players(game_state: GameState) -> list[int]:
+        return [p.index for p in game_state.players if not p.isEliminated]
 
-            is_imposter = player_index == game_state.imposterIndex
-            system_prompt = self._get_system_prompt(player_index, is_imposter)
+    async def coding_turns(
+        self,
+        game_state: GameState,
+        task: dict,
+        eliminated_player: int | None = None,
+        last_task_passed: bool | None = None,
+        eliminated_imposter: bool = False,
+    ) -> list[PlayerTurn]:
+        """Ask every active player for code, without committing the turns."""
+        coding_prompt = get_coding_prompt(
+            game_state.currentRound,
+            len(game_state.taskIds),
+            task,
+            eliminated_player,
+            last_task_passed,
+            eliminated_imposter,
+        )
+        prompts = {i: coding_prompt for i in self._active_players(game_state)}
+        outputs = {i: CODE_OUTPUT for i in prompts}
+        return await self._take_turns(
+            game_state, prompts, max_tokens=CODE_MAX_TOKENS, phase="coding", outputs=outputs
+        )
 
-            # Add coding prompt to history
-            self._add_to_history(game_id, player_index, "user", coding_prompt)
+    async def get_code_submissions(
+        self,
+        game_state: GameState,
+        task: dict,
+        eliminated_player: int | None = None,
+        last_task_passed: bool | None = None,
+        eliminated_imposter: bool = False,
+        turns: list[PlayerTurn] | None = None,
+    ) -> list[Submission]:
+        """Get code submissions from all active players, or from already computed turns."""
+        from datetime import datetime
 
-            response = await self._call_llm(
-                model=player.model,
-                system_prompt=system_prompt,
-                messages=self.conversation_histories[game_id][player_index],
+        if turns is None:
+            turns = await self.coding_turns(
+                game_state, task, eliminated_player, last_task_passed, eliminated_imposter
             )
+        self.commit_turns(game_state, turns)
 
-            # Add response to history
-            self._add_to_history(game_id, player_index, "assistant", response)
-
-            code = self._extract_code(response)
-            return Submission(
-                playerIndex=player_index,
-                code=code,
+        return [
+            Submission(
+                playerIndex=turn.playerIndex,
+                code=CODE_OUTPUT.parse(turn.response)["code"].strip(),
                 timestamp=datetime.now().isoformat(),
             )
-
-        tasks = [get_submission(i) for i in range(4)]
-        results = await asyncio.gather(*tasks)
-        return [s for s in results if s is not None]
+            for turn in turns
+        ]
 
     async def show_code_reveal(
         self, game_state: GameState, task: dict, submissions: list[Submission]
     ):
         """Show all code submissions to all players."""
-        game_id = game_state.gameId
+        history = self._history(game_state)
         reveal_prompt = get_reveal_prompt(
-            task, [s.model_dump() for s in submissions]
+            task, [asdict(s) for s in submissions]
         )
 
-        # Add reveal prompt to all active players' histories
-        for i, player in enumerate(game_state.players):
-            if not player.isEliminated:
-                self._add_to_history(game_id, i, "user", reveal_prompt)
+        # Every active player references the same reveal segment
+        for i in self._active_players(game_state):
+            history.append(i, "user", reveal_prompt)
+
+    async def discussion_turns(
+        self,
+        game_state: GameState,
+        task: dict,
+        discussion_round: int,
+        previous_messages: list[Message],
+    ) -> list[PlayerTurn]:
+        """Ask every active player for a discussion message, without committing the turns.
+
+        Earlier discussion rounds are already in every player's history, so
+        the prompt only carries the previous round's messages.
+        """
+        new_messages = [
+            asdict(m) for m in previous_messages if m.discussionRound == discussion_round - 1
+        ]
+        discussion_prompt = get_discussion_prompt(discussion_round, task, new_messages)
+        prompts = {i: discussion_prompt for i in self._active_players(game_state)}
+        return await self._take_turns(game_state, prompts, max_tokens=300, phase="discussion")
 
     async def get_discussion_messages(
         self,
@@ -278,87 +607,68 @@ class LLMOrchestrator:
         task: dict,
         discussion_round: int,
         previous_messages: list[Message],
+        turns: list[PlayerTurn] | None = None,
     ) -> list[Message]:
-        """Get discussion messages from all active players in parallel."""
-        game_id = game_state.gameId
-
-        async def get_message(player_index: int) -> Message | None:
-            player = game_state.players[player_index]
-            if player.isEliminated:
-                return None
-
-            is_imposter = player_index == game_state.imposterIndex
-            system_prompt = self._get_system_prompt(player_index, is_imposter)
-
-            discussion_prompt = get_discussion_prompt(
-                discussion_round, task, [m.model_dump() for m in previous_messages]
-            )
-
-            self._add_to_history(game_id, player_index, "user", discussion_prompt)
-
-            response = await self._call_llm(
-                model=player.model,
-                system_prompt=system_prompt,
-                messages=self.conversation_histories[game_id][player_index],
-                max_tokens=300,
-            )
-
-            self._add_to_history(game_id, player_index, "assistant", response)
-
-            # Truncate if too long
-            content = response.strip()[:500]
-            return Message(
-                playerIndex=player_index,
-                content=content,
+        """Get discussion messages from all active players, or from already computed turns."""
+        if turns is None:
+            turns = await self.discussion_turns(game_state, task, discussion_round, previous_messages)
+        self.commit_turns(game_state, turns)
+
+        return [
+            Message(
+                playerIndex=turn.playerIndex,
+                # Truncate if too long
+                content=turn.response.strip()[:500],
                 discussionRound=discussion_round,
             )
+            for turn in turns
+        ]
 
-        tasks = [get_message(i) for i in range(4)]
-        results = await asyncio.gather(*tasks)
-        return [m for m in results if m is not None]
+    async def vote_turns(
+        self, game_state: GameState, task: dict, discussion: list[Message]
+    ) -> list[PlayerTurn]:
+        """Ask every active player for their votes, without committing the turns."""
+        last_round = max((m.discussionRound for m in discussion), default=0)
+        final_messages = [asdict(m) for m in discussion if m.discussionRound == last_round]
+        active_players = self._active_players(game_state)
+        prompts = {
+            i: get_voting_prompt(task, final_messages, i, active_players)
+            for i in active_players
+        }
+        outputs = {i: vote_output(i, active_players) for i in active_players}
+        return await self._take_turns(
+            game_state, prompts, max_tokens=VOTE_MAX_TOKENS, phase="voting", outputs=outputs
+        )
 
     async def get_votes(
-        self, game_state: GameState, task: dict, discussion: list[Message]
+        self,
+        game_state: GameState,
+        task: dict,
+        discussion: list[Message],
+        turns: list[PlayerTurn] | None = None,
     ) -> list[Vote]:
-        """Get votes from all active players in parallel."""
-        game_id = game_state.gameId
-        active_players = [p.index for p in game_state.players if not p.isEliminated]
-
-        async def get_vote(player_index: int) -> Vote | None:
-            player = game_state.players[player_index]
-            if player.isEliminated:
-                return None
-
-            is_imposter = player_index == game_state.imposterIndex
-            system_prompt = self._get_system_prompt(player_index, is_imposter)
-
-            voting_prompt = get_voting_prompt(
-                task, [m.model_dump() for m in discussion], player_index
-            )
-
-            self._add_to_history(game_id, player_index, "user", voting_prompt)
-
-            response = await self._call_llm(
-                model=player.model,
-                system_prompt=system_prompt,
-                messages=self.conversation_histories[game_id][player_index],
-                max_tokens=200,
-            )
-
-            self._add_to_history(game_id, player_index, "assistant", response)
-
-            solution_vote, suspect_vote = self._parse_vote(response, player_index, active_players)
-            return Vote(
-                voterIndex=player_index,
-                solutionVote=solution_vote,
-                suspectVote=suspect_vote,
+        """Get votes from all active players, or from already computed turns."""
+        if turns is None:
+            turns = await self.vote_turns(game_state, task, discussion)
+        self.commit_turns(game_state, turns)
+
+        active_players = self._active_players(game_state)
+        votes = []
+        for turn in turns:
+            # Responses were checked when they arrived; a vote is never defaulted
+            vote = vote_output(turn.playerIndex, active_players).parse(turn.response)
+            votes.append(
+                Vote(
+                    voterIndex=turn.playerIndex,
+                    solutionVote=vote["solution"] - 1,
+                    suspectVote=vote["suspect"] - 1,
+                )
             )
-
-        tasks = [get_vote(i) for i in range(4)]
-        results = await asyncio.gather(*tasks)
-        return [v for v in results if v is not None]
+        return votes
 
     def cleanup_game(self, game_id: str):
         """Clean up conversation histories for a finished game."""
-        if game_id in self.conversation_histories:
-            del self.conversation_histories[game_id]
+        self.histories.remove(game_id)
+        self._pending.pop(game_id, None)
+        self._batched.pop(game_id, None)
+        self._resumable.pop(game_id, None)
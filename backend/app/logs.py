@@ -0,0 +1,154 @@
+"""Structured, non-blocking logging.
+
+``configure_logging`` installs a ``QueueHandler`` on the root logger. Records
+are only enqueued on the calling thread. Formatting and I/O happen on a
+``QueueListener`` thread, so a slow stderr or log shipper never stalls the
+event loop.
+
+Records are rendered as one JSON object per line. Each carries the
+game/player/phase fields bound with ``log_context``. Large payloads, such as
+provider responses, are attached with ``payload()`` and are only formatted
+on the listener thread. They are sampled and cut to ``LOG_PAYLOAD_MAX_CHARS``.
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from contextlib import contextmanager
+from typing import Any
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+# "json" (one object per line) or "text"
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json")
+# Fraction of debug-level provider payloads that are logged
+LOG_PAYLOAD_SAMPLE_RATE = float(os.environ.get("LOG_PAYLOAD_SAMPLE_RATE", "0.01"))
+LOG_PAYLOAD_MAX_CHARS = int(os.environ.get("LOG_PAYLOAD_MAX_CHARS", "2000"))
+# Records kept while the listener catches up; beyond this they are dropped
+LOG_QUEUE_SIZE = 10000
+
+_context: contextvars.ContextVar[dict[str, Any]] = contextvars.ContextVar("log_context", default={})
+_listener: logging.handlers.QueueListener | None = None
+
+
+@contextmanager
+def log_context(**fields):
+    """Attach fields (gameId, player, phase, ...) to every record logged inside the block."""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+class Payload:
+    """A large value attached to a record, formatted and truncated only when rendered."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __str__(self) -> str:
+        text = self.value if isinstance(self.value, str) else repr(self.value)
+        if len(text) > LOG_PAYLOAD_MAX_CHARS:
+            return f"{text[:LOG_PAYLOAD_MAX_CHARS]}... [{len(text) - LOG_PAYLOAD_MAX_CHARS} chars truncated]"
+        return text
+
+
+def payload(value: Any) -> dict:
+    """``extra`` for a record carrying a large value."""
+    return {"payload": Payload(value)}
+
+
+def sample_payload(logger: logging.Logger) -> bool:
+    """Whether to log a debug-level payload now: DEBUG is enabled and the sample hits."""
+    return logger.isEnabledFor(logging.DEBUG) and random.random() < LOG_PAYLOAD_SAMPLE_RATE
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue records with their logging context, leaving formatting to the listener."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # QueueHandler.prepare would format the message here, on the caller's thread
+        record.context = _context.get()
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass  # Never block the caller on a backed-up log sink
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            **getattr(record, "context", {}),
+        }
+        if hasattr(record, "payload"):
+            entry["payload"] = str(record.payload)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Plain-text records with context and payload appended."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        context = getattr(record, "context", {})
+        if context:
+            text += " " + " ".join(f"{key}={value}" for key, value in context.items())
+        if hasattr(record, "payload"):
+            text += f"\n  payload: {record.payload}"
+        return text
+
+
+def configure_logging(stream=None):
+    """Route all logging through a queue to a background listener thread. Idempotent."""
+    global _listener
+    if _listener is not None:
+        return
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else TextFormatter())
+    log_queue: queue.Queue = queue.Queue(LOG_QUEUE_SIZE)
+    _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(ContextQueueHandler(log_queue))
+    root.setLevel(LOG_LEVEL)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records, stop the listener thread and restore direct logging."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, ContextQueueHandler):
+            root.removeHandler(handler)
+    for handler in _listener.handlers:
+        root.addHandler(handler)
+    _listener = None
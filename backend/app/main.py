@@ -1,20 +1,60 @@
 """FastAPI application for LLM Among Us."""
 
 import asyncio
+import hmac
 import json
+import logging
+import os
+import signal
+import threading
+import time
+import uuid
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import BackgroundTasks, Depends, FastAPI, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 
 from .models import CreateGameRequest, GameStateResponse
-from .game import game_manager
+from .game import game_manager, GameCapacityError, GameView, PhaseCancelledError, DRAIN_TIMEOUT, GAME_SWEEP_INTERVAL
+from .providers import provider_registry, PROVIDER_WARMUP
+from .http_pools import http_pools
+from .diagnostics import (
+    LOOP_MONITOR,
+    ProfilerBusyError,
+    format_collapsed,
+    loop_monitor,
+    sample_profile,
+)
+from .logs import configure_logging, shutdown_logging
+from .scheduler import scheduler
+from .compression import negotiate
+from .export import EXPORT_DIR, export_games
+from .budget import budget_policy
+from .task_registry import task_registry
+
+# Events queued per SSE client before it is dropped as too slow
+SSE_CLIENT_QUEUE_SIZE = 256
+SSE_KEEPALIVE_INTERVAL = 15.0
+# Seconds clients are told to wait before reconnecting after a restart
+RESTART_RETRY_AFTER = int(os.environ.get("RESTART_RETRY_AFTER", "2"))
+# WebSocket close code for "Service Restart"
+WS_SERVICE_RESTART = 1012
+# Bearer token for /api/admin/*; the admin endpoints are disabled while unset
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+
+logger = logging.getLogger(__name__)
 
 
 class ConnectionManager:
-    """Manages WebSocket connections for real-time updates."""
+    """Manages WebSocket and SSE connections for real-time updates."""
 
     def __init__(self):
         self.active_connections: dict[str, list[WebSocket]] = {}
+        self.event_subscribers: dict[str, set[asyncio.Queue]] = {}
+        # Newest event per game; each carries the whole game state, so it supersedes the rest
+        self.latest_events: dict[str, str] = {}
+        self.last_event_id: dict[str, int] = {}
+        self._closing: set[asyncio.Task] = set()
 
     async def connect(self, websocket: WebSocket, game_id: str):
         await websocket.accept()
@@ -29,29 +69,186 @@ class ConnectionManager:
             if not self.active_connections[game_id]:
                 del self.active_connections[game_id]
 
-    async def broadcast(self, game_id: str, message: dict):
+    def subscribe(self, game_id: str) -> asyncio.Queue:
+        """Register an SSE client and get the queue its events are pushed to."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SSE_CLIENT_QUEUE_SIZE)
+        self.event_subscribers.setdefault(game_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue, game_id: str):
+        if game_id in self.event_subscribers:
+            self.event_subscribers[game_id].discard(queue)
+            if not self.event_subscribers[game_id]:
+                del self.event_subscribers[game_id]
+
+    @staticmethod
+    def _end_stream(queue: asyncio.Queue):
+        """Tell an SSE client's stream to finish, making room for the marker if needed."""
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    def events_since(self, game_id: str, last_event_id: int) -> list[tuple[int, str]] | None:
+        """Get the events a client that saw last_event_id still needs, or None if unknown.
+
+        Only the newest event is replayed; it already holds every update the
+        client missed.
+        """
+        latest = self.last_event_id.get(game_id, 0)
+        if last_event_id > latest:
+            return None
+        if last_event_id == latest:
+            return []
+        return [(latest, self.latest_events[game_id])]
+
+    def _record_event(self, game_id: str, data: str) -> tuple[int, str]:
+        """Assign the next event id and keep the event as the game's latest."""
+        event_id = self.last_event_id.get(game_id, 0) + 1
+        self.last_event_id[game_id] = event_id
+        self.latest_events[game_id] = data
+        return event_id, data
+
+    async def broadcast(self, game_id: str, message: dict | str):
+        """Send a message to every connection of a game; str messages are sent pre-encoded."""
+        data = message if isinstance(message, str) else json.dumps(message)
+        event = self._record_event(game_id, data)
+        for queue in list(self.event_subscribers.get(game_id, ())):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Too slow to keep up; end its stream so it resumes with Last-Event-ID
+                self.unsubscribe(queue, game_id)
+                self._end_stream(queue)
+
         if game_id in self.active_connections:
             dead_connections = []
             for connection in self.active_connections[game_id]:
                 try:
-                    await connection.send_json(message)
+                    if isinstance(message, str):
+                        await connection.send_text(message)
+                    else:
+                        await connection.send_json(message)
                 except Exception:
                     dead_connections.append(connection)
             for conn in dead_connections:
                 self.disconnect(conn, game_id)
 
+    async def close_game(self, game_id: str, reason: str = "Game closed"):
+        """Close and forget every connection for a game that no longer exists."""
+        connections = self.active_connections.pop(game_id, [])
+        for connection in connections:
+            try:
+                await connection.close(code=4004, reason=reason)
+            except Exception:
+                pass
+
+        for queue in self.event_subscribers.pop(game_id, ()):
+            self._end_stream(queue)
+        self.latest_events.pop(game_id, None)
+        self.last_event_id.pop(game_id, None)
+
+    def close_game_soon(self, game_id: str, reason: str = "Game expired"):
+        """Close a game's connections from synchronous code, such as an eviction."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # No event loop, so no connections either
+        task = loop.create_task(self.close_game(game_id, reason=reason))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def announce_restart(self, resume_tokens: dict[str, str]):
+        """Tell every client to reconnect after a restart, then drop its connection.
+
+        WebSocket clients get a ``server_restart`` message with their game's
+        resume token before the socket is closed with code 1012. SSE clients
+        get a ``server_restart`` event with a ``retry`` delay, then their
+        stream ends.
+        """
+        for game_id in set(self.active_connections) | set(self.event_subscribers):
+            data = {"resumeToken": resume_tokens.get(game_id), "retryAfter": RESTART_RETRY_AFTER}
+            message = json.dumps({"type": "server_restart", "data": data})
+            for connection in self.active_connections.pop(game_id, []):
+                try:
+                    await connection.send_text(message)
+                    await connection.close(code=WS_SERVICE_RESTART, reason="Server restarting")
+                except Exception:
+                    pass
+            frame = f"retry: {RESTART_RETRY_AFTER * 1000}\nevent: server_restart\ndata: {json.dumps(data)}\n\n"
+            for queue in self.event_subscribers.pop(game_id, ()):
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(frame)
+            self.latest_events.pop(game_id, None)
+            self.last_event_id.pop(game_id, None)
+
 
 manager = ConnectionManager()
+# Evictions from the sweeper and from create_game at capacity both close connections
+game_manager.on_evict(manager.close_game_soon)
+
+
+async def broadcast_state(game_id: str):
+    """Send a game's current state to its subscribers."""
+    view = game_manager.get_game_view(game_id)
+    if view is not None:
+        await manager.broadcast(game_id, view.update_message)
+
+
+# Phases played in the background reach clients only through subscriptions
+game_manager.on_update(broadcast_state)
+
+
+async def sweep_games():
+    """Periodically evict expired games; their connections are closed on eviction."""
+    while True:
+        await asyncio.sleep(GAME_SWEEP_INTERVAL)
+        try:
+            game_manager.sweep_expired()
+        except Exception:
+            logger.exception("Game sweep failed")
+
+
+async def drain_server() -> int:
+    """Finish in-flight phases, checkpoint every game and send clients reconnect hints."""
+    resume_tokens = await game_manager.drain(DRAIN_TIMEOUT)
+    await manager.announce_restart(resume_tokens)
+    return len(resume_tokens)
+
+
+def request_shutdown():
+    """Ask the server to shut down, as a SIGTERM from the supervisor would."""
+    os.kill(os.getpid(), signal.SIGTERM)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    configure_logging()
+    # Reading a task directory without an index.json parses every file
+    tasks = await asyncio.to_thread(task_registry.load_index)
+    logger.info("Loaded %d tasks", tasks)
+    restored = game_manager.restore_checkpoints()
+    if restored:
+        logger.info("Restored %d checkpointed games", restored)
+    if PROVIDER_WARMUP:
+        # SDK imports are slow and blocking; keep them off the event loop
+        await asyncio.to_thread(provider_registry.warm_up, PROVIDER_WARMUP)
+    if LOOP_MONITOR:
+        loop_monitor.start()
+    sweeper = asyncio.create_task(sweep_games())
     yield
+    sweeper.cancel()
+    # Games are only still here if no drain was requested before shutdown
+    if game_manager.games:
+        await drain_server()
+    loop_monitor.stop()
+    shutdown_logging()
+    await http_pools.aclose()
 
 
 app = FastAPI(
     title="LLM Among Us",
-    description="A game where LLMs compete in programming tasks with one imposter",
+    description="A game where LLMs compete in programming tasks with hidden imposters",
     version="1.0.0",
     lifespan=lifespan,
 )
@@ -65,58 +262,131 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def reject_while_draining(request: Request, call_next):
+    """Turn away game requests once draining, so clients retry against the next process."""
+    if game_manager.draining and request.url.path.startswith("/api/game"):
+        return JSONResponse(
+            {"detail": "Server is restarting"},
+            status_code=503,
+            headers={"Retry-After": str(RESTART_RETRY_AFTER)},
+        )
+    return await call_next(request)
+
+
+def require_admin(request: Request):
+    """Allow an admin request only with ``Authorization: Bearer <ADMIN_TOKEN>``."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled; set ADMIN_TOKEN")
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.strip().encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token", headers={"WWW-Authenticate": "Bearer"})
+
+
+def state_response(view: GameView, request: Request | None = None) -> Response:
+    """Serve a game view from its cached JSON bytes, honouring If-None-Match.
+
+    Large bodies are compressed as the client's Accept-Encoding allows,
+    using the view's cached compressed bytes.
+    """
+    encoding = negotiate(request.headers.get("accept-encoding")) if request is not None else None
+    body, encoding = view.encoded_body(encoding)
+    headers = {"ETag": view.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if encoding is not None:
+        # Compressed bytes differ from the identity body, so the tag is weak
+        headers["ETag"] = f"W/{view.etag}"
+        headers["Content-Encoding"] = encoding
+    if request is not None:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and (
+            if_none_match.strip() == "*"
+            or view.etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+        ):
+            return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @app.get("/")
 async def root():
     return {"message": "LLM Among Us API", "version": "1.0.0"}
 
 
-@app.post("/api/game/create")
-async def create_game(request: CreateGameRequest):
+@app.post("/api/game/create", response_model=GameStateResponse)
+async def create_game(body: CreateGameRequest, request: Request):
     """Create a new game."""
     try:
-        game = game_manager.create_game(request.models)
-        return game_manager.get_game_response(game.gameId)
+        game = game_manager.create_game(
+            body.models,
+            body.seed,
+            body.difficulty,
+            body.tags,
+            body.imposters,
+            body.priority,
+        )
+        return state_response(game_manager.get_game_view(game.gameId), request)
+    except GameCapacityError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(int(GAME_SWEEP_INTERVAL))},
+        )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.post("/api/game/{game_id}/start")
-async def start_game(game_id: str):
+@app.post("/api/game/{game_id}/start", response_model=GameStateResponse)
+async def start_game(game_id: str, request: Request):
     """Start a game."""
     game = game_manager.start_game(game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Game not found or already started")
 
-    response = game_manager.get_game_response(game_id)
-    await manager.broadcast(game_id, {"type": "game_state_update", "data": response.model_dump()})
-    return response
+    view = game_manager.get_game_view(game_id)
+    await manager.broadcast(game_id, view.update_message)
+    return state_response(view, request)
 
 
-@app.get("/api/game/{game_id}/state")
-async def get_game_state(game_id: str):
+@app.get("/api/game/{game_id}/state", response_model=GameStateResponse)
+async def get_game_state(game_id: str, request: Request):
     """Get current game state."""
-    response = game_manager.get_game_response(game_id)
-    if not response:
+    view = game_manager.get_game_view(game_id)
+    if not view:
         raise HTTPException(status_code=404, detail="Game not found")
-    return response
+    return state_response(view, request)
+
+
+@app.post("/api/game/{game_id}/advance", response_model=GameStateResponse)
+async def advance_phase(game_id: str, request: Request):
+    """Advance to the next game phase.
 
+    Games using provider batch APIs are instead played through to the end in
+    the background; the request returns 202 at once and updates arrive over
+    the WebSocket or event stream.
+    """
+    game = game_manager.get_game(game_id)
+    if game is not None and game_manager.runs_in_background(game):
+        if not game_manager.advance_in_background(game_id):
+            raise HTTPException(status_code=404, detail="Game not found or not in progress")
+        response = state_response(game_manager.get_game_view(game_id), request)
+        if response.status_code == 200:
+            response.status_code = 202
+        return response
 
-@app.post("/api/game/{game_id}/advance")
-async def advance_phase(game_id: str):
-    """Advance to the next game phase."""
-    game = await game_manager.advance_phase(game_id)
+    try:
+        game = await game_manager.advance_phase(game_id)
+    except PhaseCancelledError:
+        # The server is restarting; the next process picks the phase up again
+        raise HTTPException(
+            status_code=503,
+            detail="Server is restarting",
+            headers={"Retry-After": str(RESTART_RETRY_AFTER)},
+        )
     if not game:
         raise HTTPException(status_code=404, detail="Game not found or not in progress")
 
-    response = game_manager.get_game_response(game_id)
-    await manager.broadcast(
-        game_id,
-        {
-            "type": "game_state_update",
-            "data": response.model_dump(),
-        },
-    )
-    return response
+    view = game_manager.get_game_view(game_id)
+    await manager.broadcast(game_id, view.update_message)
+    return state_response(view, request)
 
 
 @app.delete("/api/game/{game_id}")
@@ -127,22 +397,194 @@ async def delete_game(game_id: str):
         raise HTTPException(status_code=404, detail="Game not found")
 
     game_manager.delete_game(game_id)
+    await manager.close_game(game_id, reason="Game deleted")
     return {"message": "Game deleted"}
 
 
+@app.post("/api/admin/drain", dependencies=[Depends(require_admin)])
+async def drain(background_tasks: BackgroundTasks):
+    """Prepare for shutdown: stop taking game requests, checkpoint and disconnect clients.
+
+    Meant for a pre-stop hook. In-flight phases get up to DRAIN_TIMEOUT
+    seconds to finish first. The server shuts itself down once the response
+    is sent, since a drained process holds no games and turns away every
+    game request.
+    """
+    if game_manager.draining:
+        raise HTTPException(status_code=409, detail="Already draining")
+    checkpointed = await drain_server()
+    background_tasks.add_task(request_shutdown)
+    return {"checkpointedGames": checkpointed}
+
+
+@app.get("/api/admin/pools", dependencies=[Depends(require_admin)])
+async def get_pool_stats():
+    """Get connection pool utilization for each provider client."""
+    return http_pools.metrics()
+
+
+@app.get("/api/admin/scheduler", dependencies=[Depends(require_admin)])
+async def get_scheduler_stats():
+    """Get queue depth, slot use and wait times per resource and priority class."""
+    return scheduler.metrics()
+
+
+@app.get("/api/admin/budgets", dependencies=[Depends(require_admin)])
+async def get_reasoning_budgets():
+    """Get the current reasoning allowance and observed usage per provider, model and phase."""
+    return budget_policy.stats()
+
+
+@app.post("/api/admin/export", dependencies=[Depends(require_admin)])
+async def export_finished_games(format: str = "csv"):
+    """Write every finished game as chunked columnar tables under EXPORT_DIR.
+
+    Returns the export's manifest. Games still in progress are left out.
+    """
+    games = [game for game in game_manager.games.values() if game.status == "finished"]
+    # The suffix keeps exports started within the same second apart
+    out_dir = os.path.join(EXPORT_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}")
+    try:
+        manifest = await asyncio.to_thread(export_games, games, out_dir, format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"directory": out_dir, **manifest}
+
+
+@app.get("/api/admin/batches", dependencies=[Depends(require_admin)])
+async def get_batch_stats():
+    """Get requests being collected, batches in flight and batch outcomes."""
+    return game_manager.llm.batches.stats()
+
+
+@app.get("/api/admin/loop", dependencies=[Depends(require_admin)])
+async def get_loop_stats():
+    """Get event-loop lag histogram and recent blocking stacks."""
+    return loop_monitor.stats()
+
+
+@app.get("/api/admin/profile", dependencies=[Depends(require_admin)])
+async def profile(seconds: float = 5.0, interval: float = 0.005, scope: str = "loop", format: str = "collapsed"):
+    """Sample stacks for a while; scope is 'loop' (the event loop thread) or 'all'.
+
+    The collapsed format can be fed straight to flamegraph.pl or speedscope.
+    """
+    if seconds <= 0 or interval <= 0:
+        raise HTTPException(status_code=400, detail="seconds and interval must be positive")
+    if scope not in ("loop", "all"):
+        raise HTTPException(status_code=400, detail="scope must be 'loop' or 'all'")
+    thread_id = threading.get_ident() if scope == "loop" else None
+    try:
+        stacks = await asyncio.to_thread(sample_profile, seconds, interval, thread_id)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    if format == "json":
+        return {"samples": sum(stacks.values()), "stacks": dict(stacks.most_common())}
+    return PlainTextResponse(
+        format_collapsed(stacks),
+        headers={"Content-Disposition": 'attachment; filename="profile.collapsed"'},
+    )
+
+
+@app.get("/api/stats")
+async def get_stats():
+    """Get live game and connection counts."""
+    stats = game_manager.stats()
+    stats["websocketGames"] = len(manager.active_connections)
+    stats["eventSubscribers"] = sum(len(q) for q in manager.event_subscribers.values())
+    return stats
+
+
+def format_event(event_id: int, data: str) -> str:
+    return f"id: {event_id}\ndata: {data}\n\n"
+
+
+@app.get("/api/game/{game_id}/events")
+async def game_events(game_id: str, request: Request):
+    """Server-Sent Events stream of game updates for read-only spectators.
+
+    Sends the same frames as the WebSocket. Every frame is the whole game
+    state, so a client reconnecting with Last-Event-ID that missed updates
+    gets only the newest one, with its event id.
+    """
+    if not game_manager.get_game(game_id):
+        raise HTTPException(status_code=404, detail="Game not found")
+
+    last_event_id = None
+    header = request.headers.get("last-event-id")
+    if header and header.isdigit():
+        last_event_id = int(header)
+
+    # Subscribe before reading the backlog so nothing slips in between
+    queue = manager.subscribe(game_id)
+
+    async def stream():
+        try:
+            backlog = None
+            if last_event_id is not None:
+                backlog = manager.events_since(game_id, last_event_id)
+            if backlog is None:
+                view = game_manager.get_game_view(game_id)
+                if view is None:
+                    return
+                sent_id = manager.last_event_id.get(game_id, 0)
+                yield format_event(sent_id, view.update_message)
+            else:
+                sent_id = last_event_id
+                for event_id, data in backlog:
+                    yield format_event(event_id, data)
+                    sent_id = event_id
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), SSE_KEEPALIVE_INTERVAL)
+                except TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    return
+                if isinstance(event, str):
+                    yield event  # Restart notice; the stream ends here
+                    return
+                event_id, data = event
+                if event_id > sent_id:
+                    yield format_event(event_id, data)
+                    sent_id = event_id
+        finally:
+            manager.unsubscribe(queue, game_id)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.websocket("/ws/{game_id}")
-async def websocket_endpoint(websocket: WebSocket, game_id: str):
-    """WebSocket endpoint for real-time game updates."""
+async def websocket_endpoint(websocket: WebSocket, game_id: str, resume: str | None = None):
+    """WebSocket endpoint for real-time game updates.
+
+    Clients reconnecting after a restart pass the ``resume`` token they were
+    given; the game is then restored from its checkpoint if needed.
+    """
+    if game_manager.draining:
+        await websocket.close(code=WS_SERVICE_RESTART, reason="Server restarting")
+        return
     game = game_manager.get_game(game_id)
     if not game:
         await websocket.close(code=4004, reason="Game not found")
         return
+    if resume and not game_manager.check_resume_token(game, resume):
+        # The client saw progress this game no longer has, or the token is for another game
+        logger.warning("Rejected resume token %r for game %s at version %d", resume, game_id, game.version)
+        await websocket.close(code=4009, reason="Resume token does not match the game")
+        return
 
     await manager.connect(websocket, game_id)
     try:
         # Send current state on connect
-        response = game_manager.get_game_response(game_id)
-        await websocket.send_json({"type": "game_state_update", "data": response.model_dump()})
+        await websocket.send_text(game_manager.get_game_view(game_id).update_message)
 
         while True:
             data = await websocket.receive_text()
@@ -1,7 +1,7 @@
 """Pydantic models for the LLM Among Us game."""
 
 from typing import Any
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class Example(BaseModel):
@@ -56,12 +56,56 @@ class FailedTest(BaseModel):
     error: str | None = None
 
 
+class EfficiencySample(BaseModel):
+    size: int
+    wallTime: float | None = None  # Seconds per call
+    cpuTime: float | None = None  # Seconds per call
+    peakRss: int | None = None  # Bytes, for the whole worker process
+    error: str | None = None
+
+
+class EfficiencyReport(BaseModel):
+    samples: list[EfficiencySample]
+    complexity: str | None = None  # Best-fitting class, e.g. "O(n log n)"
+    exponent: float | None = None  # Slope of log(time) against log(size)
+
+
 class TestResult(BaseModel):
     passed: bool
     totalTests: int
     passedTests: int
     failedTests: list[FailedTest]
     error: str | None = None
+    efficiency: EfficiencyReport | None = None
+
+
+class Counterexample(BaseModel):
+    input: list[Any]
+    expected: Any
+    actual: Any | None = None
+    error: str | None = None
+
+
+class FuzzReport(BaseModel):
+    playerIndex: int
+    status: str = "fuzzed"  # 'fuzzed' | 'rejected' (by the static pre-screen, so never run)
+    casesRun: int
+    mismatches: int
+    counterexample: Counterexample | None = None  # Shrunk to a minimal failing input
+    rejection: str | None = None  # Why the pre-screen rejected the submission
+
+
+class Divergence(BaseModel):
+    players: list[int]
+    cases: int  # Generated inputs on which the two submissions disagree
+    example: list[Any]
+
+
+class FuzzResult(BaseModel):
+    casesRun: int
+    budgetExhausted: bool
+    reports: list[FuzzReport]
+    divergences: list[Divergence]
 
 
 class Round(BaseModel):
@@ -72,25 +116,18 @@ class Round(BaseModel):
     votes: list[Vote] = []
     chosenSubmission: int | None = None
     testResults: TestResult | None = None
+    fuzzResults: FuzzResult | None = None
     suspectVotes: dict[int, int] = {}
-
-
-class GameState(BaseModel):
-    gameId: str
-    status: str  # 'lobby' | 'in_progress' | 'finished'
-    currentRound: int
-    currentPhase: str  # 'coding' | 'reveal' | 'discussion' | 'voting' | 'results'
-    players: list[Player]
-    imposterIndex: int
-    rounds: list[Round] = []
-    winner: str | None = None  # 'crewmates' | 'imposter' | None
-    eliminatedPlayer: int | None = None
-    failedTaskCount: int = 0
-    discussionRoundNumber: int = 1
+    eliminatedPlayer: int | None = None  # Player voted out in this round's results
 
 
 class CreateGameRequest(BaseModel):
-    models: list[str] | None = None
+    models: list[str] | None = None  # One per player, 4 to 16
+    imposters: int | None = None  # Defaults to one per five players
+    seed: int | None = None  # Seeds task selection; random if omitted
+    difficulty: str | None = None  # Only pick tasks of this difficulty
+    tags: list[str] | None = None  # Only pick tasks having all of these tags
+    priority: str = "interactive"  # 'interactive' for live games, 'batch' for bulk evaluation
 
 
 class GameStateResponse(BaseModel):
@@ -99,9 +136,13 @@ class GameStateResponse(BaseModel):
     gameId: str
     status: str
     currentRound: int
+    totalRounds: int  # Fewer than 5 when too few tasks match the game's filters
     currentPhase: str
     players: list[Player]
-    imposterIndex: int | None  # Only revealed when game is finished
+    # First imposter, from before lobbies could have several. Kept so older
+    # clients still get a value; new clients should read imposterIndices.
+    imposterIndex: int | None = Field(deprecated="Use imposterIndices")
+    imposterIndices: list[int] | None  # Only revealed when game is finished
     rounds: list[Round]
     winner: str | None
     eliminatedPlayer: int | None
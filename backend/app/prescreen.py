@@ -0,0 +1,99 @@
+"""Static checks run on submitted code before it reaches the sandbox.
+
+Code that cannot parse, never defines the task function or takes the wrong
+number of arguments would fail every test anyway. Hostile or obviously
+blocking code should never be run. Catching these in-process avoids
+starting sandbox workers for them.
+"""
+
+import ast
+
+# Modules a task solution has no business importing
+BLOCKED_MODULES = frozenset(
+    {
+        "ctypes",
+        "multiprocessing",
+        "os",
+        "pty",
+        "shutil",
+        "signal",
+        "socket",
+        "subprocess",
+        "threading",
+    }
+)
+BLOCKED_CALLS = frozenset({"__import__", "eval", "exec", "open"})
+# Statements and expressions that leave a loop, or suspend it so the caller
+# decides whether it runs again (a generator's ``while True: yield``)
+LOOP_EXITS = (ast.Return, ast.Raise, ast.Yield, ast.YieldFrom, ast.Await)
+
+
+def _accepts(func: ast.FunctionDef | ast.AsyncFunctionDef, arity: int) -> bool:
+    """Whether a function can be called with ``arity`` positional arguments."""
+    args = func.args
+    positional = len(args.posonlyargs) + len(args.args)
+    required = positional - len(args.defaults)
+    required_kwonly = sum(1 for default in args.kw_defaults if default is None)
+    if required_kwonly:
+        return False
+    return required <= arity and (arity <= positional or args.vararg is not None)
+
+
+def _exits_loop(body: list[ast.stmt]) -> bool:
+    """Whether a loop body contains a break, return, raise or yield for that loop."""
+    stack = list(body)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.Break, *LOOP_EXITS)):
+            return True
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)):
+            continue
+        if isinstance(node, (ast.For, ast.AsyncFor, ast.While)):
+            # A break in a nested loop only leaves that loop
+            stack.extend(child for child in ast.walk(node) if isinstance(child, LOOP_EXITS))
+            continue
+        stack.extend(ast.iter_child_nodes(node))
+    return False
+
+
+def prescreen(code: str, function_name: str, arity: int | None = None) -> str | None:
+    """Check code statically; return a description of the problem, or None if it may run."""
+    if not code.strip():
+        return "Submission is empty"
+
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as e:
+        return f"SyntaxError: {e.msg} (line {e.lineno})"
+
+    target = None
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == function_name:
+            target = node
+    if target is None:
+        return f"Function '{function_name}' is not defined at module level"
+    if isinstance(target, ast.AsyncFunctionDef):
+        return f"Function '{function_name}' must not be async"
+    if arity is not None and not _accepts(target, arity):
+        return f"Function '{function_name}' cannot be called with {arity} argument(s)"
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.name.split(".")[0] in BLOCKED_MODULES:
+                    return f"Import of '{alias.name}' is not allowed (line {node.lineno})"
+        elif isinstance(node, ast.ImportFrom):
+            if node.module and node.module.split(".")[0] in BLOCKED_MODULES:
+                return f"Import from '{node.module}' is not allowed (line {node.lineno})"
+        elif isinstance(node, ast.Call):
+            if isinstance(node.func, ast.Name) and node.func.id in BLOCKED_CALLS:
+                return f"Call to '{node.func.id}' is not allowed (line {node.lineno})"
+        elif isinstance(node, ast.While):
+            if (
+                isinstance(node.test, ast.Constant)
+                and node.test.value
+                and not _exits_loop(node.body)
+            ):
+                return f"Infinite loop: 'while True' never exits (line {node.lineno})"
+
+    return None
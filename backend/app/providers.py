@@ -0,0 +1,150 @@
+"""Lazily constructed LLM provider clients.
+
+Provider SDKs are only imported, and their clients only built, the first
+time a game uses that provider. A deployment that only plays Claude models
+never imports the OpenAI or Google SDKs, and a missing key for an unused
+provider does not stop the server from starting. ``PROVIDER_WARMUP`` names
+providers to build during startup instead, so the first game does not pay
+for the import.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+# Comma-separated providers to build at startup, e.g. "anthropic,openai"; "all" for every one
+PROVIDER_WARMUP = os.environ.get("PROVIDER_WARMUP", "")
+DEEPSEEK_BASE_URL = "https://api.deepseek.com"
+
+
+class ProviderUnavailableError(Exception):
+    """Raised when a provider's SDK is not installed or its client cannot be built."""
+
+
+class MockClient:
+    """Canned responses, for running games without any provider SDK or key."""
+
+    async def complete(
+        self, system_prompt: str, messages: list[dict], max_tokens: int, output: Any = None
+    ) -> str:
+        prompt = messages[-1]["content"] if messages else ""
+        if output is not None and output.name == "submit_vote":
+            # The first player each vote may go to
+            properties = output.schema["properties"]
+            return json.dumps(
+                {"solution": properties["solution"]["enum"][0], "suspect": properties["suspect"]["enum"][0]}
+            )
+        if output is not None and output.name == "submit_code":
+            match = re.search(r"^\s+(\w+)\(", prompt, re.MULTILINE)
+            name = match.group(1) if match else "solution"
+            return json.dumps({"code": f"def {name}(*args):\n    return None"})
+        return "I have nothing to add yet."
+
+
+def _anthropic() -> Any:
+    from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
+
+    from .http_pools import http_pools
+
+    return AsyncAnthropic(http_client=http_pools.client("anthropic", DefaultAsyncHttpxClient))
+
+
+def _openai() -> Any:
+    from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+    from .http_pools import http_pools
+
+    return AsyncOpenAI(http_client=http_pools.client("openai", DefaultAsyncHttpxClient))
+
+
+def _deepseek() -> Any:
+    from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+    from .http_pools import http_pools
+
+    return AsyncOpenAI(
+        api_key=os.environ.get("DEEPSEEK_API_KEY", ""),
+        base_url=DEEPSEEK_BASE_URL,
+        http_client=http_pools.client("deepseek", DefaultAsyncHttpxClient),
+    )
+
+
+def _google() -> Any:
+    from google import genai
+    from google.genai import types
+
+    from .http_pools import http_pools
+
+    return genai.Client(
+        http_options=types.HttpOptions(httpx_async_client=http_pools.client("google"))
+    )
+
+
+CLIENT_FACTORIES: dict[str, Callable[[], Any]] = {
+    "anthropic": _anthropic,
+    "openai": _openai,
+    "deepseek": _deepseek,
+    "google": _google,
+    "mock": MockClient,
+}
+
+
+class ProviderRegistry:
+    """Builds each provider's client on first use and keeps it for reuse."""
+
+    def __init__(self, factories: dict[str, Callable[[], Any]] | None = None):
+        self._factories = CLIENT_FACTORIES if factories is None else factories
+        self._clients: dict[str, Any] = {}
+        # Warm-up builds clients from a worker thread
+        self._lock = threading.Lock()
+
+    def client(self, provider: str) -> Any:
+        """Get a provider's client, importing its SDK and building it if needed."""
+        client = self._clients.get(provider)
+        if client is not None:
+            return client
+        factory = self._factories.get(provider)
+        if factory is None:
+            raise ProviderUnavailableError(f"Unknown provider: {provider}")
+        with self._lock:
+            if provider not in self._clients:
+                try:
+                    self._clients[provider] = factory()
+                except ImportError as e:
+                    raise ProviderUnavailableError(
+                        f"SDK for provider '{provider}' is not installed: {e}"
+                    ) from e
+                except Exception as e:
+                    raise ProviderUnavailableError(
+                        f"Could not create client for provider '{provider}': {e}"
+                    ) from e
+            return self._clients[provider]
+
+    def loaded(self) -> list[str]:
+        """Providers whose clients have been built."""
+        return list(self._clients)
+
+    def warm_up(self, providers: str | list[str]) -> dict[str, str]:
+        """Build clients ahead of time; returns the errors of those that failed."""
+        if isinstance(providers, str):
+            if providers.strip() == "all":
+                providers = list(self._factories)
+            else:
+                providers = [p.strip() for p in providers.split(",") if p.strip()]
+        errors = {}
+        for provider in providers:
+            try:
+                self.client(provider)
+            except ProviderUnavailableError as e:
+                logger.warning("Provider warm-up failed: %s", e)
+                errors[provider] = str(e)
+        return errors
+
+
+# Global provider registry instance
+provider_registry = ProviderRegistry()
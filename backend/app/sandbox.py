@@ -1,96 +1,659 @@
 """Code sandbox for running submitted code against test cases."""
 
-import subprocess
 import json
-from typing import Any
+import math
+import os
+import selectors
+import signal
+import struct
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Callable
 
-from .models import TestResult, FailedTest
+from .models import TestResult, FailedTest, EfficiencyReport, EfficiencySample
+from .prescreen import prescreen
 
+# Wall-clock limit for a single test case, in seconds
+TEST_TIMEOUT = 5
+# Address-space limit for each worker process, in bytes
+WORKER_MEMORY_LIMIT = int(os.environ.get("SANDBOX_MEMORY_LIMIT", str(512 * 1024 * 1024)))
+# Default number of worker processes a test suite is sharded across
+SANDBOX_PARALLELISM = int(
+    os.environ.get("SANDBOX_PARALLELISM", str(min(4, os.cpu_count() or 1)))
+)
+# Extra seconds allowed per worker for interpreter start-up
+WORKER_STARTUP_SLACK = 2
 
-def run_tests(code: str, function_name: str, test_cases: list[dict[str, Any]]) -> TestResult:
-    """Run code against test cases in isolated subprocess."""
-    results = {
-        "passed": True,
-        "totalTests": len(test_cases),
-        "passedTests": 0,
-        "failedTests": [],
-        "error": None,
-    }
+# Largest encoded result a worker may send for one test, in bytes
+MAX_RESULT_BYTES = int(os.environ.get("SANDBOX_MAX_RESULT_BYTES", str(64 * 1024 * 1024)))
+# Result frames are a 4-byte big-endian length followed by that many bytes of JSON
+FRAME_HEADER = struct.Struct(">I")
+RESULT_READ_SIZE = 1 << 16
 
-    for i, test in enumerate(test_cases):
-        args = test["input"]
-        expected = test["expected"]
+# Applies the job's CPU and memory rlimits before any submission code runs.
+# Set in the worker itself rather than through preexec_fn, which is unsafe
+# when workers are started from threads.
+LIMITS_PRELUDE = """
+try:
+    import resource
+except ImportError:  # Not available on Windows; workers then run without rlimits
+    resource = None
+if resource is not None:
+    resource.setrlimit(resource.RLIMIT_CPU, (job["cpu_seconds"], job["cpu_seconds"] + 1))
+    resource.setrlimit(resource.RLIMIT_AS, (job["memory_limit"], job["memory_limit"]))
+"""
 
-        test_script = f"""
-import json
-{code}
-args = {json.dumps(args)}
-result = {function_name}(*args)
-print(json.dumps(result))
+# Runs in each worker: loads the submission once, then runs its shard of
+# tests. Stdin carries only a small control record; each test's arguments
+# are read from the shared fixture file at the offset it lists, and each
+# result goes back as one length-prefixed frame on a dedicated pipe, so
+# submission output on stdout/stderr cannot corrupt the result stream.
+# Expected results never reach the worker: the parent compares results and
+# decides when to stop, so submission code cannot see or forge a verdict.
+WORKER_SCRIPT = """
+import json, os, signal, struct, sys, traceback
+
+class _Timeout(BaseException):
+    pass
+
+def _on_alarm(signum, frame):
+    raise _Timeout()
+
+job = json.load(sys.stdin)
+""" + LIMITS_PRELUDE + """
+fixtures = job["fixture_fd"]
+out = os.fdopen(job["result_fd"], "wb")
+header = struct.Struct(">I")
+signal.signal(signal.SIGALRM, _on_alarm)
+
+def emit(record):
+    data = json.dumps(record).encode()
+    if len(data) > job["max_result_bytes"]:
+        data = json.dumps({
+            "i": record.get("i"),
+            "error": "Result too large (%d bytes)" % len(data),
+        }).encode()
+    out.write(header.pack(len(data)) + data)
+    out.flush()
+
+def describe(exc):
+    # Drop this script's own frame so only submission frames remain
+    return "".join(traceback.format_exception(type(exc), exc, exc.__traceback__.tb_next))[-500:]
+
+namespace = {"__name__": "__submission__"}
+try:
+    exec(compile(job["code"], "<submission>", "exec"), namespace)
+    func = namespace[job["function_name"]]
+except BaseException as exc:
+    emit({"fatal": describe(exc)})
+    sys.exit(0)
+
+for index, offset, length in job["tests"]:
+    args = json.loads(os.pread(fixtures, length, offset))
+    signal.setitimer(signal.ITIMER_REAL, job["timeout"])
+    try:
+        result = json.loads(json.dumps(func(*args)))
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        emit({"i": index, "result": result})
+    except _Timeout:
+        emit({"i": index, "error": "TIMEOUT (>%ss)" % job["timeout"]})
+    except BaseException as exc:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        emit({"i": index, "error": describe(exc)})
+    del args
 """
 
+# Wall-clock limit for one efficiency measurement, in seconds
+EFFICIENCY_TIMEOUT = float(os.environ.get("EFFICIENCY_TIMEOUT", "10"))
+
+# Runs one scaled input in a fresh worker so peak RSS belongs to that size.
+# Small inputs are repeated and the fastest call is kept.
+MEASURE_SCRIPT = """
+import copy, json, sys, time, traceback
+
+job = json.load(sys.stdin)
+""" + LIMITS_PRELUDE + """
+out = sys.stdout
+sys.stdout = sys.stderr
+try:
+    namespace = {"__name__": "__submission__"}
+    exec(compile(job["code"], "<submission>", "exec"), namespace)
+    func = namespace[job["function_name"]]
+    args = job["args"]
+    best_wall = best_cpu = None
+    runs = total = 0
+    while runs < 5 and (runs == 0 or total < 0.2):
+        call_args = copy.deepcopy(args)
+        wall, cpu = time.perf_counter(), time.process_time()
+        func(*call_args)
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        best_wall = wall if best_wall is None else min(best_wall, wall)
+        best_cpu = cpu if best_cpu is None else min(best_cpu, cpu)
+        runs += 1
+        total += wall
+    peak = None
+    try:
+        # VmHWM starts fresh at exec; ru_maxrss on Linux inherits the parent's
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    peak = int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if peak is None and resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak *= 1 if sys.platform == "darwin" else 1024
+    record = {"wallTime": best_wall, "cpuTime": best_cpu, "peakRss": peak}
+except BaseException as exc:
+    record = {"error": "".join(traceback.format_exception_only(type(exc), exc)).strip()[-500:]}
+out.write(json.dumps(record))
+"""
+
+# Candidate complexity classes and their growth functions
+COMPLEXITY_CLASSES = [
+    ("O(1)", lambda n: 1.0),
+    ("O(log n)", lambda n: math.log2(n)),
+    ("O(n)", lambda n: float(n)),
+    ("O(n log n)", lambda n: n * math.log2(n)),
+    ("O(n^2)", lambda n: float(n) ** 2),
+    ("O(n^3)", lambda n: float(n) ** 3),
+]
+
+
+def _write_fixtures(inputs: list[list[Any]]) -> tuple[BinaryIO, list[tuple[int, int, int]]]:
+    """Serialize every test's arguments once into an unnamed temporary file.
+
+    Returns the file and an ``(index, offset, length)`` entry per test.
+    Workers share the file and read each test at its offset, so sharding or
+    restarting a worker never re-encodes the inputs. Expected results are
+    left out, since submission code can read the file.
+    """
+    fixtures = tempfile.TemporaryFile()
+    entries = []
+    offset = 0
+    for index, args in enumerate(inputs):
+        data = json.dumps(args).encode()
+        fixtures.write(data)
+        entries.append((index, offset, len(data)))
+        offset += len(data)
+    fixtures.flush()
+    return fixtures, entries
+
+
+@dataclass(slots=True)
+class _Worker:
+    """A running worker process and the parent's ends of its pipes."""
+
+    proc: subprocess.Popen
+    results: int  # Read end of the result pipe
+    output: BinaryIO  # Submission stdout/stderr
+    wall_limit: float
+
+
+def _start_worker(
+    code: str,
+    function_name: str,
+    shard: list[tuple[int, int, int]],
+    fixtures: BinaryIO,
+    timeout: float,
+    deadline: float | None,
+) -> _Worker:
+    """Start a worker process for one shard of tests and send it its job."""
+    wall_limit = timeout * len(shard) + WORKER_STARTUP_SLACK
+    if deadline is not None:
+        wall_limit = max(0.0, min(wall_limit, deadline - time.monotonic()))
+
+    # Submission output goes to a file, not a pipe, so a chatty submission
+    # can neither fill a pipe and stall nor grow the parent's memory.
+    output = tempfile.TemporaryFile()
+    read_end, write_end = os.pipe()
+    try:
+        proc = subprocess.Popen(
+            ["python3", "-c", WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=output,
+            stderr=output,
+            pass_fds=(fixtures.fileno(), write_end),
+            start_new_session=True,  # Own process group, so _kill also reaches its children
+        )
+    except BaseException:
+        os.close(read_end)
+        output.close()
+        raise
+    finally:
+        # Only the worker holds the write end, so the pipe hits EOF when it exits
+        os.close(write_end)
+
+    job = {
+        "code": code,
+        "function_name": function_name,
+        "tests": shard,
+        "fixture_fd": fixtures.fileno(),
+        "result_fd": write_end,
+        "max_result_bytes": MAX_RESULT_BYTES,
+        "timeout": timeout,
+        "cpu_seconds": int(wall_limit) + 1,
+        "memory_limit": WORKER_MEMORY_LIMIT,
+    }
+    try:
+        proc.stdin.write(json.dumps(job).encode())
+        proc.stdin.close()
+    except OSError:
+        pass  # Worker died before reading its job (e.g. killed by fail-fast)
+    return _Worker(proc=proc, results=read_end, output=output, wall_limit=wall_limit)
+
+
+def _kill(proc: subprocess.Popen):
+    """Kill a worker and every process it started."""
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass  # Group already gone
+    except AttributeError:  # No process groups on Windows
+        proc.kill()
+
+
+def _exit_error(worker: _Worker) -> str:
+    """The tail of a dead worker's output, or its exit code."""
+    output = worker.output
+    output.seek(max(0, output.seek(0, os.SEEK_END) - 2000))
+    tail = output.read().decode(errors="replace").strip()[-500:]
+    return tail or f"Process exited with code {worker.proc.returncode}"
+
+
+def _parse_frame(data: bytes, pending: set[int]) -> dict | None:
+    """A well-formed result record for a test still pending, or None.
+
+    The worker runs submission code, which can write to the result pipe, so
+    frames are checked rather than trusted.
+    """
+    try:
+        record = json.loads(data)
+    except ValueError:
+        return None
+    if not isinstance(record, dict):
+        return None
+    if set(record) == {"fatal"} and isinstance(record["fatal"], str):
+        return record
+    index = record.get("i")
+    if type(index) is not int or index not in pending:
+        return None
+    if set(record) == {"i", "result"}:
+        return record
+    if set(record) == {"i", "error"} and isinstance(record["error"], str):
+        return record
+    return None
+
+
+def _collect_worker(
+    worker: _Worker,
+    shard: list[tuple[int, int, int]],
+    stop_after: Callable[[dict], bool] | None = None,
+) -> tuple[list[dict], str]:
+    """Read a worker's result frames as they arrive, until it exits.
+
+    The worker is killed once a record satisfies ``stop_after``, or on a
+    malformed frame. Also returns the error to charge to the first
+    unreported test, should the worker not get through its whole shard.
+    """
+    records = []
+    pending = {index for index, _, _ in shard}
+    buffer = bytearray()
+    error = None
+    deadline = time.monotonic() + worker.wall_limit
+    try:
+        with selectors.DefaultSelector() as selector:
+            selector.register(worker.results, selectors.EVENT_READ)
+            while error is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    error = "TIMEOUT"
+                    break
+                if not selector.select(remaining):
+                    continue
+                chunk = os.read(worker.results, RESULT_READ_SIZE)
+                if not chunk:
+                    break  # Worker exited
+                buffer += chunk
+                while len(buffer) >= FRAME_HEADER.size:
+                    (length,) = FRAME_HEADER.unpack_from(buffer)
+                    if length > MAX_RESULT_BYTES:
+                        error = f"Result too large ({length} bytes)"
+                        break
+                    end = FRAME_HEADER.size + length
+                    if len(buffer) < end:
+                        break
+                    record = _parse_frame(buffer[FRAME_HEADER.size:end], pending)
+                    del buffer[:end]
+                    if record is None:
+                        error = "Invalid result frame"
+                        break
+                    records.append(record)
+                    pending.discard(record.get("i"))
+                    if "fatal" in record or (stop_after is not None and stop_after(record)):
+                        error = "Stopped"
+                        break
+        if error is None:
+            # The result pipe can close before the worker exits
+            try:
+                worker.proc.wait(timeout=max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                error = "TIMEOUT"
+        # Kills the worker if it is still running, and anything the submission forked
+        _kill(worker.proc)
+        worker.proc.wait()
+        return records, error or _exit_error(worker)
+    finally:
+        os.close(worker.results)
+        worker.output.close()
+
+
+def _is_failure(outcome: dict, expected: dict[int, Any] | None, index: int) -> bool:
+    if "error" in outcome:
+        return True
+    return expected is not None and outcome["result"] != expected[index]
+
+
+def _run_shard(
+    code: str,
+    function_name: str,
+    shard: list[tuple[int, int, int]],
+    fixtures: BinaryIO,
+    expected: dict[int, Any] | None,
+    fail_fast: bool,
+    timeout: float,
+    deadline: float | None,
+    stop: threading.Event,
+    live: set[subprocess.Popen],
+) -> tuple[dict[int, dict], bool]:
+    """Run one shard of tests, restarting its worker if a test kills it.
+
+    Returns the per-test outcomes and whether any of them failed.
+    """
+    outcomes: dict[int, dict] = {}
+    failed = False
+    remaining = shard
+    stop_after = None
+    if fail_fast:
+        stop_after = lambda record: _is_failure(record, expected, record["i"])
+    while remaining and not stop.is_set():
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        worker = _start_worker(code, function_name, remaining, fixtures, timeout, deadline)
+        live.add(worker.proc)
+        if stop.is_set():
+            _kill(worker.proc)
         try:
-            proc = subprocess.run(
-                ["python3", "-c", test_script],
-                capture_output=True,
-                text=True,
-                timeout=5,
-            )
+            records, error = _collect_worker(worker, remaining, stop_after)
+        finally:
+            live.discard(worker.proc)
 
-            if proc.returncode != 0:
-                results["passed"] = False
-                results["failedTests"].append(
-                    FailedTest(
-                        testIndex=i,
-                        input=args,
-                        expected=expected,
-                        error=proc.stderr.strip()[-500:],
-                    )
-                )
-            else:
-                actual = json.loads(proc.stdout.strip())
-                if actual == expected:
-                    results["passedTests"] += 1
-                else:
-                    results["passed"] = False
-                    results["failedTests"].append(
-                        FailedTest(
-                            testIndex=i,
-                            input=args,
-                            expected=expected,
-                            actual=actual,
-                        )
+        for record in records:
+            if "fatal" in record:
+                # Submission did not load; every test fails the same way
+                for index, _, _ in remaining:
+                    outcomes[index] = {"error": record["fatal"]}
+                return outcomes, True
+            outcomes[record["i"]] = record
+            failed = failed or _is_failure(record, expected, record["i"])
+
+        remaining = [test for test in remaining if test[0] not in outcomes]
+        if not remaining or stop.is_set() or (failed and fail_fast):
+            break
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+
+        # The worker died or hit its deadline on the first unreported test;
+        # charge that test and carry on with the rest in a fresh worker.
+        index = remaining[0][0]
+        if error == "TIMEOUT":
+            error = f"TIMEOUT (>{timeout:g}s)"
+        outcomes[index] = {"error": error}
+        failed = True
+        remaining = remaining[1:]
+        if fail_fast:
+            break
+
+    return outcomes, failed
+
+
+def execute_cases(
+    code: str,
+    function_name: str,
+    inputs: list[list[Any]],
+    expected: list[Any] | None = None,
+    parallelism: int | None = None,
+    fail_fast: bool = False,
+    timeout: float = TEST_TIMEOUT,
+    deadline: float | None = None,
+) -> tuple[dict[int, dict], bool]:
+    """Run code on each argument list across parallel, isolated workers.
+
+    Inputs are sharded across up to ``parallelism`` workers, each with its
+    own CPU/memory rlimits and wall-clock limit. Inputs are written once to a
+    fixture file the workers read from, and results stream back as framed
+    records while the workers run. Returns a mapping of input
+    index to an outcome holding either ``result`` or ``error``, and whether
+    any input was left unrun. A failure is an error, or a result that
+    differs from ``expected`` when given; results are compared here, never
+    in the workers. Inputs left unrun by ``fail_fast`` or an absolute
+    ``deadline`` (``time.monotonic()``) are missing from the mapping.
+    """
+    if parallelism is None:
+        parallelism = SANDBOX_PARALLELISM
+    shard_count = max(1, min(parallelism, len(inputs)))
+    fixtures, entries = _write_fixtures(inputs)
+    shards = [entries[n::shard_count] for n in range(shard_count)]
+    shards = [shard for shard in shards if shard]
+    expected_by_index = dict(enumerate(expected)) if expected is not None else None
+
+    outcomes: dict[int, dict] = {}
+    stop = threading.Event()
+    live: set[subprocess.Popen] = set()
+
+    try:
+        if shards:
+            with ThreadPoolExecutor(max_workers=len(shards)) as pool:
+                futures = [
+                    pool.submit(
+                        _run_shard,
+                        code,
+                        function_name,
+                        shard,
+                        fixtures,
+                        expected_by_index,
+                        fail_fast,
+                        timeout,
+                        deadline,
+                        stop,
+                        live,
                     )
+                    for shard in shards
+                ]
+                for future in as_completed(futures):
+                    shard_outcomes, shard_failed = future.result()
+                    outcomes.update(shard_outcomes)
+                    if shard_failed and fail_fast and not stop.is_set():
+                        stop.set()
+                        for proc in list(live):
+                            _kill(proc)
+    finally:
+        fixtures.close()
 
-        except subprocess.TimeoutExpired:
-            results["passed"] = False
-            results["failedTests"].append(
+    return outcomes, len(outcomes) < len(inputs)
+
+
+def run_tests(
+    code: str,
+    function_name: str,
+    test_cases: list[dict[str, Any]],
+    parallelism: int | None = None,
+    fail_fast: bool = False,
+    efficiency_inputs: list[tuple[int, list[Any]]] | None = None,
+) -> TestResult:
+    """Run code against test cases in isolated worker processes.
+
+    Test cases are sharded across up to ``parallelism`` workers. With
+    ``fail_fast`` the run stops at the first failure, so the result only says
+    whether the code passed; otherwise every test is run for a full report.
+    Failures are reported in test index order. Code rejected by the static
+    pre-screen fails every test without starting any workers.
+
+    Given ``efficiency_inputs`` (size, args) pairs, code that passes is also
+    measured on them and the report is attached as ``efficiency``.
+    """
+    arity = len(test_cases[0]["input"]) if test_cases else None
+    rejection = prescreen(code, function_name, arity)
+    if rejection:
+        return TestResult(
+            passed=False,
+            totalTests=len(test_cases),
+            passedTests=0,
+            failedTests=[
                 FailedTest(
                     testIndex=i,
-                    input=args,
-                    expected=expected,
-                    error="TIMEOUT (>5s)",
+                    input=test["input"],
+                    expected=test["expected"],
+                    error=rejection,
                 )
-            )
-        except json.JSONDecodeError:
+                for i, test in enumerate(test_cases)
+            ],
+            error=rejection,
+        )
+
+    outcomes, stopped_early = execute_cases(
+        code,
+        function_name,
+        [test["input"] for test in test_cases],
+        expected=[test["expected"] for test in test_cases],
+        parallelism=parallelism,
+        fail_fast=fail_fast,
+    )
+
+    results = {
+        "passed": True,
+        "totalTests": len(test_cases),
+        "passedTests": 0,
+        "failedTests": [],
+        "error": None,
+    }
+
+    for i in sorted(outcomes):
+        outcome = outcomes[i]
+        expected = test_cases[i]["expected"]
+        if "error" in outcome:
             results["passed"] = False
             results["failedTests"].append(
                 FailedTest(
                     testIndex=i,
-                    input=args,
+                    input=test_cases[i]["input"],
                     expected=expected,
-                    error=f"Invalid output: {proc.stdout.strip()[:200]}",
+                    error=outcome["error"],
                 )
             )
-        except Exception as e:
+        elif outcome["result"] == expected:
+            results["passedTests"] += 1
+        else:
             results["passed"] = False
             results["failedTests"].append(
                 FailedTest(
                     testIndex=i,
-                    input=args,
+                    input=test_cases[i]["input"],
                     expected=expected,
-                    error=str(e),
+                    actual=outcome["result"],
                 )
             )
 
+    if stopped_early:
+        results["error"] = "Stopped at first failure"
+
+    if efficiency_inputs and results["passed"]:
+        results["efficiency"] = measure_efficiency(code, function_name, efficiency_inputs)
+
     return TestResult(**results)
+
+
+def _measure(code: str, function_name: str, size: int, args: list[Any]) -> EfficiencySample:
+    """Time one scaled input in its own worker."""
+    proc = subprocess.Popen(
+        ["python3", "-c", MEASURE_SCRIPT],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        start_new_session=True,
+    )
+    job = json.dumps(
+        {
+            "code": code,
+            "function_name": function_name,
+            "args": args,
+            "cpu_seconds": int(EFFICIENCY_TIMEOUT) + 1,
+            "memory_limit": WORKER_MEMORY_LIMIT,
+        }
+    )
+    try:
+        stdout, _ = proc.communicate(job, timeout=EFFICIENCY_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        _kill(proc)
+        proc.communicate()
+        return EfficiencySample(size=size, error=f"TIMEOUT (>{EFFICIENCY_TIMEOUT:g}s)")
+    try:
+        return EfficiencySample(size=size, **json.loads(stdout))
+    except (json.JSONDecodeError, TypeError):
+        return EfficiencySample(size=size, error=f"Process exited with code {proc.returncode}")
+
+
+def fit_complexity(samples: list[EfficiencySample]) -> tuple[str | None, float | None]:
+    """Fit measured times to the closest complexity class.
+
+    Each class is fitted as ``time = c * f(n)`` by least squares in log
+    space. Classes are tried from simplest up, and a faster-growing class
+    must halve the residual to win, so timing noise does not push an O(n)
+    solution into O(n log n). Also returns the raw log-log slope.
+    """
+    points = [
+        (s.size, s.wallTime) for s in samples if s.wallTime and s.wallTime > 0 and s.size > 1
+    ]
+    if len(points) < 2:
+        return None, None
+
+    log_n = [math.log(n) for n, _ in points]
+    log_t = [math.log(t) for _, t in points]
+    mean_n, mean_t = sum(log_n) / len(log_n), sum(log_t) / len(log_t)
+    var_n = sum((x - mean_n) ** 2 for x in log_n)
+    exponent = (
+        sum((x - mean_n) * (y - mean_t) for x, y in zip(log_n, log_t)) / var_n if var_n else None
+    )
+
+    best, best_residual = None, math.inf
+    for name, growth in COMPLEXITY_CLASSES:
+        offsets = [y - math.log(growth(n)) for (n, _), y in zip(points, log_t)]
+        log_c = sum(offsets) / len(offsets)
+        residual = sum((o - log_c) ** 2 for o in offsets)
+        if residual < best_residual / 2:
+            best, best_residual = name, residual
+    return best, exponent
+
+
+def measure_efficiency(
+    code: str, function_name: str, scaled_inputs: list[tuple[int, list[Any]]]
+) -> EfficiencyReport:
+    """Measure run time and memory on inputs of increasing size.
+
+    ``scaled_inputs`` pairs each size with an argument list. Sizes are
+    measured one at a time, smallest first, so they do not compete for CPU;
+    once one fails or times out, larger sizes are skipped.
+    """
+    samples = []
+    for size, args in sorted(scaled_inputs, key=lambda item: item[0]):
+        sample = _measure(code, function_name, size, args)
+        samples.append(sample)
+        if sample.error:
+            break
+    complexity, exponent = fit_complexity(samples)
+    return EfficiencyReport(samples=samples, complexity=complexity, exponent=exponent)
@@ -0,0 +1,187 @@
+"""Fair scheduling of provider calls and sandbox jobs across games.
+
+Each resource, such as one provider's API or the sandbox, has a fixed
+number of slots. Waiting requests are granted slots by weighted fair
+queuing: every game gets a share of the resource in proportion to its
+priority class's weight, however many requests it queues at once.
+Interactive games get a much larger weight than batch games, so their
+requests go to the front of the queue. Batch games still use any capacity
+that interactive games leave idle.
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+# Share of a contended resource each game gets, by priority class
+PRIORITY_WEIGHTS = {
+    INTERACTIVE: float(os.environ.get("SCHED_INTERACTIVE_WEIGHT", "8")),
+    BATCH: float(os.environ.get("SCHED_BATCH_WEIGHT", "1")),
+}
+# Concurrent calls per provider, across all games
+SCHED_LLM_SLOTS = int(os.environ.get("SCHED_LLM_SLOTS", "32"))
+# Concurrent sandbox test runs, across all games; each run itself uses up
+# to SANDBOX_PARALLELISM worker processes
+SCHED_SANDBOX_SLOTS = int(os.environ.get("SCHED_SANDBOX_SLOTS", "2"))
+# Concurrent fuzzing jobs, across all games. Fuzzing has its own slots so a
+# results phase never waits behind another game's fuzzing to run its tests.
+SCHED_FUZZ_SLOTS = int(os.environ.get("SCHED_FUZZ_SLOTS", "1"))
+# Recent waits kept per class for percentiles
+WAIT_SAMPLES_KEPT = 1000
+
+
+@dataclass(order=True, slots=True)
+class _Waiter:
+    finish: float  # Virtual finish tag; lowest is granted first
+    seq: int
+    start: float = field(compare=False)  # Virtual start tag
+    priority: str = field(compare=False)
+    enqueued: float = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class FairQueue:
+    """A resource's slots, granted to waiting games by weighted fair queuing.
+
+    Uses start-time fair queuing. Each request is tagged with a virtual
+    finish time of ``max(virtual now, the game's previous finish) + 1 /
+    weight``, and the lowest tag is served next. A game that queues many
+    requests therefore pushes only its own requests back.
+    """
+
+    def __init__(self, name: str, capacity: int):
+        self.name = name
+        self.capacity = max(1, capacity)
+        self.in_use = 0
+        self._waiters: list[_Waiter] = []
+        self._virtual_time = 0.0
+        self._finish: dict[str, float] = {}  # Last finish tag per game
+        self._seq = itertools.count()
+        self._granted = {priority: 0 for priority in PRIORITY_WEIGHTS}
+        self._waits = {priority: deque(maxlen=WAIT_SAMPLES_KEPT) for priority in PRIORITY_WEIGHTS}
+        self._max_wait = {priority: 0.0 for priority in PRIORITY_WEIGHTS}
+
+    def _record_grant(self, priority: str, waited: float):
+        self._granted[priority] += 1
+        self._waits[priority].append(waited)
+        self._max_wait[priority] = max(self._max_wait[priority], waited)
+
+    async def acquire(self, game_id: str, priority: str):
+        """Wait for a slot on behalf of a game."""
+        start = max(self._virtual_time, self._finish.get(game_id, 0.0))
+        finish = start + 1 / PRIORITY_WEIGHTS[priority]
+        self._finish[game_id] = finish
+
+        if self.in_use < self.capacity and not self._waiters:
+            self.in_use += 1
+            self._virtual_time = start
+            self._record_grant(priority, 0.0)
+            return
+
+        waiter = _Waiter(
+            finish=finish,
+            seq=next(self._seq),
+            start=start,
+            priority=priority,
+            enqueued=time.monotonic(),
+            future=asyncio.get_running_loop().create_future(),
+        )
+        heapq.heappush(self._waiters, waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted just as the caller was cancelled; pass the slot on
+                self.release()
+            else:
+                waiter.future.cancel()  # Skipped when it reaches the head of the queue
+            raise
+
+    def release(self):
+        """Give a slot back, handing it straight to the next waiter if any."""
+        while self._waiters:
+            waiter = heapq.heappop(self._waiters)
+            if waiter.future.cancelled():
+                continue
+            self._virtual_time = waiter.start
+            self._record_grant(waiter.priority, time.monotonic() - waiter.enqueued)
+            waiter.future.set_result(None)
+            return
+        self.in_use -= 1
+
+    def forget(self, game_id: str):
+        self._finish.pop(game_id, None)
+
+    def metrics(self) -> dict:
+        depth = {priority: 0 for priority in PRIORITY_WEIGHTS}
+        for waiter in self._waiters:
+            if not waiter.future.cancelled():
+                depth[waiter.priority] += 1
+        by_class = {}
+        for priority, waits in self._waits.items():
+            ordered = sorted(waits)
+            by_class[priority] = {
+                "queued": depth[priority],
+                "granted": self._granted[priority],
+                "meanWaitMs": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else None,
+                "p95WaitMs": round(ordered[int(len(ordered) * 0.95)] * 1000, 3) if ordered else None,
+                "maxWaitMs": round(self._max_wait[priority] * 1000, 3),
+            }
+        return {
+            "capacity": self.capacity,
+            "inUse": self.in_use,
+            "queued": sum(depth.values()),
+            "classes": by_class,
+        }
+
+
+class Scheduler:
+    """Fair queues for every scheduled resource, created on first use."""
+
+    def __init__(self):
+        self._queues: dict[str, FairQueue] = {}
+
+    def queue(self, resource: str) -> FairQueue:
+        queue = self._queues.get(resource)
+        if queue is None:
+            if resource == "sandbox":
+                capacity = SCHED_SANDBOX_SLOTS
+            elif resource == "fuzz":
+                capacity = SCHED_FUZZ_SLOTS
+            else:
+                capacity = SCHED_LLM_SLOTS
+            queue = self._queues[resource] = FairQueue(resource, capacity)
+        return queue
+
+    @asynccontextmanager
+    async def slot(self, resource: str, game_id: str, priority: str = INTERACTIVE):
+        """Hold one of a resource's slots for the duration of the block."""
+        queue = self.queue(resource)
+        await queue.acquire(game_id, priority)
+        try:
+            yield
+        finally:
+            queue.release()
+
+    def forget(self, game_id: str):
+        """Drop a deleted game's fair-queuing state."""
+        for queue in self._queues.values():
+            queue.forget(game_id)
+
+    def metrics(self) -> dict:
+        return {
+            "weights": PRIORITY_WEIGHTS,
+            "resources": {name: queue.metrics() for name, queue in self._queues.items()},
+        }
+
+
+# Global scheduler instance, shared by every game
+scheduler = Scheduler()
@@ -0,0 +1,71 @@
+"""Internal game state, kept separate from the Pydantic API models.
+
+The game loop mutates these slotted dataclasses in place. They are only
+converted to the Pydantic models in ``models.py`` when a view is served,
+and that conversion is cached per ``GameState.version``.
+"""
+
+from dataclasses import dataclass, field
+
+from .models import FuzzResult, Task, TestResult
+
+
+@dataclass(slots=True)
+class Player:
+    index: int
+    name: str
+    model: str
+    isEliminated: bool = False
+
+
+@dataclass(slots=True)
+class Submission:
+    playerIndex: int
+    code: str
+    timestamp: str
+
+
+@dataclass(slots=True)
+class Message:
+    playerIndex: int
+    content: str
+    discussionRound: int
+
+
+@dataclass(slots=True)
+class Vote:
+    voterIndex: int
+    solutionVote: int
+    suspectVote: int
+
+
+@dataclass(slots=True)
+class Round:
+    roundNumber: int
+    task: Task  # Immutable once built, shared between rounds and views
+    submissions: list[Submission] = field(default_factory=list)
+    discussion: list[Message] = field(default_factory=list)
+    votes: list[Vote] = field(default_factory=list)
+    chosenSubmission: int | None = None
+    testResults: TestResult | None = None
+    fuzzResults: FuzzResult | None = None
+    suspectVotes: dict[int, int] = field(default_factory=dict)
+    eliminatedPlayer: int | None = None
+
+
+@dataclass(slots=True)
+class GameState:
+    gameId: str
+    status: str  # 'lobby' | 'in_progress' | 'finished'
+    currentRound: int
+    currentPhase: str  # 'coding' | 'reveal' | 'discussion' | 'voting' | 'results'
+    players: list[Player]
+    imposterIndices: list[int]
+    rounds: list[Round] = field(default_factory=list)
+    winner: str | None = None  # 'crewmates' | 'imposter' | None
+    eliminatedPlayer: int | None = None
+    failedTaskCount: int = 0
+    discussionRoundNumber: int = 1
+    taskIds: list[str] = field(default_factory=list)  # One per round, from the task registry
+    priority: str = "interactive"  # 'interactive' | 'batch'; scheduling class for provider and sandbox capacity
+    version: int = 0  # Bumped on every mutation; keys cached views
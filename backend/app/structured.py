@@ -0,0 +1,132 @@
+"""Schema-constrained outputs for the coding and voting phases.
+
+Code submissions and votes are requested through each provider's native
+structured output rather than free text: tool use for Claude, a strict JSON
+schema for OpenAI, a response schema for Gemini and JSON mode for DeepSeek.
+The model writes only the fields the game reads, so no completion tokens go
+to prose that would be thrown away. Votes are limited to the players who may
+be chosen.
+
+``OutputSchema.parse`` checks a response against its schema. A response
+that does not match raises ``StructuredOutputError`` instead of being
+guessed at, so an invalid vote is never replaced by a default.
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Any
+
+# Output-token caps; reasoning models get their reasoning allowance on top.
+# A vote object is only ~15 tokens, but tool-call and JSON-mode framing
+# count toward the cap too, so votes keep generous room against truncation.
+CODE_MAX_TOKENS = 1024
+VOTE_MAX_TOKENS = 128
+
+
+class StructuredOutputError(ValueError):
+    """Raised when a response does not match the schema it was requested with."""
+
+
+@dataclass(slots=True, frozen=True)
+class OutputSchema:
+    """A JSON object schema a response must follow, named for tool calling."""
+
+    name: str
+    description: str
+    schema: dict
+
+    def parse(self, response: str | dict) -> dict:
+        """The response as a dict, checked against the schema."""
+        if isinstance(response, str):
+            try:
+                response = json.loads(response)
+            except json.JSONDecodeError as e:
+                raise StructuredOutputError(f"{self.name} response is not JSON: {e}") from None
+        if not isinstance(response, dict):
+            raise StructuredOutputError(f"{self.name} response is not a JSON object")
+        properties = self.schema["properties"]
+        for key in self.schema["required"]:
+            if key not in response:
+                raise StructuredOutputError(f"{self.name} response is missing {key!r}")
+        for key, value in response.items():
+            spec = properties.get(key)
+            if spec is None:
+                raise StructuredOutputError(f"{self.name} response has unexpected field {key!r}")
+            if not _matches(value, spec):
+                raise StructuredOutputError(f"{self.name} response has invalid {key!r}: {value!r}")
+        return response
+
+    def dumps(self, response: str | dict) -> str:
+        """The checked response as compact JSON, the form kept in histories."""
+        return json.dumps(self.parse(response), separators=(",", ":"))
+
+
+def _matches(value: Any, spec: dict) -> bool:
+    kind = spec["type"]
+    if kind == "string":
+        return isinstance(value, str)
+    if kind == "integer":
+        # bool is an int subclass, but never a valid player number
+        if not isinstance(value, int) or isinstance(value, bool):
+            return False
+        return "enum" not in spec or value in spec["enum"]
+    return False
+
+
+CODE_OUTPUT = OutputSchema(
+    name="submit_code",
+    description="Submit your Python solution for this round's task.",
+    schema={
+        "type": "object",
+        "properties": {
+            "code": {
+                "type": "string",
+                "description": "The complete Python function definition, without markdown or tests",
+            },
+        },
+        "required": ["code"],
+        "additionalProperties": False,
+    },
+)
+
+
+def vote_output(self_index: int, active_players: list[int]) -> OutputSchema:
+    """Schema for one player's votes, allowing only players they may vote for.
+
+    Players are numbered from 1, as in the prompts. Nobody may name
+    themselves as the suspect, unless they are the only player left.
+    """
+    numbers = [i + 1 for i in active_players]
+    suspects = [n for n in numbers if n != self_index + 1] or numbers
+    return OutputSchema(
+        name="submit_vote",
+        description="Cast your votes for this round.",
+        schema={
+            "type": "object",
+            "properties": {
+                "solution": {
+                    "type": "integer",
+                    "enum": numbers,
+                    "description": "Number of the player whose solution should be used",
+                },
+                "suspect": {
+                    "type": "integer",
+                    "enum": suspects,
+                    "description": "Number of the player you think is an Imposter",
+                },
+            },
+            "required": ["solution", "suspect"],
+            "additionalProperties": False,
+        },
+    )
+
+
+def response_format(provider: str, output: OutputSchema) -> dict:
+    """``response_format`` for an OpenAI-compatible chat completion."""
+    if provider == "openai":
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": output.name, "strict": True, "schema": output.schema},
+        }
+    # DeepSeek has JSON mode but no schemas; the prompt describes the object
+    return {"type": "json_object"}
@@ -0,0 +1,235 @@
+"""Indexed registry of task definitions.
+
+Tasks come from the built-in ``TASKS`` list plus, optionally, a directory of
+``.json``/``.yaml`` files (one task per file, same shape as the built-ins).
+The index is built by ``load_index``, which the server runs in a worker
+thread at startup. A directory may ship an ``index.json`` listing
+``{"id", "difficulty", "tags", "file"}`` per task, in which case a task
+file is only opened when a game selects it. ``select`` validates every task
+it picks, so a broken file is skipped when the game is created rather than
+failing the game part-way.
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from pydantic import ValidationError
+
+from .models import Task
+from .tasks import TASKS
+
+logger = logging.getLogger(__name__)
+
+TASK_DIR = os.environ.get("TASK_DIR")
+DIFFICULTY_ORDER = {"easy": 0, "medium": 1, "hard": 2}
+TASK_FILE_SUFFIXES = (".json", ".yaml", ".yml")
+
+
+class TaskLoadError(Exception):
+    """Raised when a task definition cannot be read or is invalid."""
+
+
+@dataclass(frozen=True, slots=True)
+class TaskEntry:
+    id: str
+    difficulty: str
+    tags: frozenset[str]
+    path: Path | None = None  # None for built-in tasks
+
+
+def _read_file(path: Path) -> dict:
+    """Read one task definition file."""
+    if path.suffix == ".json":
+        parse, errors = json.loads, ()
+    else:
+        try:
+            import yaml
+        except ImportError:
+            raise TaskLoadError(f"{path}: PyYAML is required to load YAML tasks (uv sync --extra tasks)")
+        parse, errors = yaml.safe_load, (yaml.YAMLError,)
+    try:
+        definition = parse(path.read_text())
+    except (OSError, ValueError, *errors) as e:
+        raise TaskLoadError(f"{path}: {e}")
+    if not isinstance(definition, dict):
+        raise TaskLoadError(f"{path}: expected a mapping, got {type(definition).__name__}")
+    return definition
+
+
+class TaskRegistry:
+    """Lazily loaded, indexed pool of tasks."""
+
+    def __init__(self, directory: str | None = None, builtin: list[dict] | None = None):
+        self.directory = Path(directory) if directory else None
+        self._builtin = {task["id"]: task for task in (TASKS if builtin is None else builtin)}
+        self._entries: dict[str, TaskEntry] | None = None
+        self._by_difficulty: dict[str, set[str]] = {}
+        self._by_tag: dict[str, set[str]] = {}
+        self._definitions: dict[str, dict] = {}
+        self._models: dict[str, Task] = {}
+        # The index may be built from a worker thread
+        self._lock = threading.Lock()
+
+    def _add_entry(self, entry: TaskEntry):
+        if entry.id in self._entries:
+            logger.warning("Duplicate task id %r; keeping the first definition", entry.id)
+            return
+        self._entries[entry.id] = entry
+        self._by_difficulty.setdefault(entry.difficulty, set()).add(entry.id)
+        for tag in entry.tags:
+            self._by_tag.setdefault(tag, set()).add(entry.id)
+
+    def load_index(self) -> int:
+        """Build the index now instead of on first use; returns the task count.
+
+        Without an ``index.json`` this parses every task file, so the server
+        calls it from a worker thread.
+        """
+        return len(self._ensure_index())
+
+    def _ensure_index(self) -> dict[str, TaskEntry]:
+        """Build the id/difficulty/tag index on first use."""
+        if self._entries is not None:
+            return self._entries
+        with self._lock:
+            if self._entries is None:
+                self._build_index()
+        return self._entries
+
+    def _build_index(self):
+        self._entries = {}
+        for task in self._builtin.values():
+            self._add_entry(
+                TaskEntry(task["id"], task.get("difficulty", "medium"), frozenset(task.get("tags", ())))
+            )
+
+        if self.directory is None:
+            return
+
+        index_file = self.directory / "index.json"
+        if index_file.exists():
+            for item in json.loads(index_file.read_text()):
+                self._add_entry(
+                    TaskEntry(
+                        item["id"],
+                        item.get("difficulty", "medium"),
+                        frozenset(item.get("tags", ())),
+                        self.directory / item["file"],
+                    )
+                )
+            return
+
+        for path in sorted(self.directory.iterdir()):
+            if path.suffix not in TASK_FILE_SUFFIXES:
+                continue
+            try:
+                definition = self._validate(_read_file(path), path)
+            except TaskLoadError as e:
+                logger.warning("Skipping task file: %s", e)
+                continue
+            self._definitions[definition["id"]] = definition
+            self._add_entry(
+                TaskEntry(
+                    definition["id"],
+                    definition.get("difficulty", "medium"),
+                    frozenset(definition.get("tags", ())),
+                    path,
+                )
+            )
+
+    def _validate(self, definition: dict, source: Path | str) -> dict:
+        """Check a definition against the Task model and cache the model."""
+        try:
+            self._models[definition["id"]] = Task.model_validate(definition)
+        except (KeyError, TypeError, ValidationError) as e:
+            raise TaskLoadError(f"{source}: invalid task definition: {e}")
+        return definition
+
+    def __len__(self) -> int:
+        return len(self._ensure_index())
+
+    def ids(self) -> list[str]:
+        return list(self._ensure_index())
+
+    def get(self, task_id: str) -> dict:
+        """Get a task definition by id, loading it on first use."""
+        definition = self._definitions.get(task_id)
+        if definition is not None:
+            return definition
+
+        entry = self._ensure_index().get(task_id)
+        if entry is None:
+            raise KeyError(task_id)
+        if entry.path is None:
+            definition = self._builtin[task_id]
+        else:
+            definition = _read_file(entry.path)
+            if definition.get("id") != task_id:
+                raise TaskLoadError(f"{entry.path}: expected task id {task_id!r}")
+        definition = self._validate(definition, entry.path or task_id)
+        self._definitions[task_id] = definition
+        return definition
+
+    def get_model(self, task_id: str) -> Task:
+        """Get the validated Task model for a task, shared by every game."""
+        model = self._models.get(task_id)
+        if model is None:
+            self.get(task_id)
+            model = self._models[task_id]
+        return model
+
+    def find(self, difficulty: str | None = None, tags: list[str] | None = None) -> set[str]:
+        """Ids of tasks with the given difficulty and all of the given tags."""
+        entries = self._ensure_index()
+        matches = set(entries) if difficulty is None else set(self._by_difficulty.get(difficulty, ()))
+        for tag in tags or ():
+            matches &= self._by_tag.get(tag, set())
+        return matches
+
+    def select(
+        self,
+        count: int,
+        seed: int,
+        difficulty: str | None = None,
+        tags: list[str] | None = None,
+    ) -> list[str]:
+        """Pick up to ``count`` distinct valid task ids with a seeded RNG, easiest first.
+
+        Only the picks are loaded and validated. A task whose file is broken
+        is logged, skipped and dropped from the index, and a replacement is
+        drawn from the remaining candidates.
+        """
+        rng = random.Random(seed)
+        candidates = sorted(self.find(difficulty, tags))
+        chosen = []
+        while candidates and len(chosen) < count:
+            picks = rng.sample(candidates, min(count - len(chosen), len(candidates)))
+            for task_id in picks:
+                try:
+                    self.get(task_id)
+                except TaskLoadError as e:
+                    logger.error("Dropping broken task: %s", e)
+                    self._remove_entry(task_id)
+                    continue
+                chosen.append(task_id)
+            picked = set(picks)
+            candidates = [task_id for task_id in candidates if task_id not in picked]
+        if not chosen:
+            raise ValueError("No tasks match the requested difficulty and tags")
+        entries = self._ensure_index()
+        return sorted(chosen, key=lambda task_id: DIFFICULTY_ORDER.get(entries[task_id].difficulty, 1))
+
+    def _remove_entry(self, task_id: str):
+        entry = self._entries.pop(task_id)
+        self._by_difficulty[entry.difficulty].discard(task_id)
+        for tag in entry.tags:
+            self._by_tag[tag].discard(task_id)
+
+
+# Global task registry instance
+task_registry = TaskRegistry(TASK_DIR)
@@ -2,6 +2,8 @@
 
 TASK_1 = {
     "id": "fizzbuzz",
+    "difficulty": "easy",
+    "tags": ["loops", "strings"],
     "title": "FizzBuzz",
     "functionName": "fizzbuzz",
     "description": """Write a function fizzbuzz(n) that returns a list of strings from 1 to n where:
@@ -65,10 +67,26 @@ Example: fizzbuzz(5) returns ["1", "2", "Fizz", "4", "Buzz"]""",
             ],
         },
     ],
+    "reference": """def fizzbuzz(n):
+    result = []
+    for i in range(1, n + 1):
+        if i % 15 == 0:
+            result.append("FizzBuzz")
+        elif i % 3 == 0:
+            result.append("Fizz")
+        elif i % 5 == 0:
+            result.append("Buzz")
+        else:
+            result.append(str(i))
+    return result""",
+    "inputs": [{"type": "int", "min": 0, "max": 200}],
+    "scaling": [1000, 10000, 100000, 1000000],
 }
 
 TASK_2 = {
     "id": "palindrome",
+    "difficulty": "easy",
+    "tags": ["strings", "two-pointers"],
     "title": "Valid Palindrome",
     "functionName": "is_palindrome",
     "description": """Write a function is_palindrome(s) that returns True if the string is a palindrome, considering only alphanumeric characters and ignoring case.
@@ -93,10 +111,27 @@ Example: is_palindrome("") returns True""",
         {"input": ["123321"], "expected": True},
         {"input": ["A1b2B1a"], "expected": True},
     ],
+    "reference": """def is_palindrome(s):
+    chars = [c.lower() for c in s if c.isalnum()]
+    return chars == chars[::-1]""",
+    "generator": """def generate(rng, size, exact=False):
+    alphabet = "abAB01 ,:_-"
+    length = size if exact else rng.randint(0, size)
+    half = "".join(rng.choice(alphabet) for _ in range(length // 2))
+    if exact or rng.random() < 0.5:
+        # Mirror the string, then perturb case and punctuation
+        mirrored = half + rng.choice(["", rng.choice(alphabet)]) + half[::-1]
+        s = "".join(c.swapcase() if rng.random() < 0.3 else c for c in mirrored)
+    else:
+        s = "".join(rng.choice(alphabet) for _ in range(length))
+    return [s]""",
+    "scaling": [1000, 10000, 100000, 1000000],
 }
 
 TASK_3 = {
     "id": "duplicates",
+    "difficulty": "easy",
+    "tags": ["lists", "hashing"],
     "title": "Find Duplicates",
     "functionName": "find_duplicates",
     "description": """Write a function find_duplicates(nums) that takes a list of integers and returns a sorted list of all elements that appear more than once.
@@ -120,10 +155,19 @@ Example: find_duplicates([1, 1, 1]) returns [1]""",
         {"input": [[-1, -1, 0, 0]], "expected": [-1, 0]},
         {"input": [[1, 2, 2, 3, 3, 3, 4, 4, 4, 4]], "expected": [2, 3, 4]},
     ],
+    "reference": """def find_duplicates(nums):
+    counts = {}
+    for n in nums:
+        counts[n] = counts.get(n, 0) + 1
+    return sorted(n for n, c in counts.items() if c > 1)""",
+    "inputs": [{"type": "list", "items": {"type": "int", "min": -10, "max": 10}, "max_len": 40}],
+    "scaling": [1000, 10000, 100000, 1000000],
 }
 
 TASK_4 = {
     "id": "balanced_parens",
+    "difficulty": "medium",
+    "tags": ["strings", "stack"],
     "title": "Balanced Parentheses",
     "functionName": "is_balanced",
     "description": """Write a function is_balanced(s) that returns True if the string has balanced parentheses, brackets, and braces. Other characters should be ignored.
@@ -153,10 +197,49 @@ Example: is_balanced("") returns True""",
         {"input": ["({[}])"], "expected": False},
         {"input": ["((((((((((()))))))))))"], "expected": True},
     ],
+    "reference": """def is_balanced(s):
+    pairs = {")": "(", "]": "[", "}": "{"}
+    stack = []
+    for c in s:
+        if c in "([{":
+            stack.append(c)
+        elif c in pairs:
+            if not stack or stack.pop() != pairs[c]:
+                return False
+    return not stack""",
+    "generator": """def generate(rng, size, exact=False):
+    closers = {"(": ")", "[": "]", "{": "}"}
+    if exact:
+        # Deeply nested and balanced, so a solution has to scan all of it
+        openers = [rng.choice("([{") for _ in range(size // 2)]
+        return ["".join(openers) + "".join(closers[c] for c in reversed(openers))]
+    length = rng.randint(0, size)
+    out, stack = [], []
+    for _ in range(length):
+        r = rng.random()
+        if r < 0.4:
+            opener = rng.choice("([{")
+            stack.append(opener)
+            out.append(opener)
+        elif r < 0.8 and stack:
+            out.append(closers[stack.pop()])
+        else:
+            out.append(rng.choice("ab )]}"))
+    if rng.random() < 0.5:
+        # Close everything so roughly half the inputs are balanced
+        out.extend(closers[c] for c in reversed(stack))
+    if out and rng.random() < 0.2:
+        # Swap two characters to produce interleavings like "([)]"
+        i, j = rng.randrange(len(out)), rng.randrange(len(out))
+        out[i], out[j] = out[j], out[i]
+    return ["".join(out)]""",
+    "scaling": [1000, 10000, 100000, 1000000],
 }
 
 TASK_5 = {
     "id": "roman_to_int",
+    "difficulty": "medium",
+    "tags": ["strings", "parsing"],
     "title": "Roman Numeral to Integer",
     "functionName": "roman_to_int",
     "description": """Write a function roman_to_int(s) that converts a Roman numeral string to an integer.
@@ -186,6 +269,27 @@ Example: roman_to_int("MCMXCIV") returns 1994""",
         {"input": ["CMXCIX"], "expected": 999},
         {"input": ["MMMCMXCIX"], "expected": 3999},
     ],
+    "reference": """def roman_to_int(s):
+    values = {"I": 1, "V": 5, "X": 10, "L": 50, "C": 100, "D": 500, "M": 1000}
+    total = 0
+    for i, c in enumerate(s):
+        if i + 1 < len(s) and values[s[i + 1]] > values[c]:
+            total -= values[c]
+        else:
+            total += values[c]
+    return total""",
+    "generator": """def generate(rng, size, exact=False):
+    numerals = [(1000, "M"), (900, "CM"), (500, "D"), (400, "CD"), (100, "C"), (90, "XC"),
+                (50, "L"), (40, "XL"), (10, "X"), (9, "IX"), (5, "V"), (4, "IV"), (1, "I")]
+    n = rng.randint(1, 3999)
+    s = ""
+    for value, symbol in numerals:
+        while n >= value:
+            s += symbol
+            n -= value
+    return [s]""",
+    # Shrinking would produce invalid numerals, whose value is undefined
+    "shrink": False,
 }
 
 TASKS = [TASK_1, TASK_2, TASK_3, TASK_4, TASK_5]
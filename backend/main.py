@@ -1,6 +1,24 @@
 """Entry point for the backend server."""
 
+import os
+
 import uvicorn
 
+from app.game import DRAIN_TIMEOUT
+
+# Negotiate permessage-deflate on the game WebSocket; state frames carry
+# whole code submissions and discussions, which compress well
+WS_PER_MESSAGE_DEFLATE = os.environ.get("WS_PER_MESSAGE_DEFLATE", "1") == "1"
+# Auto-reload on code changes; a reload drops games, so it is off unless asked for
+DEV_RELOAD = os.environ.get("DEV_RELOAD", "0") == "1"
+
 if __name__ == "__main__":
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=DEV_RELOAD,
+        ws_per_message_deflate=WS_PER_MESSAGE_DEFLATE,
+        # Leave room for the drain to checkpoint games after phases finish
+        timeout_graceful_shutdown=int(DRAIN_TIMEOUT) + 10,
+    )
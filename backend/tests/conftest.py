@@ -0,0 +1,11 @@
+import pytest
+
+from app.game import GameManager
+
+# Mock models answer from canned responses, without any provider SDK or key
+MOCK_MODELS = ["mock-a", "mock-b", "mock-c", "mock-d"]
+
+
+@pytest.fixture
+def manager() -> GameManager:
+    return GameManager()
@@ -0,0 +1,21 @@
+from fastapi.testclient import TestClient
+
+from app import main
+
+client = TestClient(main.app)  # Not entered, so the lifespan does not run
+
+
+def test_admin_endpoints_are_disabled_without_a_token(monkeypatch):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "")
+    response = client.get("/api/admin/scheduler", headers={"Authorization": "Bearer anything"})
+    assert response.status_code == 403
+
+
+def test_admin_endpoints_require_the_token(monkeypatch):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "s3cret")
+    assert client.get("/api/admin/scheduler").status_code == 401
+    assert client.get("/api/admin/scheduler", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.post("/api/admin/drain").status_code == 401
+    response = client.get("/api/admin/scheduler", headers={"Authorization": "Bearer s3cret"})
+    assert response.status_code == 200
+    assert "resources" in response.json()
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from app import batch, fuzz, llm
+from app.checkpoint import checkpoint_store
+from app.game import GameManager
+from app.structured import CODE_OUTPUT, StructuredOutputError
+from conftest import MOCK_MODELS
+
+
+@pytest.fixture(autouse=True)
+def batch_api(monkeypatch, tmp_path):
+    monkeypatch.setattr(llm, "BATCH_API", True)
+    monkeypatch.setattr(batch, "BATCH_WINDOW", 0.01)
+    monkeypatch.setattr(fuzz, "FUZZ_CASES", 0)
+    monkeypatch.setattr(checkpoint_store, "directory", str(tmp_path))
+
+
+def started_batch_game(manager):
+    game = manager.create_game(MOCK_MODELS, seed="batch", priority="batch")
+    manager.start_game(game.gameId)
+    return game
+
+
+async def until(condition, timeout=10.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_batch_game_is_played_in_the_background(manager):
+    game = started_batch_game(manager)
+    assert manager.runs_in_background(game)
+    updates = []
+
+    async def on_update(game_id):
+        updates.append(game_id)
+
+    async def run():
+        manager.on_update(on_update)
+        manager.advance_in_background(game.gameId)
+        manager.advance_in_background(game.gameId)  # Already running; no second driver
+        assert manager.sweep_expired(now=float("inf")) == []
+        await until(lambda: game.gameId not in manager._drivers, timeout=60)
+
+    asyncio.run(run())
+    assert game.status == "finished"
+    assert updates and set(updates) == {game.gameId}
+    stats = manager.llm.batches.stats()
+    assert stats["batches"] > 0 and stats["completed"] == stats["requests"]
+
+
+def test_unusable_batch_responses_are_retried_once(manager):
+    game = started_batch_game(manager)
+    responses = iter(["", '{"code": "def f(): pass"}', "not json", "still not json"])
+
+    async def complete(request):
+        return next(responses)
+
+    manager.llm.batches._local._complete = complete
+
+    async def call():
+        request = manager.llm.batches.request("mock", "mock-a", "system", [], 64, "coding", CODE_OUTPUT)
+        return await manager.llm._call_batch(game, 0, "prompt", request)
+
+    assert asyncio.run(call()) == '{"code":"def f(): pass"}'
+    with pytest.raises(StructuredOutputError):
+        asyncio.run(call())
+    assert manager.llm.pending_snapshot(game.gameId) is None
+
+
+def test_drained_batch_game_resumes_in_the_next_process(manager):
+    game = started_batch_game(manager)
+    released = asyncio.Event()
+    complete = manager.llm.batches._local._complete
+
+    async def held(request):
+        await released.wait()
+        return await complete(request)
+
+    manager.llm.batches._local._complete = held
+
+    async def drain():
+        manager.advance_in_background(game.gameId)
+        await until(lambda: manager.llm.pending_snapshot(game.gameId) is not None)
+        snapshot = manager.llm.pending_snapshot(game.gameId)
+        await manager.drain(timeout=0.05)
+        return snapshot
+
+    snapshot = asyncio.run(drain())
+    assert {entry["playerIndex"] for entry in snapshot["batched"]} == {0, 1, 2, 3}
+    assert all(entry["batchId"] for entry in snapshot["batched"])
+
+    restarted = GameManager()
+
+    async def resume():
+        assert restarted.restore_checkpoints() == 1
+        assert game.gameId in restarted._drivers
+        await until(lambda: game.gameId not in restarted._drivers, timeout=60)
+        return restarted.get_game(game.gameId)
+
+    resumed = asyncio.run(resume())
+    # The stand-in's batch died with its process, so the calls were resubmitted
+    assert resumed.status == "finished"
+    assert restarted.llm.batches.stats()["resumed"] == 4
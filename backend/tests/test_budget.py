@@ -0,0 +1,59 @@
+from app import budget
+from app.budget import MAX_GROWTH, MIN_REASONING_TOKENS, MIN_SAMPLES, BudgetPolicy, reasoning_style
+
+
+def test_reasoning_style_by_model():
+    assert reasoning_style("openai", "gpt-5-mini") == "effort"
+    assert reasoning_style("openai", "o3") == "effort"
+    assert reasoning_style("openai", "gpt-4o") is None
+    assert reasoning_style("google", "gemini-2.5-flash") == "thinking"
+    assert reasoning_style("google", "gemini-2.0-flash") is None
+    assert reasoning_style("deepseek", "deepseek-reasoner") == "tokens"
+    assert reasoning_style("anthropic", "claude-sonnet-4-5") is None
+
+
+def test_non_reasoning_models_get_only_the_output_cap():
+    policy = BudgetPolicy()
+    assert policy.budget("openai", "gpt-4o", "voting", 128).max_tokens == 128
+    policy.observe("openai", "gpt-4o", "voting", None, empty=True)
+    assert policy.stats() == []
+
+
+def test_empty_responses_double_the_allowance_up_to_the_ceiling():
+    policy = BudgetPolicy()
+    start = policy.budget("google", "gemini-2.5-pro", "voting", 100).thinking_tokens
+    policy.observe("google", "gemini-2.5-pro", "voting", None, empty=True)
+    assert policy.budget("google", "gemini-2.5-pro", "voting", 100).thinking_tokens == start * 2
+    for _ in range(10):
+        policy.observe("google", "gemini-2.5-pro", "voting", None, empty=True)
+    grown = policy.budget("google", "gemini-2.5-pro", "voting", 100)
+    assert grown.thinking_tokens == start * MAX_GROWTH
+    assert grown.max_tokens == 100 + start * MAX_GROWTH
+
+
+def test_allowance_follows_observed_usage_after_enough_samples():
+    policy = BudgetPolicy()
+    start = policy.budget("openai", "gpt-5", "coding", 1024).max_tokens - 1024
+    for _ in range(MIN_SAMPLES - 1):
+        policy.observe("openai", "gpt-5", "coding", 1000)
+    assert policy.budget("openai", "gpt-5", "coding", 1024).max_tokens == 1024 + start
+    policy.observe("openai", "gpt-5", "coding", 1000)
+    adapted = policy.budget("openai", "gpt-5", "coding", 1024)
+    assert adapted.max_tokens == 1024 + int(1000 * budget.REASONING_HEADROOM)
+    assert adapted.effort == "medium"
+
+
+def test_allowance_never_drops_below_the_minimum():
+    policy = BudgetPolicy()
+    for _ in range(MIN_SAMPLES):
+        policy.observe("deepseek", "deepseek-reasoner", "discussion", 0)
+    assert policy.budget("deepseek", "deepseek-reasoner", "discussion", 64).max_tokens == 64 + MIN_REASONING_TOKENS
+
+
+def test_adaptation_can_be_turned_off(monkeypatch):
+    monkeypatch.setattr(budget, "REASONING_ADAPT", False)
+    policy = BudgetPolicy()
+    start = policy.budget("openai", "o3", "voting", 100).max_tokens
+    policy.observe("openai", "o3", "voting", None, empty=True)
+    assert policy.budget("openai", "o3", "voting", 100).max_tokens == start
+    assert policy.stats()[0]["emptyResponses"] == 1
@@ -0,0 +1,161 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import fuzz, main
+from app.checkpoint import CHECKPOINT_VERSION, CheckpointStore, checkpoint_store, game_from_dict, game_to_dict
+from app.fuzz import can_fuzz
+from app.game import GameManager, PhaseCancelledError, game_manager
+from conftest import MOCK_MODELS
+
+
+@pytest.fixture(autouse=True)
+def checkpoint_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(checkpoint_store, "directory", str(tmp_path))
+    monkeypatch.setattr(fuzz, "FUZZ_CASES", 50)
+    return tmp_path
+
+
+def started_game(manager):
+    game = manager.create_game(MOCK_MODELS, seed="checkpoint")
+    manager.start_game(game.gameId)
+    return game
+
+
+async def advance_to(manager, game, phase):
+    while game.currentPhase != phase:
+        await manager.advance_phase(game.gameId)
+
+
+def test_a_checkpoint_is_claimed_exactly_once(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    store.save("abc123", {"game": {"gameId": "abc123"}})
+    assert store.pending() == ["abc123"]
+    assert store.claim("abc123") == {"version": CHECKPOINT_VERSION, "game": {"gameId": "abc123"}}
+    assert store.claim("abc123") is None
+    assert store.pending() == []
+
+
+def test_unsafe_ids_and_old_versions_are_not_restored(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    assert store.claim("../etc") is None
+    (tmp_path / "old1.json").write_text('{"version": 0}')
+    assert store.claim("old1") is None
+
+
+def test_corrupt_checkpoints_are_quarantined_and_skipped(manager, checkpoint_dir):
+    good = started_game(manager)
+    manager.checkpoint(good.gameId)
+    (checkpoint_dir / "trunc1.json").write_text('{"version": ')
+    checkpoint_store.save("broken1", {"game": {"gameId": "broken1"}})
+
+    restarted = GameManager()
+    assert restarted.restore_checkpoints() == 1
+    assert list(restarted.games) == [good.gameId]
+    assert sorted(p.name for p in checkpoint_dir.iterdir()) == ["broken1.json.bad", "trunc1.json.bad"]
+    assert restarted.get_game("trunc1") is None
+
+
+def test_game_state_round_trips(manager):
+    game = started_game(manager)
+    asyncio.run(advance_to(manager, game, "voting"))
+    assert game_to_dict(game_from_dict(game_to_dict(game))) == game_to_dict(game)
+
+
+def test_restore_picks_up_history_and_pending_turns(manager):
+    game = started_game(manager)
+    asyncio.run(advance_to(manager, game, "discussion"))
+    manager.checkpoint(game.gameId)
+    history = manager.llm.histories.snapshot(game.gameId)
+
+    restarted = GameManager()
+    restored = restarted.get_game(game.gameId)  # Claimed on first request
+    assert restored.version == game.version and restored.currentPhase == "discussion"
+    assert restarted.llm.histories.snapshot(game.gameId) == history
+    asyncio.run(restarted.advance_phase(game.gameId))
+    assert len(restored.rounds[0].discussion) == len(MOCK_MODELS)
+
+
+def test_drain_cancels_a_stuck_phase_and_checkpoints_its_start(manager):
+    game = started_game(manager)
+    complete = manager.llm._call_llm
+    calls = 0
+
+    async def stuck_after_two(**kwargs):
+        nonlocal calls
+        calls += 1
+        if calls > 2:
+            await asyncio.Event().wait()
+        return await complete(**kwargs)
+
+    manager.llm._call_llm = stuck_after_two
+    start_version = game.version
+
+    async def run():
+        advance = asyncio.create_task(manager.advance_phase(game.gameId))
+        while calls < len(MOCK_MODELS):
+            await asyncio.sleep(0.01)
+        tokens = await manager.drain(timeout=0.05)
+        with pytest.raises(PhaseCancelledError):
+            await advance
+        return tokens
+
+    tokens = asyncio.run(run())
+    assert tokens == {game.gameId: f"{game.gameId}:{start_version}"}
+    assert not manager.games and not manager._phases and not manager._phase_start
+
+    restarted = GameManager()
+    restored = restarted.get_game(game.gameId)
+    assert restored.version == start_version and restored.currentPhase == "coding"
+    assert restarted.check_resume_token(restored, tokens[game.gameId])
+    assert not restarted.check_resume_token(restored, f"{game.gameId}:{start_version + 1}")
+    assert not restarted.check_resume_token(restored, f"other:{start_version}")
+    # The two turns that finished before the drain are not asked for again
+    assert len(restarted.llm.pending_snapshot(game.gameId)["turns"]) == 2
+    asyncio.run(restarted.advance_phase(game.gameId))
+    assert restored.currentPhase == "reveal"
+
+
+def test_results_phase_cut_short_by_a_drain_still_fuzzes_after_restore(manager):
+    game = started_game(manager)
+    asyncio.run(advance_to(manager, game, "results"))
+    release = threading.Event()
+
+    def stuck_tests(code, task_dict, seed):
+        release.wait()
+
+    manager._test_submission = stuck_tests
+
+    async def run():
+        advance = asyncio.create_task(manager.advance_phase(game.gameId))
+        await asyncio.sleep(0.2)
+        await manager.drain(timeout=0.05)
+        with pytest.raises(PhaseCancelledError):
+            await advance
+
+    try:
+        asyncio.run(run())
+    finally:
+        release.set()
+
+    restarted = GameManager()
+    restored = restarted.get_game(game.gameId)
+    assert restored.currentPhase == "results" and restored.rounds[0].fuzzResults is None
+    task = restarted._get_current_task_dict(restored)
+    asyncio.run(restarted.advance_phase(game.gameId))
+    assert restored.rounds[0].testResults is not None
+    assert (restored.rounds[0].fuzzResults is not None) == can_fuzz(task)
+
+
+def test_admin_drain_shuts_the_server_down(monkeypatch):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "s3cret")
+    monkeypatch.setattr(game_manager, "draining", False)
+    shutdowns = []
+    monkeypatch.setattr(main, "request_shutdown", lambda: shutdowns.append(True))
+    client = TestClient(main.app)
+    response = client.post("/api/admin/drain", headers={"Authorization": "Bearer s3cret"})
+    assert response.status_code == 200
+    assert shutdowns == [True]
+    assert client.post("/api/game/create", json={}).status_code == 503
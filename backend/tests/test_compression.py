@@ -0,0 +1,83 @@
+import gzip
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import compression, game as game_module, main
+from app.compression import negotiate
+from app.game import game_manager
+
+from conftest import MOCK_MODELS
+
+
+class FakeBrotli:
+    @staticmethod
+    def compress(body, quality):
+        return b"br:" + body
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, None),
+        ("", None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("GZIP, deflate", "gzip"),
+        ("gzip;q=0", None),
+        ("gzip;q=0.0, identity", None),
+        ("gzip;q=0.5", "gzip"),
+        ("gzip;q=oops", None),
+        ("*", "gzip"),
+        ("*;q=0", None),
+        ("*, gzip;q=0", None),
+        ("br", None),
+        ("br, gzip;q=0.1", "gzip"),
+    ],
+)
+def test_negotiate_without_brotli(monkeypatch, header, expected):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert negotiate(header) == expected
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [("br", "br"), ("gzip, br", "br"), ("br;q=0, gzip", "gzip"), ("*", "br"), ("deflate", None)],
+)
+def test_negotiate_prefers_brotli_when_installed(monkeypatch, header, expected):
+    monkeypatch.setattr(compression, "brotli", FakeBrotli)
+    assert negotiate(header) == expected
+
+
+def test_small_bodies_are_not_compressed(manager, monkeypatch):
+    monkeypatch.setattr(game_module, "COMPRESS_MIN_BYTES", 1 << 30)
+    view = manager.get_game_view(manager.create_game(MOCK_MODELS).gameId)
+    assert view.encoded_body("gzip") == (view.body, None)
+    assert not view.compressed
+
+
+def test_state_endpoint_serves_cached_gzip(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    monkeypatch.setattr(game_module, "COMPRESS_MIN_BYTES", 0)
+    client = TestClient(main.app)
+    game = game_manager.create_game(MOCK_MODELS)
+    try:
+        url = f"/api/game/{game.gameId}/state"
+        plain = client.get(url, headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in plain.headers
+        assert "Accept-Encoding" in plain.headers["vary"]
+
+        zipped = client.get(url, headers={"Accept-Encoding": "gzip"})
+        assert zipped.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in zipped.headers["vary"]
+        assert zipped.headers["etag"] == f"W/{plain.headers['etag']}"
+        assert json.loads(zipped.content) == json.loads(plain.content)
+        view = game_manager.get_game_view(game.gameId)
+        assert gzip.decompress(view.compressed["gzip"]) == view.body
+
+        # A weak tag from a compressed response matches the identity body too
+        cached = client.get(url, headers={"If-None-Match": zipped.headers["etag"], "Accept-Encoding": "identity"})
+        assert cached.status_code == 304
+    finally:
+        game_manager.delete_game(game.gameId)
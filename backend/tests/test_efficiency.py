@@ -0,0 +1,74 @@
+import math
+
+import pytest
+
+from app.models import EfficiencySample
+from app.sandbox import fit_complexity, measure_efficiency
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+NOISE = [1.0, 1.08, 0.95, 1.03]  # Timing jitter of a few percent
+
+
+def timed(growth, sizes=SIZES, noise=NOISE):
+    return [EfficiencySample(size=n, wallTime=1e-7 * growth(n) * jitter) for n, jitter in zip(sizes, noise)]
+
+
+@pytest.mark.parametrize(
+    "growth, complexity, exponent",
+    [
+        (lambda n: 1.0, "O(1)", 0),
+        (lambda n: float(n), "O(n)", 1),
+        (lambda n: n * math.log2(n), "O(n log n)", 1.1),
+        (lambda n: float(n) ** 2, "O(n^2)", 2),
+    ],
+)
+def test_fit_picks_the_generating_class(growth, complexity, exponent):
+    fitted, slope = fit_complexity(timed(growth))
+    assert fitted == complexity
+    assert slope == pytest.approx(exponent, abs=0.1)
+
+
+@pytest.mark.parametrize(
+    "samples",
+    [
+        [],
+        [EfficiencySample(size=1000, wallTime=0.01)],
+        [EfficiencySample(size=n, wallTime=0.0) for n in SIZES],
+        [EfficiencySample(size=n, error="TIMEOUT") for n in SIZES],
+        # Size 1 carries no growth information and is ignored
+        [EfficiencySample(size=1, wallTime=0.001), EfficiencySample(size=1000, wallTime=0.01)],
+    ],
+)
+def test_too_little_data_fits_nothing(samples):
+    assert fit_complexity(samples) == (None, None)
+
+
+def test_failed_sizes_are_left_out_of_the_fit():
+    samples = timed(lambda n: float(n))[:3] + [EfficiencySample(size=SIZES[3], error="MemoryError")]
+    assert fit_complexity(samples)[0] == "O(n)"
+
+
+LINEAR = """
+def total(xs):
+    return sum(xs)
+"""
+FAILS_WHEN_LARGE = """
+def total(xs):
+    if len(xs) > 100:
+        raise MemoryError("too big")
+    return sum(xs)
+"""
+
+
+def test_measure_reports_a_sample_per_size():
+    report = measure_efficiency(LINEAR, "total", [(2_000, [list(range(2_000))]), (200, [list(range(200))])])
+    assert [s.size for s in report.samples] == [200, 2_000]
+    assert all(s.error is None and s.wallTime > 0 for s in report.samples)
+
+
+def test_measure_skips_larger_sizes_after_a_failure():
+    inputs = [(n, [list(range(n))]) for n in (10, 1_000, 10_000)]
+    report = measure_efficiency(FAILS_WHEN_LARGE, "total", inputs)
+    assert [s.size for s in report.samples] == [10, 1_000]
+    assert "MemoryError" in report.samples[1].error
+    assert report.complexity is None
@@ -0,0 +1,42 @@
+import asyncio
+
+from app import main
+from app.main import ConnectionManager
+
+
+def broadcast(connections: ConnectionManager, game_id: str, count: int):
+    async def run():
+        for i in range(count):
+            await connections.broadcast(game_id, f'{{"n":{i}}}')
+
+    asyncio.run(run())
+
+
+def test_events_since_replays_only_the_newest_state():
+    connections = ConnectionManager()
+    broadcast(connections, "g1", 5)
+    assert connections.events_since("g1", 2) == [(5, '{"n":4}')]
+    assert connections.events_since("g1", 0) == [(5, '{"n":4}')]
+    assert connections.events_since("g1", 5) == []
+
+
+def test_events_since_rejects_ids_from_the_future():
+    connections = ConnectionManager()
+    broadcast(connections, "g1", 2)
+    assert connections.events_since("g1", 7) is None
+    assert connections.events_since("unknown", 0) == []
+
+
+def test_slow_subscriber_is_dropped_with_an_end_marker(monkeypatch):
+    monkeypatch.setattr(main, "SSE_CLIENT_QUEUE_SIZE", 2)
+
+    async def run():
+        connections = ConnectionManager()
+        queue = connections.subscribe("g1")
+        for i in range(3):
+            await connections.broadcast("g1", str(i))
+        return connections, [queue.get_nowait() for _ in range(queue.qsize())]
+
+    connections, events = asyncio.run(run())
+    assert "g1" not in connections.event_subscribers
+    assert events[-1] is None
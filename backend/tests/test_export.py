@@ -0,0 +1,73 @@
+import asyncio
+import csv
+import gzip
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import fuzz, main
+from app.export import export_games, read_table
+from conftest import MOCK_MODELS
+
+
+@pytest.fixture
+def finished_game(manager, monkeypatch):
+    monkeypatch.setattr(fuzz, "FUZZ_CASES", 0)
+    game = manager.create_game(MOCK_MODELS, seed="export")
+    manager.start_game(game.gameId)
+
+    async def play():
+        while manager.get_game(game.gameId).status == "in_progress":
+            await manager.advance_phase(game.gameId)
+
+    asyncio.run(play())
+    return manager.get_game(game.gameId)
+
+
+def read_csv_table(out_dir, manifest, table):
+    rows = []
+    for name in manifest["tables"][table]["files"]:
+        with gzip.open(os.path.join(out_dir, name), "rt", newline="") as f:
+            rows.extend(csv.DictReader(f))
+    return rows
+
+
+def test_csv_export_writes_every_table(finished_game, tmp_path):
+    manifest = export_games([finished_game], str(tmp_path), "csv", chunk_rows=4)
+    assert manifest["games"] == 1
+    with open(tmp_path / "manifest.json") as f:
+        assert json.load(f) == manifest
+
+    games = read_csv_table(tmp_path, manifest, "games")
+    assert [row["gameId"] for row in games] == [finished_game.gameId]
+    assert games[0]["winner"] == finished_game.winner
+    rounds = read_csv_table(tmp_path, manifest, "rounds")
+    assert len(rounds) == manifest["tables"]["rounds"]["rows"] == len(finished_game.rounds)
+    votes = manifest["tables"]["votes"]
+    assert len(votes["files"]) == -(-votes["rows"] // 4)
+
+
+def test_read_table_round_trips_a_csv_export(finished_game, tmp_path):
+    pytest.importorskip("numpy")
+    manifest = export_games([finished_game], str(tmp_path), "csv")
+    votes = read_table(str(tmp_path), "votes")
+    assert set(votes) == set(manifest["tables"]["votes"]["columns"])
+    assert len(votes["gameId"]) == manifest["tables"]["votes"]["rows"]
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        export_games([], str(tmp_path), "parquet")
+
+
+def test_exports_in_the_same_second_get_their_own_directories(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "s3cret")
+    monkeypatch.setattr(main, "EXPORT_DIR", str(tmp_path))
+    client = TestClient(main.app)
+    headers = {"Authorization": "Bearer s3cret"}
+    first = client.post("/api/admin/export", headers=headers).json()["directory"]
+    second = client.post("/api/admin/export", headers=headers).json()["directory"]
+    assert first != second
+    assert os.path.isdir(first) and os.path.isdir(second)
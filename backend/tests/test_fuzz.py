@@ -0,0 +1,79 @@
+import pytest
+
+from app import fuzz
+from app.fuzz import fuzz_submissions
+from app.generators import shrink_candidates
+from app.task_registry import task_registry
+
+CORRECT = """
+def find_duplicates(nums):
+    return sorted({n for n in nums if nums.count(n) > 1})
+"""
+# Misses duplicates that are not positive
+BUGGY = """
+def find_duplicates(nums):
+    return sorted({n for n in nums if n > 0 and nums.count(n) > 1})
+"""
+
+
+@pytest.fixture
+def task(monkeypatch):
+    monkeypatch.setattr(fuzz, "FUZZ_CASES", 200)
+    return task_registry.get("duplicates")
+
+
+def test_shrink_candidates_are_smaller():
+    for candidate in shrink_candidates([[3, -2, 5], 7]):
+        assert len(candidate[0]) <= 3 and abs(candidate[1]) <= 7
+        assert candidate != [[3, -2, 5], 7]
+    assert shrink_candidates([[], 0]) == []
+
+
+def test_correct_submission_has_no_mismatches(task):
+    result = fuzz_submissions(task, [(0, CORRECT)], "seed", budget=30)
+    report = result.reports[0]
+    assert report.status == "fuzzed"
+    assert report.casesRun == result.casesRun > 0
+    assert report.mismatches == 0 and report.counterexample is None
+
+
+def test_mismatch_is_shrunk_to_a_minimal_counterexample(task):
+    result = fuzz_submissions(task, [(0, CORRECT), (1, BUGGY)], "seed", budget=30)
+    buggy = result.reports[1]
+    assert buggy.mismatches > 0
+    # Two copies of a non-positive number is the smallest failing input
+    [nums] = buggy.counterexample.input
+    assert len(nums) == 2 and nums[0] == nums[1] <= 0
+    assert buggy.counterexample.expected == [nums[0]]
+    assert buggy.counterexample.actual == []
+    assert [d.players for d in result.divergences] == [[0, 1]]
+
+
+def test_prescreen_rejection_has_its_own_status(task):
+    rejected = "import os\n" + CORRECT
+    result = fuzz_submissions(task, [(0, rejected)], "seed", budget=30)
+    report = result.reports[0]
+    assert report.status == "rejected"
+    assert "os" in report.rejection
+    assert report.casesRun == 0 and report.counterexample is None
+
+
+def test_exhausted_budget_is_reported(task):
+    result = fuzz_submissions(task, [(0, CORRECT)], "seed", budget=0)
+    assert result.budgetExhausted
+    assert result.casesRun == 0
+
+
+def test_fuzzing_does_not_hold_test_run_slots():
+    import asyncio
+
+    from app.scheduler import SCHED_SANDBOX_SLOTS, Scheduler
+
+    async def run():
+        scheduler = Scheduler()
+        async with scheduler.slot("fuzz", "g1"):
+            for _ in range(SCHED_SANDBOX_SLOTS):
+                await asyncio.wait_for(scheduler.queue("sandbox").acquire("g2", "interactive"), 0.1)
+            return scheduler.queue("fuzz").in_use
+
+    assert asyncio.run(run()) == 1
@@ -0,0 +1,35 @@
+from app.history import GameHistory, HistoryStore
+
+
+def test_shared_text_is_stored_once():
+    history = GameHistory(3)
+    for player in range(3):
+        history.append(player, "user", "Round 1 task")
+    history.append(0, "assistant", "my answer")
+    assert history.players[0][0] is history.players[2][0]
+    assert history.size() == {
+        "segments": 2,
+        "references": 4,
+        "chars": len("Round 1 task") + len("my answer"),
+    }
+    assert history.messages(0) == [
+        {"role": "user", "content": "Round 1 task"},
+        {"role": "assistant", "content": "my answer"},
+    ]
+
+
+def test_snapshot_round_trip_keeps_sharing():
+    history = GameHistory(2)
+    history.append(0, "user", "shared")
+    history.append(1, "user", "shared")
+    history.append(1, "assistant", "reply")
+    restored = GameHistory.from_snapshot(history.snapshot())
+    assert restored.messages(1) == history.messages(1)
+    assert restored.players[0][0] is restored.players[1][0]
+
+
+def test_store_size_sums_games():
+    store = HistoryStore()
+    store.get("a", 2).append(0, "user", "abc")
+    store.get("b", 2).append(1, "user", "de")
+    assert store.size() == {"segments": 2, "references": 2, "chars": 5}
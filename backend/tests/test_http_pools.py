@@ -0,0 +1,50 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import httpx
+import pytest
+
+from app.http_pools import HttpPools
+
+
+class _OkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep connections alive between requests
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = HTTPServer(("127.0.0.1", 0), _OkHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_sequential_requests_reuse_one_connection(server_url):
+    async def run():
+        pools = HttpPools()
+        client = pools.client("test", httpx.AsyncClient)
+        for _ in range(3):
+            response = await client.get(server_url)
+            assert response.text == "ok"
+        metrics = pools.metrics()["pools"]["test"]
+        await pools.aclose()
+        return metrics
+
+    metrics = asyncio.run(run())
+    assert metrics["requests"] == 3
+    assert metrics["connectionsOpened"] == 1
+    assert metrics["reuseRatio"] == 3
+    assert metrics["http2Requests"] == 0
+    assert metrics["inFlight"] == 0
@@ -0,0 +1,76 @@
+import asyncio
+
+from app import game as game_module
+from app.main import ConnectionManager, sweep_games
+
+from conftest import MOCK_MODELS
+
+
+def test_sweep_evicts_expired_games_and_notifies(manager):
+    evicted = []
+    manager.on_evict(evicted.append)
+    game = manager.create_game(MOCK_MODELS)
+
+    assert manager.sweep_expired(now=manager.last_activity[game.gameId] + 1) == []
+    expired_at = manager.last_activity[game.gameId] + game_module.LOBBY_GAME_TTL + 1
+    assert manager.sweep_expired(now=expired_at) == [game.gameId]
+    assert evicted == [game.gameId]
+    assert game.gameId not in manager.games
+
+
+def test_sweep_skips_games_with_a_phase_in_flight(manager):
+    game = manager.create_game(MOCK_MODELS)
+    manager._phases[object()] = game.gameId
+    later = manager.last_activity[game.gameId] + game_module.LOBBY_GAME_TTL
+    assert manager.sweep_expired(now=later) == []
+    assert game.gameId in manager.games
+
+
+def test_create_at_capacity_evicts_and_notifies(manager, monkeypatch):
+    monkeypatch.setattr(game_module, "MAX_LIVE_GAMES", 1)
+    evicted = []
+    manager.on_evict(evicted.append)
+    old = manager.create_game(MOCK_MODELS)
+    manager.last_activity[old.gameId] -= game_module.LOBBY_GAME_TTL + 1
+
+    new = manager.create_game(MOCK_MODELS)
+    assert evicted == [old.gameId]
+    assert list(manager.games) == [new.gameId]
+
+
+def test_close_game_soon_ends_event_streams():
+    async def run():
+        connections = ConnectionManager()
+        queue = connections.subscribe("g1")
+        await connections.broadcast("g1", "{}")
+        connections.close_game_soon("g1")
+        await asyncio.sleep(0)
+        assert "g1" not in connections.event_subscribers
+        assert "g1" not in connections.last_event_id
+        return [queue.get_nowait() for _ in range(queue.qsize())]
+
+    assert asyncio.run(run())[-1] is None
+
+
+def test_sweeper_survives_a_failed_sweep(monkeypatch):
+    from app import main
+
+    calls = []
+
+    def sweep():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        return []
+
+    monkeypatch.setattr(main, "GAME_SWEEP_INTERVAL", 0)
+    monkeypatch.setattr(main.game_manager, "sweep_expired", sweep)
+
+    async def run():
+        task = asyncio.create_task(sweep_games())
+        while len(calls) < 3:
+            await asyncio.sleep(0)
+        task.cancel()
+
+    asyncio.run(run())
+    assert len(calls) >= 3
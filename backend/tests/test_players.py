@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from app.game import MAX_PLAYERS, MIN_PLAYERS, tally_votes
+from app.models import TestResult as SuiteResult  # Not a test class
+from app.state import Vote
+
+
+def models(count):
+    return [f"mock-{n}" for n in range(count)]
+
+
+@pytest.mark.parametrize("count", [MIN_PLAYERS - 1, MAX_PLAYERS + 1])
+def test_player_count_is_bounded(manager, count):
+    with pytest.raises(ValueError, match="models are required"):
+        manager.create_game(models(count))
+
+
+@pytest.mark.parametrize(
+    "count, imposters, allowed",
+    [(4, 1, True), (4, 2, False), (5, 2, True), (5, 3, False), (6, 2, True), (6, 3, False), (16, 7, True), (16, 8, False), (6, 0, False)],
+)
+def test_imposters_must_be_a_minority(manager, count, imposters, allowed):
+    if allowed:
+        assert len(manager.create_game(models(count), imposters=imposters).imposterIndices) == imposters
+    else:
+        with pytest.raises(ValueError, match="not a minority"):
+            manager.create_game(models(count), imposters=imposters)
+
+
+@pytest.mark.parametrize("count, imposters", [(4, 1), (9, 1), (10, 2), (16, 3)])
+def test_default_is_one_imposter_per_five_players(manager, count, imposters):
+    assert len(manager.create_game(models(count)).imposterIndices) == imposters
+
+
+def test_tally_counts_votes_per_player():
+    votes = [Vote(0, 1, 2), Vote(1, 1, 2), Vote(2, 0, 1), Vote(3, 1, 2)]
+    assert tally_votes(votes, 5) == ([1, 3, 0, 0, 0], [0, 1, 3, 0, 0])
+
+
+def passing(*args):
+    return SuiteResult(passed=True, totalTests=1, passedTests=1, failedTests=[])
+
+
+def results_game(manager, eliminated=(), suspect=None):
+    """A six-player game with imposters 0 and 1, about to score round 1."""
+    game = manager.create_game(models(6), imposters=2)
+    game.imposterIndices = [0, 1]
+    manager.start_game(game.gameId)
+    for index in eliminated:
+        game.players[index].isEliminated = True
+    game.currentPhase = "results"
+    active = [p.index for p in game.players if not p.isEliminated]
+    current_round = game.rounds[0]
+    current_round.suspectVotes = {suspect: len(active)} if suspect is not None else {}
+    manager._test_submission = passing
+    asyncio.run(manager.advance_phase(game.gameId))
+    return game
+
+
+def test_voting_out_the_last_imposter_wins_for_crewmates(manager):
+    game = results_game(manager, eliminated=[0], suspect=1)
+    assert game.winner == "crewmates"
+
+
+def test_voting_out_one_of_two_imposters_goes_on(manager):
+    game = results_game(manager, suspect=0)
+    assert game.players[0].isEliminated and game.winner is None
+    assert game.currentRound == 2 and game.currentPhase == "coding"
+
+
+def test_imposters_win_on_reaching_parity(manager):
+    # Crewmates 2 and 3 out leaves 2 imposters and 2 crewmates
+    game = results_game(manager, eliminated=[2], suspect=3)
+    assert game.winner == "imposter"
+
+
+def test_a_suspect_vote_short_of_a_majority_eliminates_no_one(manager):
+    game = manager.create_game(models(6), imposters=2)
+    manager.start_game(game.gameId)
+    game.currentPhase = "results"
+    game.rounds[0].suspectVotes = {4: 3}  # Half of six is not a majority
+    manager._test_submission = passing
+    asyncio.run(manager.advance_phase(game.gameId))
+    assert not any(p.isEliminated for p in game.players)
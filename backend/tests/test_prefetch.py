@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+from app import game as game_module
+
+from conftest import MOCK_MODELS
+
+
+@pytest.fixture
+def counted(manager, monkeypatch):
+    """Turn prefetching on and count the manager's provider calls."""
+    monkeypatch.setattr(game_module, "SPECULATIVE_PREFETCH", True)
+    complete = manager.llm._call_llm
+    calls = []
+
+    async def call_llm(**kwargs):
+        calls.append(kwargs["phase"])
+        return await complete(**kwargs)
+
+    manager.llm._call_llm = call_llm
+    return calls
+
+
+async def to_discussion(manager):
+    game = manager.create_game(MOCK_MODELS)
+    manager.start_game(game.gameId)
+    await manager.advance_phase(game.gameId)  # Coding
+    await manager.advance_phase(game.gameId)  # Reveal; discussion is prefetched
+    return game
+
+
+def test_the_next_advance_uses_the_prefetched_turns(manager, counted):
+    async def run():
+        game = await to_discussion(manager)
+        await asyncio.sleep(0.05)  # Let the prefetch finish
+        assert counted.count("discussion") == len(MOCK_MODELS)
+        await manager.advance_phase(game.gameId)
+        return game
+
+    game = asyncio.run(run())
+    assert counted.count("discussion") == len(MOCK_MODELS)  # No call was repeated
+    assert len(game.rounds[0].discussion) == len(MOCK_MODELS)
+    assert manager.prefetch_stats["used"] == 1
+
+
+def test_prefetched_turns_are_discarded_when_the_game_changes(manager, counted):
+    async def run():
+        game = await to_discussion(manager)
+        await asyncio.sleep(0.05)
+        game.version += 1  # As if the game changed after the prefetch started
+        await manager.advance_phase(game.gameId)
+
+    asyncio.run(run())
+    assert manager.prefetch_stats["discarded"] == 1
+    assert manager.prefetch_stats["used"] == 0
+
+
+def test_deleting_a_game_cancels_its_prefetch(manager, counted):
+    started = asyncio.Event()
+
+    async def stuck(**kwargs):
+        started.set()
+        await asyncio.Event().wait()
+
+    async def run():
+        game = await to_discussion(manager)
+        manager.llm._call_llm = stuck
+        # Reveal is done, so start the discussion prefetch again with the stuck calls
+        manager._start_prefetch(game)
+        _, task = manager._prefetches[game.gameId]
+        await started.wait()
+        manager.delete_game(game.gameId)
+        await asyncio.sleep(0)
+        return task
+
+    task = asyncio.run(run())
+    assert task.cancelled()
+    assert not manager._prefetches
+
+
+def test_a_failed_prefetch_is_retried_by_the_advance(manager, counted):
+    complete = manager.llm._call_llm
+    failing = True
+
+    async def flaky(**kwargs):
+        if failing:
+            raise RuntimeError("provider down")
+        return await complete(**kwargs)
+
+    manager.llm._call_llm = flaky
+
+    async def run():
+        nonlocal failing
+        game = manager.create_game(MOCK_MODELS)
+        manager.start_game(game.gameId)
+        failing = False
+        await manager.advance_phase(game.gameId)
+        await manager.advance_phase(game.gameId)  # Reveal; the discussion prefetch fails
+        failing = True
+        await asyncio.sleep(0.05)
+        failing = False
+        await manager.advance_phase(game.gameId)
+        return game
+
+    game = asyncio.run(run())
+    assert manager.prefetch_stats["failed"] == 1
+    assert len(game.rounds[0].discussion) == len(MOCK_MODELS)
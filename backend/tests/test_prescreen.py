@@ -0,0 +1,70 @@
+import pytest
+
+from app.prescreen import prescreen
+
+GENERATOR = """
+def naturals():
+    n = 0
+    while True:
+        yield n
+        n += 1
+
+def solve(k):
+    numbers = naturals()
+    return [next(numbers) for _ in range(k)]
+"""
+DELEGATING = """
+def repeat(items):
+    while True:
+        yield from items
+
+def solve(k):
+    return k
+"""
+SPIN = """
+def solve(k):
+    while True:
+        for _ in range(k):
+            break
+"""
+NESTED_RETURN = """
+def solve(k):
+    while True:
+        for n in range(k):
+            if n > 3:
+                return n
+"""
+
+
+@pytest.mark.parametrize(
+    "code, problem",
+    [
+        ("", "Submission is empty"),
+        ("def solve(k):\n    return (", "SyntaxError"),
+        ("def other(k):\n    return k", "is not defined at module level"),
+        ("async def solve(k):\n    return k", "must not be async"),
+        ("def solve():\n    return 1", "cannot be called with 1 argument(s)"),
+        ("def solve(k, *, flag):\n    return k", "cannot be called with 1 argument(s)"),
+        ("import os\ndef solve(k):\n    return k", "Import of 'os' is not allowed"),
+        ("from subprocess import run\ndef solve(k):\n    return k", "Import from 'subprocess'"),
+        ("def solve(k):\n    return eval('k')", "Call to 'eval' is not allowed"),
+        (SPIN, "Infinite loop"),
+    ],
+)
+def test_rejected_submissions(code, problem):
+    assert problem in prescreen(code, "solve", arity=1)
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "def solve(k, extra=0):\n    return k",
+        "def solve(*args):\n    return args",
+        "def solve(k):\n    while True:\n        if k:\n            break\n    return k",
+        NESTED_RETURN,
+        GENERATOR,
+        DELEGATING,
+    ],
+)
+def test_accepted_submissions(code):
+    assert prescreen(code, "solve", arity=1) is None
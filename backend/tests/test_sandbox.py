@@ -0,0 +1,101 @@
+import os
+import time
+
+import pytest
+
+from app.sandbox import execute_cases, run_tests
+
+DOUBLE = """
+def double(x):
+    return x * 2
+"""
+# Reads the fixture file its worker shares, looking for expected results
+SNOOP = """
+import sys
+
+def double(x):
+    job = sys.modules["__main__"].job
+    return sys.modules["os"].pread(job["fixture_fd"], 1 << 16, 0).decode()
+"""
+# Writes its own result frame straight to the worker's result pipe
+FORGE = """
+import json, struct, sys
+
+def double(x):
+    job = sys.modules["__main__"].job
+    data = json.dumps({"i": 1, "result": 4, "passed": True}).encode()
+    sys.modules["os"].write(job["result_fd"], struct.pack(">I", len(data)) + data)
+    return x * 2
+"""
+
+
+def cases(*pairs):
+    return [{"input": [x], "expected": y} for x, y in pairs]
+
+
+def test_fail_fast_run_that_passes_is_not_reported_as_stopped():
+    result = run_tests(DOUBLE, "double", cases((1, 2), (2, 4), (3, 6)), parallelism=2, fail_fast=True)
+    assert result.passed and result.passedTests == 3
+    assert result.error is None
+
+
+def test_fail_fast_stops_at_the_first_failure():
+    outcomes, unrun = execute_cases(
+        DOUBLE, "double", [[1], [2], [3]], expected=[2, 5, 6], parallelism=1, fail_fast=True
+    )
+    assert sorted(outcomes) == [0, 1]
+    assert unrun
+
+
+def test_workers_never_see_expected_results():
+    outcomes, unrun = execute_cases(SNOOP, "double", [[1]], expected=[123456789], parallelism=1)
+    assert not unrun
+    assert "123456789" not in outcomes[0]["result"]
+
+
+def test_forged_result_frames_are_rejected():
+    outcomes, _ = execute_cases(FORGE, "double", [[1], [2]], expected=[2, 4], parallelism=1)
+    assert outcomes == {0: {"error": "Invalid result frame"}, 1: {"error": "Invalid result frame"}}
+# Closes its result pipe, then outlives the per-test alarm
+HANG = """
+import signal, sys, time
+
+def double(x):
+    job = sys.modules["__main__"].job
+    sys.modules["os"].close(job["result_fd"])
+    signal.signal(signal.SIGALRM, signal.SIG_IGN)
+    time.sleep(3600)
+"""
+# Forks a process that outlives the worker and keeps the result pipe open
+ORPHAN = """
+import sys, time
+
+def double(x):
+    os = sys.modules["os"]
+    pid = os.fork()
+    if pid == 0:
+        time.sleep(3600)
+        os._exit(0)
+    return pid
+"""
+
+
+def test_a_worker_that_closes_its_result_pipe_still_times_out():
+    started = time.monotonic()
+    outcomes, unrun = execute_cases(HANG, "double", [[1]], parallelism=1, timeout=1)
+    assert time.monotonic() - started < 10
+    assert outcomes[0]["error"].startswith("TIMEOUT")
+    assert not unrun
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc")
+def test_processes_forked_by_a_submission_are_killed():
+    outcomes, _ = execute_cases(ORPHAN, "double", [[1]], parallelism=1, timeout=1)
+    pid = outcomes[0]["result"]
+    time.sleep(0.2)
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            state = stat.read().rsplit(")", 1)[1].split()[0]
+    except FileNotFoundError:
+        state = None
+    assert state in (None, "Z")  # Reaped, or dead and waiting to be
@@ -0,0 +1,69 @@
+import asyncio
+
+from app.scheduler import BATCH, INTERACTIVE, FairQueue
+
+
+def test_interactive_requests_are_served_ahead_of_queued_batch_work():
+    async def run():
+        queue = FairQueue("test", 1)
+        order = []
+
+        async def request(game_id, priority):
+            await queue.acquire(game_id, priority)
+            order.append(game_id)
+            await asyncio.sleep(0)
+            queue.release()
+
+        await queue.acquire("holder", INTERACTIVE)  # Keep the slot busy while work queues
+        batch = [asyncio.create_task(request("batch", BATCH)) for _ in range(4)]
+        await asyncio.sleep(0)
+        live = asyncio.create_task(request("live", INTERACTIVE))
+        await asyncio.sleep(0)
+        queue.release()
+        await asyncio.gather(*batch, live)
+        return order, queue.metrics()
+
+    order, metrics = asyncio.run(run())
+    assert order.index("live") <= 1
+    assert metrics["inUse"] == 0
+    assert metrics["classes"][BATCH]["granted"] == 4
+
+
+def test_games_in_the_same_class_take_turns():
+    async def run():
+        queue = FairQueue("test", 1)
+        order = []
+
+        async def request(game_id):
+            await queue.acquire(game_id, BATCH)
+            order.append(game_id)
+            queue.release()
+
+        await queue.acquire("holder", BATCH)
+        tasks = [asyncio.create_task(request("greedy")) for _ in range(3)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(request("other")))
+        await asyncio.sleep(0)
+        queue.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(run()).index("other") <= 1
+
+
+def test_a_cancelled_waiter_passes_its_slot_on():
+    async def run():
+        queue = FairQueue("test", 1)
+        await queue.acquire("holder", INTERACTIVE)
+        cancelled = asyncio.create_task(queue.acquire("a", INTERACTIVE))
+        waiting = asyncio.create_task(queue.acquire("b", INTERACTIVE))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        queue.release()
+        await asyncio.wait_for(waiting, 1)
+        in_use = queue.in_use
+        queue.release()
+        return in_use, queue.in_use, queue.metrics()["queued"]
+
+    assert asyncio.run(run()) == (1, 0, 0)
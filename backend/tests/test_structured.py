@@ -0,0 +1,51 @@
+import pytest
+
+from app.structured import CODE_OUTPUT, StructuredOutputError, response_format, vote_output
+
+
+def test_vote_schema_lists_only_players_that_may_be_chosen():
+    schema = vote_output(1, [0, 1, 3]).schema["properties"]
+    assert schema["solution"]["enum"] == [1, 2, 4]
+    assert schema["suspect"]["enum"] == [1, 4]
+
+
+def test_last_player_left_may_name_themselves():
+    assert vote_output(2, [2]).schema["properties"]["suspect"]["enum"] == [3]
+
+
+def test_valid_vote_is_parsed_from_json():
+    output = vote_output(0, [0, 1, 2, 3])
+    assert output.parse('{"solution": 1, "suspect": 3}') == {"solution": 1, "suspect": 3}
+    assert output.dumps({"suspect": 2, "solution": 4}) == '{"suspect":2,"solution":4}'
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        "Player 2 is the imposter",
+        "[1, 2]",
+        '{"solution": 1}',
+        '{"solution": 1, "suspect": 1}',  # Self vote
+        '{"solution": 5, "suspect": 2}',  # Not a player
+        '{"solution": "1", "suspect": 2}',
+        '{"solution": true, "suspect": 2}',
+        '{"solution": 1, "suspect": 2, "reason": "vibes"}',
+    ],
+)
+def test_invalid_votes_are_rejected(response):
+    with pytest.raises(StructuredOutputError):
+        vote_output(0, [0, 1, 2, 3]).parse(response)
+
+
+def test_code_output_requires_a_string():
+    assert CODE_OUTPUT.parse({"code": "def f(): pass"}) == {"code": "def f(): pass"}
+    with pytest.raises(StructuredOutputError):
+        CODE_OUTPUT.parse({"code": None})
+
+
+def test_response_format_by_provider():
+    strict = response_format("openai", CODE_OUTPUT)
+    assert strict["type"] == "json_schema"
+    assert strict["json_schema"]["strict"] is True
+    assert strict["json_schema"]["schema"] is CODE_OUTPUT.schema
+    assert response_format("deepseek", CODE_OUTPUT) == {"type": "json_object"}
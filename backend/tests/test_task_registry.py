@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from app.prompts import get_coding_prompt, get_system_prompt
+from app import task_registry
+from app.task_registry import TaskLoadError, TaskRegistry, _read_file
+from app.tasks import TASKS
+
+
+def write_task(directory, task_id, difficulty="easy", **overrides):
+    definition = {**TASKS[0], "id": task_id, "difficulty": difficulty, **overrides}
+    (directory / f"{task_id}.json").write_text(json.dumps(definition))
+
+
+def test_select_is_seeded_and_easiest_first():
+    registry = TaskRegistry()
+    first = registry.select(3, seed=7)
+    assert registry.select(3, seed=7) == first
+    order = {"easy": 0, "medium": 1, "hard": 2}
+    difficulties = [order[registry.get(task_id).get("difficulty", "medium")] for task_id in first]
+    assert difficulties == sorted(difficulties)
+
+
+def test_select_skips_broken_indexed_files(tmp_path):
+    write_task(tmp_path, "good")
+    (tmp_path / "broken.json").write_text('{"id": "broken"}')
+    (tmp_path / "index.json").write_text(
+        json.dumps(
+            [
+                {"id": "good", "difficulty": "easy", "tags": ["x"], "file": "good.json"},
+                {"id": "broken", "difficulty": "easy", "tags": ["x"], "file": "broken.json"},
+            ]
+        )
+    )
+    registry = TaskRegistry(str(tmp_path), builtin=[])
+    for seed in range(5):
+        assert registry.select(2, seed=seed, tags=["x"]) == ["good"]
+    assert "broken" not in registry.ids()
+
+
+def test_select_fails_when_nothing_matches():
+    with pytest.raises(ValueError):
+        TaskRegistry().select(5, seed=1, tags=["no-such-tag"])
+
+
+def test_directory_without_index_is_loaded_up_front(tmp_path):
+    write_task(tmp_path, "extra", difficulty="hard")
+    (tmp_path / "bad.json").write_text("not json")
+    registry = TaskRegistry(str(tmp_path), builtin=[])
+    assert registry.load_index() == 1
+    assert registry.find(difficulty="hard") == {"extra"}
+
+
+def test_prompts_use_the_real_round_count():
+    task = TASKS[0]
+    assert "ROUND 2/3 " in get_coding_prompt(2, 3, task)
+    prompt = get_system_prompt(0, [0], ["mock"] * 4, round_count=3)
+    assert "surviving all 3 rounds" in prompt
+
+
+def test_short_game_reports_its_round_count(manager):
+    game = manager.create_game(["mock-a"] * 4, tags=["strings"])
+    view = manager.get_game_view(game.gameId)
+    assert view.response.totalRounds == len(game.taskIds) < 5
+
+
+def test_task_files_that_are_not_mappings_are_rejected(tmp_path):
+    (tmp_path / "list.json").write_text("[1, 2]")
+    with pytest.raises(TaskLoadError, match="expected a mapping"):
+        _read_file(tmp_path / "list.json")
+
+
+def test_malformed_yaml_raises_task_load_error(tmp_path):
+    pytest.importorskip("yaml")
+    (tmp_path / "bad.yaml").write_text("id: [unclosed")
+    (tmp_path / "scalar.yaml").write_text("just a string")
+    for name in ("bad.yaml", "scalar.yaml"):
+        with pytest.raises(TaskLoadError):
+            _read_file(tmp_path / name)
+
+
+def test_select_only_reads_the_tasks_it_picks(tmp_path, monkeypatch):
+    index = []
+    for n in range(20):
+        write_task(tmp_path, f"task{n}")
+        index.append({"id": f"task{n}", "difficulty": "easy", "file": f"task{n}.json"})
+    (tmp_path / "index.json").write_text(json.dumps(index))
+    reads = []
+    monkeypatch.setattr(task_registry, "_read_file", lambda path: reads.append(path) or _read_file(path))
+    chosen = TaskRegistry(str(tmp_path), builtin=[]).select(3, seed=1)
+    assert len(chosen) == 3
+    assert sorted(path.stem for path in reads) == sorted(chosen)
@@ -0,0 +1,63 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from app import main
+from app.game import game_manager
+
+from conftest import MOCK_MODELS
+
+
+def test_view_is_cached_until_the_game_changes(manager):
+    game = manager.create_game(MOCK_MODELS)
+    view = manager.get_game_view(game.gameId)
+    assert manager.get_game_view(game.gameId) is view
+
+    manager.start_game(game.gameId)
+    assert manager.get_game_view(game.gameId) is not view
+
+
+def test_imposters_hidden_until_the_game_finishes(manager):
+    game = manager.create_game(MOCK_MODELS)
+    manager.start_game(game.gameId)
+    body = json.loads(manager.get_game_view(game.gameId).body)
+    assert body["imposterIndices"] is None
+    assert body["imposterIndex"] is None
+
+    async def play():
+        while game.status == "in_progress":
+            await manager.advance_phase(game.gameId)
+
+    asyncio.run(play())
+    body = json.loads(manager.get_game_view(game.gameId).body)
+    assert body["imposterIndices"] == game.imposterIndices
+    assert body["imposterIndex"] == game.imposterIndices[0]
+
+
+def test_state_is_not_resent_while_its_etag_matches():
+    client = TestClient(main.app)
+    game = game_manager.create_game(MOCK_MODELS)
+    try:
+        game_manager.start_game(game.gameId)
+        url = f"/api/game/{game.gameId}/state"
+        first = client.get(url, headers={"Accept-Encoding": "identity"})
+        etag = first.headers["etag"]
+        again = client.get(url, headers={"If-None-Match": etag, "Accept-Encoding": "identity"})
+        assert again.status_code == 304 and again.content == b""
+        assert again.headers["etag"] == etag
+
+        assert client.post(f"/api/game/{game.gameId}/advance").status_code == 200
+        changed = client.get(url, headers={"If-None-Match": etag, "Accept-Encoding": "identity"})
+        assert changed.status_code == 200 and changed.headers["etag"] != etag
+    finally:
+        game_manager.delete_game(game.gameId)
+
+
+def test_etag_follows_the_body_not_the_version(manager):
+    game = manager.create_game(MOCK_MODELS)
+    view = manager.get_game_view(game.gameId)
+    manager.start_game(game.gameId)
+    game.version = view.version  # As if rolled back to an older checkpoint
+    manager._views.pop(game.gameId)
+    assert manager.get_game_view(game.gameId).etag != view.etag
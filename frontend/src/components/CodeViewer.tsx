@@ -3,6 +3,7 @@ import type { Submission } from '../types/game';
 
 interface CodeViewerProps {
   submissions: Submission[];
+  playerCount: number;
   chosenSubmission?: number | null;
 }
 
@@ -13,7 +14,7 @@ const TAB_COLORS = [
   'bg-[#f778ba]',
 ];
 
-export function CodeViewer({ submissions, chosenSubmission }: CodeViewerProps) {
+export function CodeViewer({ submissions, playerCount, chosenSubmission }: CodeViewerProps) {
   const [activeTab, setActiveTab] = useState(0);
 
   if (submissions.length === 0) {
@@ -30,8 +31,8 @@ export function CodeViewer({ submissions, chosenSubmission }: CodeViewerProps) {
 
   return (
     <div className="rounded-lg bg-[var(--bg-card)] overflow-hidden">
-      <div className="flex border-b border-[var(--border)]">
-        {[0, 1, 2, 3].map((idx) => {
+      <div className="flex flex-wrap border-b border-[var(--border)]">
+        {Array.from({ length: playerCount }, (_, idx) => {
           const submission = submissions.find(s => s.playerIndex === idx);
           const isChosen = chosenSubmission === idx;
           return (
@@ -40,7 +41,7 @@ export function CodeViewer({ submissions, chosenSubmission }: CodeViewerProps) {
               onClick={() => setActiveTab(idx)}
               className={`
                 px-4 py-2 text-sm font-medium transition-colors
-                ${activeTab === idx ? TAB_COLORS[idx] + ' text-black' : 'text-[var(--text-secondary)] hover:text-[var(--text-primary)]'}
+                ${activeTab === idx ? TAB_COLORS[idx % TAB_COLORS.length] + ' text-black' : 'text-[var(--text-secondary)] hover:text-[var(--text-primary)]'}
                 ${isChosen ? 'ring-2 ring-white ring-inset' : ''}
                 ${!submission ? 'opacity-50' : ''}
               `}
@@ -40,6 +40,7 @@ export function GameBoard({ gameState, isLoading, onAdvancePhase, onPlayAgain }:
     <div className="min-h-screen flex flex-col">
       <Header
         currentRound={gameState.currentRound}
+        totalRounds={gameState.totalRounds}
         currentPhase={gameState.currentPhase}
         discussionRound={gameState.discussionRoundNumber}
       />
@@ -53,7 +54,7 @@ export function GameBoard({ gameState, isLoading, onAdvancePhase, onPlayAgain }:
               player={player}
               suspectVotes={suspectVotes[player.index] || 0}
               hasSubmitted={submissions.some(s => s.playerIndex === player.index)}
-              isImposter={gameState.status === 'finished' && player.index === gameState.imposterIndex}
+              isImposter={gameState.status === 'finished' && (gameState.imposterIndices ?? []).includes(player.index)}
               revealModel={gameState.status === 'finished'}
             />
           ))}
@@ -74,6 +75,7 @@ export function GameBoard({ gameState, isLoading, onAdvancePhase, onPlayAgain }:
           <div className="space-y-6">
             <CodeViewer
               submissions={submissions}
+              playerCount={gameState.players.length}
               chosenSubmission={currentRound?.chosenSubmission}
             />
             {testResults && <TestResults results={testResults} />}
@@ -95,7 +97,11 @@ export function GameBoard({ gameState, isLoading, onAdvancePhase, onPlayAgain }:
 
         {/* Footer */}
         <div className="flex items-center justify-between bg-[var(--bg-secondary)] rounded-lg p-4">
-          <TaskProgress rounds={gameState.rounds} currentRound={gameState.currentRound} />
+          <TaskProgress
+            rounds={gameState.rounds}
+            currentRound={gameState.currentRound}
+            totalRounds={gameState.totalRounds}
+          />
           
           {gameState.status === 'in_progress' && (
             <button
@@ -7,20 +7,25 @@ interface GameOverModalProps {
 
 export function GameOverModal({ gameState, onPlayAgain }: GameOverModalProps) {
   const isCrewmatesWin = gameState.winner === 'crewmates';
-  const imposterPlayer = gameState.players[gameState.imposterIndex ?? 0];
+  const imposterIndices = gameState.imposterIndices ?? [];
+  const imposterPlayers = imposterIndices.map((idx) => gameState.players[idx]);
 
   return (
     <div className="fixed inset-0 bg-black/80 flex items-center justify-center z-50">
       <div className="bg-[var(--bg-card)] rounded-xl p-8 max-w-md w-full mx-4 text-center">
         <h2 className={`text-3xl font-bold mb-4 ${isCrewmatesWin ? 'text-[var(--success)]' : 'text-[var(--failure)]'}`}>
-          {isCrewmatesWin ? 'Crewmates Win!' : 'Imposter Wins!'}
+          {isCrewmatesWin ? 'Crewmates Win!' : imposterPlayers.length > 1 ? 'Imposters Win!' : 'Imposter Wins!'}
         </h2>
         
         <div className="mb-6">
-          <div className="text-[var(--text-secondary)] mb-2">The Imposter was:</div>
-          <div className="text-xl font-bold text-[var(--failure)]">
-            {imposterPlayer?.name} ({imposterPlayer?.model.split('/').pop()})
+          <div className="text-[var(--text-secondary)] mb-2">
+            {imposterPlayers.length > 1 ? 'The Imposters were:' : 'The Imposter was:'}
           </div>
+          {imposterPlayers.map((player) => (
+            <div key={player.index} className="text-xl font-bold text-[var(--failure)]">
+              {player.name} ({player.model.split('/').pop()})
+            </div>
+          ))}
         </div>
 
         <div className="mb-6 text-left bg-[var(--bg-secondary)] rounded-lg p-4">
@@ -31,7 +36,7 @@ export function GameOverModal({ gameState, onPlayAgain }: GameOverModalProps) {
             {gameState.eliminatedPlayer !== null && (
               <div>
                 Eliminated: Player {gameState.eliminatedPlayer + 1}
-                {gameState.eliminatedPlayer === gameState.imposterIndex && (
+                {imposterIndices.includes(gameState.eliminatedPlayer) && (
                   <span className="text-[var(--success)]"> (Imposter caught!)</span>
                 )}
               </div>
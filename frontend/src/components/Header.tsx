@@ -2,6 +2,7 @@ import type { GamePhase } from '../types/game';
 
 interface HeaderProps {
   currentRound: number;
+  totalRounds: number;
   currentPhase: GamePhase;
   discussionRound?: number;
 }
@@ -16,7 +17,7 @@ const PHASE_LABELS: Record<GamePhase, string> = {
   finished: 'Game Over',
 };
 
-export function Header({ currentRound, currentPhase, discussionRound }: HeaderProps) {
+export function Header({ currentRound, totalRounds, currentPhase, discussionRound }: HeaderProps) {
   const phaseLabel = currentPhase === 'discussion' && discussionRound
     ? `Discussion (${discussionRound}/3)`
     : PHASE_LABELS[currentPhase];
@@ -29,7 +30,7 @@ export function Header({ currentRound, currentPhase, discussionRound }: HeaderPr
         </h1>
         <div className="flex items-center gap-6">
           <div className="text-[var(--text-secondary)]">
-            Round <span className="text-[var(--text-primary)] font-bold">{currentRound}/5</span>
+            Round <span className="text-[var(--text-primary)] font-bold">{currentRound}/{totalRounds}</span>
           </div>
           <div className="px-3 py-1 rounded-full bg-[var(--bg-card)] border border-[var(--border)]">
             {phaseLabel}
@@ -11,7 +11,7 @@ export function Lobby({ onCreateGame, onStartGame, gameId, isLoading }: LobbyPro
       <div className="bg-[var(--bg-card)] rounded-xl p-8 max-w-md w-full mx-4 text-center">
         <h1 className="text-4xl font-bold mb-2">LLM Among Us</h1>
         <p className="text-[var(--text-secondary)] mb-8">
-          4 LLMs compete in programming tasks. One is an imposter trying to sabotage.
+          LLMs compete in programming tasks. Some are secretly imposters trying to sabotage.
         </p>
 
         {!gameId ? (
@@ -41,12 +41,12 @@ export function Lobby({ onCreateGame, onStartGame, gameId, isLoading }: LobbyPro
         <div className="mt-8 text-left">
           <h3 className="font-semibold mb-2 text-[var(--text-secondary)]">How it works:</h3>
           <ul className="text-sm text-[var(--text-secondary)] space-y-1">
-            <li>4 LLMs are assigned roles: 3 Crewmates, 1 Imposter</li>
+            <li>4 to 16 LLMs are assigned roles: Crewmates and a minority of Imposters</li>
             <li>Each round, they solve a coding task</li>
             <li>They discuss and vote on which solution to use</li>
-            <li>The imposter tries to sabotage without getting caught</li>
-            <li>Crewmates win by catching the imposter</li>
-            <li>Imposter wins by surviving or failing 3 tasks</li>
+            <li>Imposters try to sabotage without getting caught</li>
+            <li>Crewmates win by catching every imposter</li>
+            <li>Imposters win by surviving, failing 3 tasks or equaling the crewmates</li>
           </ul>
         </div>
       </div>
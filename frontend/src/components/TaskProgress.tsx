@@ -3,13 +3,14 @@ import type { Round } from '../types/game';
 interface TaskProgressProps {
   rounds: Round[];
   currentRound: number;
+  totalRounds: number;
 }
 
-export function TaskProgress({ rounds, currentRound }: TaskProgressProps) {
+export function TaskProgress({ rounds, currentRound, totalRounds }: TaskProgressProps) {
   return (
     <div className="flex items-center gap-2">
       <span className="text-sm text-[var(--text-secondary)]">Tasks:</span>
-      {[1, 2, 3, 4, 5].map((roundNum) => {
+      {Array.from({ length: totalRounds }, (_, i) => i + 1).map((roundNum) => {
         const round = rounds.find(r => r.roundNumber === roundNum);
         const testResults = round?.testResults;
         
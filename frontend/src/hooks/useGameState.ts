@@ -1,5 +1,5 @@
 import { useState, useEffect, useCallback, useRef } from 'react';
-import type { GameState } from '../types/game';
+import type { GameState, ServerRestart } from '../types/game';
 
 const API_URL = 'http://localhost:8000';
 const WS_URL = 'ws://localhost:8000';
@@ -11,12 +11,13 @@ export function useGameState() {
   const [error, setError] = useState<string | null>(null);
   const wsRef = useRef<WebSocket | null>(null);
 
-  const connectWebSocket = useCallback((gameId: string) => {
+  const connectWebSocket = useCallback((gameId: string, resumeToken?: string | null) => {
     if (wsRef.current) {
       wsRef.current.close();
     }
 
-    const ws = new WebSocket(`${WS_URL}/ws/${gameId}`);
+    const query = resumeToken ? `?resume=${encodeURIComponent(resumeToken)}` : '';
+    const ws = new WebSocket(`${WS_URL}/ws/${gameId}${query}`);
     wsRef.current = ws;
 
     ws.onopen = () => {
@@ -28,11 +29,22 @@ export function useGameState() {
       const message = JSON.parse(event.data);
       if (message.type === 'game_state_update' && message.data) {
         setGameState(message.data);
+      } else if (message.type === 'server_restart') {
+        // The server checkpointed the game and is restarting; reconnect to
+        // whichever process picks it up
+        const { resumeToken, retryAfter } = message.data as ServerRestart;
+        setTimeout(() => {
+          if (wsRef.current === ws) connectWebSocket(gameId, resumeToken);
+        }, retryAfter * 1000);
       }
     };
 
-    ws.onclose = () => {
+    ws.onclose = (event) => {
       setIsConnected(false);
+      if (event.code === 4009) {
+        // The restored game is behind what this client saw
+        setError('The game lost progress in a server restart');
+      }
     };
 
     ws.onerror = () => {
@@ -50,12 +50,56 @@ export interface FailedTest {
   error?: string;
 }
 
+export interface EfficiencySample {
+  size: number;
+  wallTime: number | null;
+  cpuTime: number | null;
+  peakRss: number | null;
+  error: string | null;
+}
+
+export interface EfficiencyReport {
+  samples: EfficiencySample[];
+  complexity: string | null;
+  exponent: number | null;
+}
+
 export interface TestResult {
   passed: boolean;
   totalTests: number;
   passedTests: number;
   failedTests: FailedTest[];
   error?: string;
+  efficiency?: EfficiencyReport | null;
+}
+
+export interface Counterexample {
+  input: unknown[];
+  expected: unknown;
+  actual?: unknown;
+  error?: string;
+}
+
+export interface FuzzReport {
+  playerIndex: number;
+  status: 'fuzzed' | 'rejected';
+  casesRun: number;
+  mismatches: number;
+  counterexample: Counterexample | null;
+  rejection: string | null;
+}
+
+export interface Divergence {
+  players: number[];
+  cases: number;
+  example: unknown[];
+}
+
+export interface FuzzResult {
+  casesRun: number;
+  budgetExhausted: boolean;
+  reports: FuzzReport[];
+  divergences: Divergence[];
 }
 
 export interface Round {
@@ -66,7 +110,9 @@ export interface Round {
   votes: Vote[];
   chosenSubmission: number | null;
   testResults: TestResult | null;
+  fuzzResults: FuzzResult | null;
   suspectVotes: Record<number, number>;
+  eliminatedPlayer: number | null;
 }
 
 export type GamePhase = 'lobby' | 'coding' | 'reveal' | 'discussion' | 'voting' | 'results' | 'finished';
@@ -77,9 +123,12 @@ export interface GameState {
   gameId: string;
   status: GameStatus;
   currentRound: number;
+  totalRounds: number;
   currentPhase: GamePhase;
   players: Player[];
+  /** @deprecated First imposter only; use imposterIndices */
   imposterIndex: number | null;
+  imposterIndices: number[] | null;
   rounds: Round[];
   winner: Winner;
   eliminatedPlayer: number | null;
@@ -87,7 +136,12 @@ export interface GameState {
   discussionRoundNumber: number;
 }
 
+export interface ServerRestart {
+  resumeToken: string | null;
+  retryAfter: number;
+}
+
 export interface WebSocketMessage {
   type: string;
-  data?: GameState;
+  data?: GameState | ServerRestart;
 }